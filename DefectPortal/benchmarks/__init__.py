@@ -0,0 +1,5 @@
+"""
+Benchmarks for DefectPortal
+Standalone scripts that measure throughput of the indexing and search hot paths.
+Run from the DefectPortal folder, e.g.: python benchmarks/bench_index_prep.py
+"""
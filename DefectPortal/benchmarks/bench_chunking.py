@@ -0,0 +1,93 @@
+"""
+Chunking benchmark: fixed word windows vs token-aware, structure-aware chunks.
+Chunks generated knowledge-base documents (benchmarks/synthetic_corpus.py) both ways with the
+embedding model's tokenizer and reports, per strategy:
+  - chunks, mean/max tokens per chunk
+  - coverage: share of the document tokens inside the model's max_seq_length (the rest is
+    truncated away and never embedded)
+  - embedding time for all chunks
+  - recall@3 of probe sentences: a sentence taken from a document is the query, and a hit
+    is a top-3 chunk that contains it
+Usage: python benchmarks/bench_chunking.py [--docs 10] [--words 5000] [--probes 100] [--model all-MiniLM-L6-v2]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmarks.synthetic_corpus import write_documents
+from modules.genai.document_search import DocumentSearch
+from modules.genai.embedding_service import EmbeddingService
+
+
+def probe_sentences(paths, count: int, seed: int):
+    """Sentences (one text line each) sampled from the documents."""
+    rng = random.Random(seed)
+    lines = [
+        line.strip() for path in paths
+        for line in Path(path).read_text(encoding='utf-8').splitlines()
+        if line.strip().startswith('When ')
+    ]
+    return rng.sample(lines, min(count, len(lines)))
+
+
+def evaluate(label: str, search: DocumentSearch, embedding_service: EmbeddingService, paths, probes, probe_vectors):
+    chunks = [chunk for path in paths for chunk in search._process_file(path)]
+    texts = [chunk['content'] for chunk in chunks]
+    tokens = np.array(embedding_service.count_tokens(texts))
+    limit = embedding_service.max_seq_length - 2
+
+    start = time.perf_counter()
+    matrix = np.asarray(embedding_service.generate_embeddings(texts), dtype=np.float32)
+    seconds = time.perf_counter() - start
+
+    hits = 0
+    for probe, vector in zip(probes, probe_vectors):
+        top = np.argsort(-(matrix @ vector))[:3]
+        hits += any(probe in " ".join(texts[i].split()) for i in top)
+
+    print(f"  {label:<8} {len(chunks):7} {tokens.mean():8.0f} {tokens.max():7} "
+          f"{np.minimum(tokens, limit).sum() / tokens.sum():9.1%} {seconds:10.2f} {hits / max(len(probes), 1):10.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Word-window vs token-aware chunking (coverage, speed, recall).")
+    parser.add_argument("--docs", type=int, default=10)
+    parser.add_argument("--words", type=int, default=5000, help="Words per document")
+    parser.add_argument("--probes", type=int, default=100)
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    embedding_service = EmbeddingService(model_name=args.model)
+    tmp = tempfile.mkdtemp()
+    try:
+        docs = os.path.join(tmp, "documents")
+        paths = write_documents(docs, count=args.docs, words=args.words, seed=args.seed)
+        probes = probe_sentences(paths, args.probes, args.seed)
+        probe_vectors = np.asarray(embedding_service.generate_embeddings(probes), dtype=np.float32)
+        cache = os.path.join(tmp, "extraction_cache")
+
+        print(f"{args.docs} documents x {args.words} words, {len(probes)} probes, "
+              f"model {args.model} (max_seq_length {embedding_service.max_seq_length})")
+        print(f"  {'strategy':<8} {'chunks':>7} {'mean tok':>8} {'max tok':>7} {'coverage':>9} {'embed s':>10} {'recall@3':>10}")
+        for chunking in ('words', 'tokens'):
+            search = DocumentSearch(embedding_service, None, documents_path=docs, extraction_workers=0,
+                                    extraction_cache_dir=cache, chunking=chunking)
+            evaluate(chunking, search, embedding_service, paths, probes, probe_vectors)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
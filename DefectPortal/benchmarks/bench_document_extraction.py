@@ -0,0 +1,71 @@
+"""
+Document extraction benchmark.
+Extracts the knowledge-base documents (knowledge_base/documents) the way
+DocumentSearch.load_and_index_documents does and reports:
+  - cold extraction in this process vs in a worker pool
+  - a warm rerun served from the extraction cache
+  - a rerun after touching every file (hash check only)
+  - a rerun after adding one new PDF (only that file is extracted)
+Usage: python benchmarks/bench_document_extraction.py [--workers 4] [--documents knowledge_base/documents]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from modules.genai.document_extraction import ExtractionCache, extract_documents
+
+
+def timed(label: str, paths: list, cache_dir: str, workers: int):
+    cache = ExtractionCache(cache_dir) if cache_dir else None
+    start = time.perf_counter()
+    texts = extract_documents(paths, cache=cache, workers=workers)
+    elapsed = time.perf_counter() - start
+    chars = sum(len(t) for t in texts.values())
+    print(f"  {label:<38} {elapsed:8.2f} s   ({len(paths)} files, {chars:,} chars)")
+    return texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Knowledge-base text extraction: pool and per-file cache.")
+    parser.add_argument("--documents", default=str(project_root / "knowledge_base" / "documents"))
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1))
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    try:
+        docs = os.path.join(tmp, "documents")
+        shutil.copytree(args.documents, docs)
+        paths = sorted(str(p) for p in Path(docs).iterdir() if p.suffix.lower() in ('.txt', '.md', '.pdf', '.docx'))
+        cache_dir = os.path.join(tmp, "extraction_cache")
+        print(f"{len(paths)} documents, {args.workers} workers, {os.cpu_count()} CPUs")
+
+        serial = timed("cold, in process", paths, None, 0)
+        timed(f"cold, {args.workers} workers (fills cache)", paths, cache_dir, args.workers)
+        warm = timed("warm (cache)", paths, cache_dir, args.workers)
+        assert warm == serial, "cached text differs from extracted text"
+
+        for path in paths:
+            os.utime(path)
+        timed("all files touched (hash check)", paths, cache_dir, args.workers)
+
+        pdfs = [p for p in paths if p.lower().endswith('.pdf')]
+        if pdfs:
+            added = os.path.join(docs, "Added Document.pdf")
+            shutil.copy(max(pdfs, key=os.path.getsize), added)
+            with open(added, 'ab') as f:
+                f.write(b"\n% new revision\n")  # different content hash, still a valid PDF
+            timed("one new PDF added", paths + [added], cache_dir, args.workers)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
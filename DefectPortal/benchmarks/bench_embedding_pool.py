@@ -0,0 +1,66 @@
+"""
+Embedding worker-pool benchmark.
+Encodes the real ACC/SIT defect texts in a single process and with the EmbeddingService
+worker pool, reports texts/sec for both and checks the vectors are identical.
+Usage: python benchmarks/bench_embedding_pool.py [--workers 8] [--threads 4] [--pin] [--rows 20000]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmarks.bench_index_prep import load_real_defects, scale_to
+from modules.genai.embedding_service import EmbeddingService, defect_texts_from_frame
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark single-process vs worker-pool embedding.")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=None, help="Torch threads per worker")
+    parser.add_argument("--pin", action="store_true", help="Pin workers to CPU cores")
+    parser.add_argument("--rows", type=int, default=0, help="Number of texts (0 = real data as-is)")
+    args = parser.parse_args()
+
+    defects = pd.concat([
+        load_real_defects(str(project_root / "combine_acc")),
+        load_real_defects(str(project_root / "combine_sit")),
+    ], ignore_index=True)
+    if args.rows:
+        defects = scale_to(defects, args.rows)
+    texts = defect_texts_from_frame(defects)
+    print(f"Texts: {len(texts)}")
+
+    single = EmbeddingService()
+    start = time.perf_counter()
+    single_vecs = np.asarray(single.generate_embeddings(texts))
+    single_time = time.perf_counter() - start
+    print(f"Single process: {single_time:.1f}s  {len(texts) / single_time:,.0f} texts/sec")
+
+    pooled = EmbeddingService(
+        num_workers=args.workers,
+        threads_per_worker=args.threads,
+        pin_threads=args.pin,
+        pool_min_texts=1,
+    )
+    pooled.start_pool()
+    # Warm-up so model loading in the workers is not counted
+    pooled.generate_embeddings(texts[:pooled.batch_size * args.workers])
+    start = time.perf_counter()
+    pool_vecs = np.asarray(pooled.generate_embeddings(texts))
+    pool_time = time.perf_counter() - start
+    pooled.close_pool()
+    print(f"Pool ({args.workers} workers): {pool_time:.1f}s  {len(texts) / pool_time:,.0f} texts/sec")
+    print(f"Speedup: {single_time / pool_time:.1f}x")
+    print(f"Identical output: {np.array_equal(single_vecs, pool_vecs)} "
+          f"(max abs diff {np.abs(single_vecs - pool_vecs).max():.2e})")
+
+
+if __name__ == "__main__":
+    main()
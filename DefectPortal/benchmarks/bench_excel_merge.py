@@ -0,0 +1,106 @@
+"""
+Duplicate-column merge benchmark for the Excel converters.
+Combines the bundled wave exports (combine_acc/, combine_sit/) the way utilities/combine_*.py
+does, then merges Jira's repeated columns (Comment, Watchers, Fix Version/s, ...) with:
+  - rowwise:    the previous df[cols].apply(lambda row: ..., axis=1) per column group
+  - vectorised: utilities.jira_csv.merge_duplicate_columns
+and checks that both produce byte-identical CSV and Excel worksheet output.
+Usage: python benchmarks/bench_excel_merge.py [--folders combine_acc,combine_sit]
+"""
+
+import argparse
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+import warnings
+import zipfile
+from pathlib import Path
+
+import pandas as pd
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utilities.jira_csv import merge_duplicate_columns
+
+# Columns kept by utilities/excel_converter_*.py
+COLUMNS_TO_EXTRACT = [
+    'Summary', 'Issue key', 'Priority', 'Resolution', 'Fix Version/s',
+    'Description', 'Custom field (OSF-Fix Description)', 'Custom field (OSF-Stack)',
+    'Custom field (OSF-System)', 'Custom field (Vendor + Application)', 'Comment'
+]
+
+
+def rowwise_merge(df: pd.DataFrame) -> pd.DataFrame:
+    """The converters' previous merge (reference implementation)."""
+    grouped_cols = {}
+    for col in df.columns:
+        base = re.sub(r'\.\d+$', '', col)
+        grouped_cols.setdefault(base, []).append(col)
+
+    merged_columns = {}
+    for base_col, cols in grouped_cols.items():
+        if len(cols) == 1:
+            merged_columns[base_col] = df[cols[0]]
+        else:
+            merged_columns[base_col] = df[cols].apply(
+                lambda row: '\n '.join([str(val).strip() for val in row if pd.notna(val) and str(val).strip()]),
+                axis=1
+            )
+    return pd.DataFrame(merged_columns)
+
+
+def combined_csv(folder: Path, target: str):
+    """Concatenate a folder's wave CSVs like utilities/combine_*.py."""
+    frames = []
+    for file in sorted(f for f in os.listdir(folder) if f.endswith(".csv")):
+        df = pd.read_csv(folder / file, low_memory=False)
+        df["Source_File"] = file
+        frames.append(df)
+    pd.concat(frames, ignore_index=True).to_csv(target, index=False)
+
+
+def worksheet_bytes(path: str) -> dict:
+    """Contents of an .xlsx without its creation timestamps (docProps)."""
+    with zipfile.ZipFile(path) as archive:
+        return {name: archive.read(name) for name in archive.namelist() if not name.startswith('docProps/')}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Row-wise vs vectorised merge of repeated Jira columns.")
+    parser.add_argument("--folders", default="combine_acc,combine_sit")
+    args = parser.parse_args()
+    warnings.simplefilter("ignore")
+
+    tmp = tempfile.mkdtemp()
+    try:
+        for name in args.folders.split(','):
+            source = os.path.join(tmp, f"{name}.csv")
+            combined_csv(project_root / name, source)
+            df = pd.read_csv(source)
+
+            outputs = {}
+            for label, merge in (('rowwise', rowwise_merge), ('vectorised', merge_duplicate_columns)):
+                start = time.perf_counter()
+                merged = merge(df)
+                seconds = time.perf_counter() - start
+                aligned = merged.reindex(columns=COLUMNS_TO_EXTRACT, fill_value="")
+                xlsx = os.path.join(tmp, f"{name}_{label}.xlsx")
+                aligned.to_excel(xlsx, index=False)
+                outputs[label] = (merged.to_csv(index=False).encode('utf-8'), worksheet_bytes(xlsx))
+                print(f"  {name:<12} {label:<11} {seconds:8.2f} s   ({df.shape[0]} rows, {df.shape[1]} columns)")
+
+            same_csv = outputs['rowwise'][0] == outputs['vectorised'][0]
+            same_xlsx = outputs['rowwise'][1] == outputs['vectorised'][1]
+            print(f"  {name:<12} identical output: csv {same_csv}, xlsx {same_xlsx}")
+            if not (same_csv and same_xlsx):
+                sys.exit(1)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Index-prep throughput benchmark.
+Measures how fast defect rows are turned into embedding texts and vector-store metadata
+(everything in index_defects/add_defects except the embedding model), in rows/sec.
+Compares the previous iterrows-based path with the columnar path and checks they match.
+Usage: python benchmarks/bench_index_prep.py [--rows 200000] [--repeat 3]
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from modules.genai.embedding_service import defect_texts_from_frame, DEFECT_TEXT_FIELDS
+from modules.genai.vector_store import prepare_defect_records
+
+# Columns stored in defects_table_acc / defects_table_sit (see utilities/excel_converter_*.py) plus Status
+DB_COLUMNS = [
+    'Summary', 'Issue key', 'Status', 'Priority', 'Resolution', 'Fix Version/s',
+    'Description', 'Custom field (OSF-Fix Description)', 'Custom field (OSF-Stack)',
+    'Custom field (OSF-System)', 'Custom field (Vendor + Application)', 'Comment'
+]
+
+
+def load_real_defects(folder: str) -> pd.DataFrame:
+    """
+    Load the bundled wave CSVs of one environment, shaped like the DB table. Empty cells stay
+    NaN, so the parity check also covers how both implementations treat missing values.
+    """
+    frames = []
+    for name in sorted(os.listdir(folder)):
+        if name.endswith(".csv"):
+            df = pd.read_csv(os.path.join(folder, name), low_memory=False)
+            frames.append(df.reindex(columns=DB_COLUMNS, fill_value=""))
+    return pd.concat(frames, ignore_index=True)
+
+
+def edge_case_defects() -> pd.DataFrame:
+    """
+    Rows the real exports do not contain: missing values in the columns with fallbacks
+    (OSF-Wave / Fix Version/s, the fix description names), where `a or b` treats NaN as a value.
+    """
+    return pd.DataFrame({
+        'Issue key': ['EDGE-1', 'EDGE-2', 'EDGE-3', 'EDGE-4', 'EDGE-5'],
+        'Summary': ['NaN wave', 'Empty wave', 'None wave', 'Zero wave', 'Set wave'],
+        'OSF-Wave': [np.nan, '', None, 0, 'Wave 3'],
+        'Fix Version/s': ['Wave 1', 'Wave 1', np.nan, 'Wave 2', 'Wave 2'],
+        'Custom field (OSF-Fix Description)': [np.nan, '', np.nan, 'Patched', 0],
+        'Fix Description': ['Fallback fix', 'Fallback fix', 'Fallback fix', 'Unused', np.nan],
+    }, dtype=object)
+
+
+def legacy_prepare(defects_acc: pd.DataFrame, defects_sit: pd.DataFrame):
+    """Previous row-wise implementation (iterrows + per-row dicts), kept for comparison."""
+    all_defects, all_texts = [], []
+    for frame, source in ((defects_acc, 'ACC'), (defects_sit, 'SIT')):
+        for _, row in frame.iterrows():
+            defect = row.to_dict()
+            defect['source'] = source
+            all_defects.append(defect)
+            fields = [defect.get(f, '') for f in DEFECT_TEXT_FIELDS]
+            all_texts.append(" ".join(str(f).strip() for f in fields if f and str(f).strip() and str(f).lower() != 'nan'))
+
+    ids, documents, metadata = [], [], []
+    for i, defect in enumerate(all_defects):
+        issue_key = str(defect.get('Issue key', f'defect_{i}'))
+        ids.append(issue_key)
+        documents.append(f"{defect.get('Summary', '')} {defect.get('Description', '')}"[:5000])
+        fix_desc = defect.get('Custom field (OSF-Fix Description)') or defect.get('OSF-Fix Description') or defect.get('Fix Description') or ''
+        fix_desc = str(fix_desc).strip()
+        if fix_desc.lower() in ('nan', 'none', ''):
+            fix_desc = ''
+        metadata.append({
+            'issue_key': issue_key,
+            'summary': str(defect.get('Summary', ''))[:500],
+            'status': str(defect.get('Status', '')),
+            'priority': str(defect.get('Priority', '')),
+            'osf_wave': str(defect.get('OSF-Wave', '') or defect.get('Fix Version/s', '')),
+            'osf_system': str(defect.get('OSF-System', '')),
+            'resolution': str(defect.get('Resolution', '')),
+            'fix_description': fix_desc[:1000],
+            'source': str(defect.get('source', 'unknown'))
+        })
+    return all_texts, ids, documents, metadata
+
+
+def columnar_prepare(defects_acc: pd.DataFrame, defects_sit: pd.DataFrame):
+    """Current columnar implementation (as in DefectSimilaritySearch.index_defects)."""
+    frames = [defects_acc.assign(source='ACC'), defects_sit.assign(source='SIT')]
+    columns = list(dict.fromkeys(col for frame in frames for col in frame.columns))
+    all_defects = pd.concat([frame.reindex(columns=columns, fill_value='') for frame in frames], ignore_index=True)
+    # No field cap here so the output can be compared with the legacy text format
+    texts = defect_texts_from_frame(all_defects, field_max_chars=None)
+    ids, documents, metadata = prepare_defect_records(all_defects)
+    return texts, ids, documents, metadata
+
+
+def scale_to(df: pd.DataFrame, rows: int) -> pd.DataFrame:
+    """Repeat the real rows until the frame has `rows` rows."""
+    if rows <= len(df):
+        return df.head(rows).reset_index(drop=True)
+    reps = -(-rows // len(df))
+    return pd.concat([df] * reps, ignore_index=True).head(rows)
+
+
+def best_time(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark defect index preparation throughput.")
+    parser.add_argument("--rows", type=int, default=0, help="Total rows (0 = real data as-is)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip-legacy", action="store_true", help="Only time the columnar path")
+    args = parser.parse_args()
+
+    acc = load_real_defects(str(project_root / "combine_acc"))
+    sit = load_real_defects(str(project_root / "combine_sit"))
+    if args.rows:
+        share = len(acc) / (len(acc) + len(sit))
+        acc = scale_to(acc, int(args.rows * share))
+        sit = scale_to(sit, args.rows - len(acc))
+    total = len(acc) + len(sit)
+    print(f"Rows: {total} (ACC {len(acc)}, SIT {len(sit)})")
+
+    new_result = columnar_prepare(acc, sit)
+    new_time = best_time(lambda: columnar_prepare(acc, sit), args.repeat)
+    print(f"Columnar: {new_time:.3f}s  {total / new_time:,.0f} rows/sec")
+
+    if not args.skip_legacy:
+        old_result = legacy_prepare(acc, sit)
+        old_time = best_time(lambda: legacy_prepare(acc, sit), args.repeat)
+        print(f"Legacy:   {old_time:.3f}s  {total / old_time:,.0f} rows/sec")
+        print(f"Speedup:  {old_time / new_time:.1f}x")
+        print(f"Identical output: {old_result == new_result}")
+        edges = edge_case_defects()
+        same = legacy_prepare(edges, edges.head(0)) == columnar_prepare(edges, edges.head(0))
+        print(f"Identical output (missing-value edge cases): {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Length-bucketing benchmark.
+Encodes the real ACC/SIT defect texts with different batching strategies and reports
+texts/sec plus padding efficiency (real tokens / padded tokens):
+  arrival   - 256-text chunks, batches in arrival order
+  previous  - 256-text chunks, sorted by character length inside each chunk (old behaviour)
+  bucketed  - EmbeddingService.generate_embeddings (token-length buckets over bulk chunks)
+  capped    - bucketed, with per-field length caps applied when building the defect text
+Usage: python benchmarks/bench_length_buckets.py [--rows 5000] [--field-max-chars 500]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmarks.bench_index_prep import load_real_defects, scale_to
+from modules.genai.embedding_service import EmbeddingService, defect_texts_from_frame, _encode_batches
+
+
+def padding_efficiency(service: EmbeddingService, batches) -> float:
+    """Share of real (non-padding) tokens across all batches."""
+    real, padded = 0, 0
+    for batch in batches:
+        lengths = service._token_lengths(batch)
+        real += int(lengths.sum())
+        padded += int(lengths.max()) * len(batch)
+    return real / padded if padded else 1.0
+
+
+def chunked(items, size):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def run(name, service, texts, batches, encode):
+    start = time.perf_counter()
+    encode()
+    elapsed = time.perf_counter() - start
+    eff = padding_efficiency(service, batches)
+    print(f"{name:<9} {elapsed:7.1f}s  {len(texts) / elapsed:8,.0f} texts/sec  padding efficiency {eff:.0%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark length-bucketed embedding batches.")
+    parser.add_argument("--rows", type=int, default=0, help="Number of texts (0 = real data as-is)")
+    parser.add_argument("--field-max-chars", type=int, default=500)
+    args = parser.parse_args()
+
+    defects = pd.concat([
+        load_real_defects(str(project_root / "combine_acc")),
+        load_real_defects(str(project_root / "combine_sit")),
+    ], ignore_index=True)
+    if args.rows:
+        defects = scale_to(defects, args.rows)
+    texts = [t if t.strip() else " " for t in defect_texts_from_frame(defects)]
+    capped = [t if t.strip() else " " for t in defect_texts_from_frame(defects, args.field_max_chars)]
+
+    service = EmbeddingService(defect_field_max_chars=args.field_max_chars)
+    lengths = service._token_lengths(texts)
+    print(f"Texts: {len(texts)}  tokens p50={int(np.percentile(lengths, 50))} "
+          f"p90={int(np.percentile(lengths, 90))} max={int(lengths.max())} (model limit {service.model.max_seq_length})")
+
+    bs = service.batch_size
+    arrival = [b for chunk in chunked(texts, 256) for b in chunked(chunk, bs)]
+    run("arrival", service, texts, arrival, lambda: _encode_batches(service.model, arrival))
+
+    previous = [b for chunk in chunked(texts, 256) for b in chunked(sorted(chunk, key=len, reverse=True), bs)]
+    run("previous", service, texts, previous,
+        lambda: [service.model.encode(chunk, batch_size=bs, show_progress_bar=False) for chunk in chunked(texts, 256)])
+
+    bucketed = [b for chunk in chunked(texts, service.bulk_batch_size) for b in service._plan_batches(chunk)[1]]
+    run("bucketed", service, texts, bucketed,
+        lambda: [service.generate_embeddings(chunk) for chunk in chunked(texts, service.bulk_batch_size)])
+
+    capped_batches = [b for chunk in chunked(capped, service.bulk_batch_size) for b in service._plan_batches(chunk)[1]]
+    run("capped", service, capped, capped_batches,
+        lambda: [service.generate_embeddings(chunk) for chunk in chunked(capped, service.bulk_batch_size)])
+
+
+if __name__ == "__main__":
+    main()
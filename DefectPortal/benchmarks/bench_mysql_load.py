@@ -0,0 +1,226 @@
+"""
+Defects table loading benchmark for utilities/mysql_connection.insert_rows.
+Loads the bundled wave exports (combine_acc/, combine_sit/, rows as utilities/defect_pipeline.py
+produces them) into a fresh table one row per INSERT IGNORE statement (the previous loader)
+and with multi-row statements of several batch sizes, then loads them a second time (every
+row a duplicate). Reports time and rows/s, and checks that every batch size gives the same
+inserted/skipped counts and table contents as the row-by-row load.
+
+The upsert part starts from an INSERT IGNORE load (a table from before upsert mode), then
+upserts the same rows (hashes are backfilled, nothing is reported as changed), upserts them
+again (nothing is written) and upserts them with --edits defects edited, which must update
+and report exactly those keys. Dropping and reloading the table is the previous alternative.
+
+Without --mysql an in-memory SQLite database stands in for MySQL; each statement waits
+--latency-ms to model the client/server round trip that dominates row-by-row loading.
+Usage: python benchmarks/bench_mysql_load.py [--batch-sizes 1,100,500,1000] [--latency-ms 0.2] [--edits 50] [--mysql]
+"""
+
+import argparse
+import contextlib
+import io
+import re
+import sqlite3
+import sys
+import time
+import warnings
+from pathlib import Path
+
+import pandas as pd
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utilities import mysql_connection
+from utilities.defect_pipeline import ENVIRONMENTS, iter_defect_batches
+
+TABLE = "bench_defects_table"
+
+
+class _SQLiteCursor:
+    """The part of a mysql.connector cursor that mysql_connection uses, on SQLite."""
+
+    def __init__(self, connection, latency: float):
+        self._cursor = connection.cursor()
+        self._latency = latency
+        self.rowcount = -1
+
+    def execute(self, query, params=()):
+        if 'information_schema.columns' in query:
+            table = re.search(r"table_name = '(\w+)'", query).group(1)
+            column = re.search(r"column_name = '([^']+)'", query).group(1)
+            query, params = "SELECT COUNT(*) FROM pragma_table_info(?) WHERE name = ?", (table, column)
+        elif 'information_schema' in query:
+            table = re.search(r"table_name = '(\w+)'", query).group(1)
+            query, params = "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+        if "ON DUPLICATE KEY UPDATE" in query:
+            query = query.replace("ON DUPLICATE KEY UPDATE", f"ON CONFLICT(`{mysql_connection.primary_key_col}`) DO UPDATE SET")
+            query = re.sub(r"VALUES\((`[^`]+`)\)", r"excluded.\1", query)
+        query = query.replace("INSERT IGNORE", "INSERT OR IGNORE").replace("%s", "?")
+        if self._latency:
+            time.sleep(self._latency)
+        self._cursor.execute(query, params)
+        self.rowcount = self._cursor.rowcount
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteStandIn:
+    """In-memory SQLite connection that accepts mysql_connection's MySQL statements."""
+
+    def __init__(self, latency_ms: float = 0.0):
+        self._connection = sqlite3.connect(":memory:")
+        self._latency = latency_ms / 1000
+
+    def cursor(self):
+        return _SQLiteCursor(self._connection, self._latency)
+
+    def commit(self):
+        self._connection.commit()
+
+    def close(self):
+        self._connection.close()
+
+
+def connect(args):
+    """A connection with no benchmark table yet."""
+    if not args.mysql:
+        return SQLiteStandIn(args.latency_ms)
+    conn = mysql_connection.get_connection()
+    cursor = conn.cursor()
+    cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+    cursor.close()
+    return conn
+
+
+def disconnect(conn, args):
+    if args.mysql:
+        cursor = conn.cursor()
+        cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        cursor.close()
+    conn.close()
+
+
+def table_rows(conn) -> list:
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT * FROM {TABLE}")
+    rows = sorted(cursor.fetchall())
+    cursor.close()
+    return rows
+
+
+def run(conn, df: pd.DataFrame, batch_size: int) -> dict:
+    """Create the table and load df twice; returns the timings, counts and final table rows."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        mysql_connection.ensure_table(conn, TABLE, df.columns)
+    result = {}
+    for label in ('first', 'repeat'):
+        start = time.perf_counter()
+        inserted, skipped = mysql_connection.insert_rows(conn, TABLE, df, batch_size)
+        conn.commit()
+        result[label] = (time.perf_counter() - start, inserted, skipped)
+    result['rows'] = table_rows(conn)
+    return result
+
+
+def run_upsert(conn, df: pd.DataFrame, edits: int, seed: int = 0) -> bool:
+    """Upsert scenario (see module docstring); prints one line per step and returns whether all checks passed."""
+    key = mysql_connection.primary_key_col
+    first_rows = df.drop_duplicates(key)
+    edited_index = first_rows.sample(n=min(edits, len(first_rows)), random_state=seed).index
+    edited = df.copy()
+    edited.loc[edited_index, 'Resolution'] = 'Fixed'
+    edited.loc[edited_index, 'Custom field (OSF-Fix Description)'] = 'Corrected in the next wave (edited)'
+    expected_keys = set(df.loc[edited_index, key])
+
+    ok = True
+    with contextlib.redirect_stdout(io.StringIO()):
+        mysql_connection.ensure_table(conn, TABLE, df.columns)
+    start = time.perf_counter()
+    mysql_connection.insert_rows(conn, TABLE, df)
+    conn.commit()
+    print(f"  {'drop + reload (INSERT IGNORE)':<34} {time.perf_counter() - start:8.2f} s")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        mysql_connection.ensure_hash_column(conn, TABLE)
+    for label, rows, expected in (('upsert, hashes backfilled', df, set()),
+                                  ('upsert, unchanged', df, set()),
+                                  (f'upsert, {len(expected_keys)} defects edited', edited, expected_keys)):
+        start = time.perf_counter()
+        result = mysql_connection.upsert_rows(conn, TABLE, rows)
+        conn.commit()
+        seconds = time.perf_counter() - start
+        changed = set(result['changed_keys'])
+        ok = ok and changed == expected
+        print(f"  {label:<34} {seconds:8.2f} s   inserted {result['inserted']}, updated {result['updated']}, "
+              f"unchanged {result['unchanged']}, skipped {result['skipped']}, "
+              f"changed keys {'match' if changed == expected else 'DIFFER'}")
+
+    # The table must now hold the edited rows
+    key_index = list(df.columns).index(key)
+    stored = {row[key_index]: row for row in table_rows(conn)}
+    expected_rows = {
+        row[key_index]: tuple(row) for row in
+        mysql_connection.as_text(edited.drop_duplicates(key)).to_numpy(dtype=object).tolist()
+    }
+    same = stored.keys() == expected_rows.keys() and all(
+        stored[k][:len(df.columns)] == expected_rows[k] for k in expected_rows
+    )
+    print(f"  table holds the edited rows: {same}")
+    return ok and same
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Row-by-row vs batched INSERT IGNORE of the defects table.")
+    parser.add_argument("--batch-sizes", default="1,100,500,1000", help="Rows per statement; 1 = row by row")
+    parser.add_argument("--latency-ms", type=float, default=0.2, help="Round trip per statement (SQLite only)")
+    parser.add_argument("--edits", type=int, default=50, help="Defects edited in the upsert part")
+    parser.add_argument("--mysql", action="store_true",
+                        help=f"Use the database of mysql_connection.db_config (creates and drops {TABLE})")
+    args = parser.parse_args()
+    warnings.simplefilter("ignore")
+
+    df = pd.concat([
+        batch for env in ENVIRONMENTS.values()
+        for batch in iter_defect_batches(env['input_folder'], env['ttwos_file'])
+    ], ignore_index=True)
+    target = "MySQL" if args.mysql else f"SQLite stand-in, {args.latency_ms} ms per statement"
+    print(f"{len(df)} rows ({df['Issue key'].nunique()} distinct keys), {target}")
+    print(f"  {'batch':>6} {'first load s':>13} {'rows/s':>9} {'inserted':>9} {'skipped':>8} {'reload s':>9} {'same':>5}")
+
+    reference = None
+    for batch_size in [int(size) for size in args.batch_sizes.split(',')]:
+        conn = connect(args)
+        try:
+            result = run(conn, df, batch_size)
+        finally:
+            disconnect(conn, args)
+
+        seconds, inserted, skipped = result['first']
+        outcome = (result['first'][1:], result['repeat'][1:], result['rows'])
+        reference = reference or outcome
+        same = outcome == reference
+        print(f"  {batch_size:6} {seconds:13.2f} {len(df) / seconds:9.0f} {inserted:9} {skipped:8} "
+              f"{result['repeat'][0]:9.2f} {str(same):>5}")
+        if not same:
+            sys.exit(1)
+
+    print(f"\nUpsert (batch size {mysql_connection.insert_batch_size}):")
+    conn = connect(args)
+    try:
+        ok = run_upsert(conn, df, args.edits)
+    finally:
+        disconnect(conn, args)
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+ONNX backend parity and latency benchmark.
+Encodes the real ACC/SIT defect texts with the torch backend and the ONNX backend
+(float32 and int8), reports cosine agreement with torch, single-query latency
+(p50/p95) and bulk throughput. Exits non-zero if the mean cosine agreement of a
+backend falls below --min-cosine, so it can be used as a parity check.
+Usage: python benchmarks/bench_onnx_backend.py [--rows 2000] [--queries 200] [--min-cosine 0.99]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmarks.bench_index_prep import load_real_defects, scale_to
+from modules.genai.embedding_service import EmbeddingService, defect_texts_from_frame
+
+
+def measure(name: str, service: EmbeddingService, texts, queries, load_time: float):
+    """Return bulk embeddings and print latency/throughput for one backend."""
+    service.generate_embedding(queries[0])  # warm-up
+    latencies = []
+    for q in queries:
+        start = time.perf_counter()
+        service.generate_embedding(q)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    vectors = np.asarray(service.generate_embeddings(texts), dtype=np.float32)
+    bulk_time = time.perf_counter() - start
+
+    print(f"{name:<10} load {load_time:5.1f}s  query p50 {np.percentile(latencies, 50):6.1f}ms "
+          f"p95 {np.percentile(latencies, 95):6.1f}ms  bulk {len(texts) / bulk_time:7,.0f} texts/sec")
+    return vectors
+
+
+def cosine_rows(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    a = a / np.clip(np.linalg.norm(a, axis=1, keepdims=True), 1e-12, None)
+    b = b / np.clip(np.linalg.norm(b, axis=1, keepdims=True), 1e-12, None)
+    return (a * b).sum(axis=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ONNX vs torch embedding parity and latency.")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--onnx-dir", default=None, help="Exported ONNX folder (default: knowledge_base/onnx_models/<model>)")
+    parser.add_argument("--rows", type=int, default=2000, help="Bulk texts to encode")
+    parser.add_argument("--queries", type=int, default=200, help="Single-query latency samples")
+    parser.add_argument("--min-cosine", type=float, default=0.99, help="Minimum mean cosine agreement with torch")
+    args = parser.parse_args()
+
+    defects = pd.concat([
+        load_real_defects(str(project_root / "combine_acc")),
+        load_real_defects(str(project_root / "combine_sit")),
+    ], ignore_index=True)
+    defects = scale_to(defects, args.rows)
+    texts = [t if t.strip() else " " for t in defect_texts_from_frame(defects, 500)]
+    queries = [t[:200] for t in texts[:args.queries]]
+    print(f"Bulk texts: {len(texts)}  queries: {len(queries)}")
+
+    results = {}
+    for name, backend, quantized in (("torch", "torch", False), ("onnx", "onnx", False), ("onnx-int8", "onnx", True)):
+        start = time.perf_counter()
+        service = EmbeddingService(args.model, backend=backend, onnx_quantized=quantized,
+                                   onnx_dir=args.onnx_dir)
+        load_time = time.perf_counter() - start
+        if service.backend != backend:
+            print(f"{name:<10} unavailable (fell back to {service.backend})")
+            continue
+        results[name] = measure(name, service, texts, queries, load_time)
+
+    failed = False
+    for name in ("onnx", "onnx-int8"):
+        if name in results and "torch" in results:
+            cos = cosine_rows(results["torch"], results[name])
+            ok = cos.mean() >= args.min_cosine
+            failed = failed or not ok
+            print(f"Parity {name:<10} mean cosine {cos.mean():.4f}  min {cos.min():.4f}  {'OK' if ok else 'FAIL'}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Search result cache benchmark.
+Runs EnhancedSearch.search (configured model, index and LLM) for real defect summaries twice:
+once cold and once served from the process-wide result cache, and reports latency
+percentiles, hit ratio and cache size.
+Usage: python benchmarks/bench_result_cache.py [--queries 50]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmarks.bench_index_prep import load_real_defects
+from modules.genai.enhanced_search import EnhancedSearch
+
+
+def timed_searches(search: EnhancedSearch, queries: list) -> np.ndarray:
+    """Latency of each search in milliseconds."""
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        search.search(query, n_similar_defects=5, n_related_docs=3, min_similarity=0.3)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.asarray(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EnhancedSearch result cache: cold vs cached latency.")
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+
+    defects_acc = load_real_defects(str(project_root / "combine_acc"))
+    defects_sit = load_real_defects(str(project_root / "combine_sit"))
+    defects = pd.concat([defects_acc, defects_sit], ignore_index=True)
+    rng = np.random.default_rng(0)
+    picks = rng.choice(len(defects), size=min(args.queries, len(defects)), replace=False)
+    queries = [str(s) or "error" for s in defects['Summary'].iloc[picks]]
+
+    search = EnhancedSearch()
+    if search.result_cache is None:
+        print("result_cache is disabled in config/genai_config.yaml")
+        return
+    if not search.get_status().get('defects_indexed'):
+        search.index_data(defects_acc, defects_sit, index_documents=False)
+    search.result_cache.clear()
+
+    cold = timed_searches(search, queries)
+    # Same queries as users retype them: different case and spacing hit the same entry
+    warm = timed_searches(search, [f"  {q.upper()}  " for q in queries])
+
+    print(f"{len(queries)} queries, LLM {'on' if search.llm_service.is_available() else 'fallback'}")
+    for label, ms in (("cold", cold), ("cached", warm)):
+        print(f"  {label:<7} p50 {np.percentile(ms, 50):8.2f} ms  p95 {np.percentile(ms, 95):8.2f} ms  "
+              f"max {ms.max():8.2f} ms")
+    stats = search.result_cache.stats()
+    print(f"  cache: {stats['entries']} entries, {stats['bytes'] / 1024:.1f} KB "
+          f"({stats['bytes'] / max(stats['entries'], 1) / 1024:.1f} KB/entry), hit ratio {stats['hit_ratio']}")
+
+
+if __name__ == "__main__":
+    main()
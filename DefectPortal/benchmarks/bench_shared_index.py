@@ -0,0 +1,128 @@
+"""
+Shared vector index memory benchmark (Linux).
+Publishes a synthetic defect index, then starts several reader processes that attach to it
+the way each Streamlit server process does and run searches. Reports, per process, the
+private memory added by the vector store and the resident/proportional (PSS) size of the
+memory-mapped index files, plus how long a reader takes to pick up a newly published version.
+Usage: python benchmarks/bench_shared_index.py [--rows 100000] [--processes 4] [--precision int8]
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from modules.genai.vector_store import VectorStore
+
+
+def anonymous_kb() -> int:
+    """Private anonymous memory of this process, from /proc/self/smaps_rollup."""
+    with open('/proc/self/smaps_rollup', 'r') as f:
+        for line in f:
+            if line.startswith('Anonymous:'):
+                return int(line.split()[1])
+    return 0
+
+
+def mapped_index_kb(persist_dir: str) -> tuple:
+    """(RSS, PSS) of this process's mappings of files under persist_dir, from /proc/self/smaps."""
+    rss = pss = 0
+    in_index = False
+    with open('/proc/self/smaps', 'r') as f:
+        for line in f:
+            parts = line.split()
+            if '-' in parts[0] and len(parts) >= 5:
+                in_index = len(parts) >= 6 and parts[5].startswith(persist_dir)
+            elif in_index and parts[0] == 'Rss:':
+                rss += int(parts[1])
+            elif in_index and parts[0] == 'Pss:':
+                pss += int(parts[1])
+    return rss, pss
+
+
+def reader(persist_dir: str, precision: str, results, attached, measure_event, start_event, stop_event):
+    np.ones(4) @ np.ones(4)  # load BLAS before measuring
+    before = anonymous_kb()
+    store = VectorStore(persist_dir, precision=precision, reload_interval=0.1)
+    rng = np.random.default_rng(os.getpid())
+    for _ in range(20):
+        store.search_similar_defects(rng.normal(size=store.defect_vectors.dimension), 5, 0.0)
+    anon_kb = anonymous_kb() - before
+    attached.release()
+
+    # Measure once every reader has mapped the index, so shared pages are split between them
+    measure_event.wait()
+    rss_kb, pss_kb = mapped_index_kb(persist_dir)
+    results.put(('attached', os.getpid(), anon_kb, rss_kb, pss_kb))
+
+    start_event.wait()
+    version = store.get_collection_stats()['index_version']
+    started = time.perf_counter()
+    while store.get_collection_stats()['index_version'] == version and not stop_event.is_set():
+        store.search_similar_defects(rng.normal(size=store.defect_vectors.dimension), 5, 0.0)
+        time.sleep(0.01)
+    results.put(('reloaded', os.getpid(), time.perf_counter() - started, len(store.defect_ids)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-process memory of the shared vector index.")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--precision", default="int8", choices=["float32", "float16", "int8"])
+    args = parser.parse_args()
+
+    persist_dir = tempfile.mkdtemp()
+    try:
+        rng = np.random.default_rng(0)
+        defects = pd.DataFrame({
+            'Issue key': [f"BENCH-{i}" for i in range(args.rows)],
+            'Summary': "Synthetic defect summary",
+            'Description': "Synthetic defect description " * 20
+        })
+        publisher = VectorStore(persist_dir, precision=args.precision)
+        publisher.add_defects(defects, rng.normal(size=(args.rows, args.dim)).astype(np.float32))
+        vectors = publisher.defect_vectors
+        print(f"Index: {args.rows} x {args.dim}, {args.precision} ({vectors.nbytes / 1e6:.1f} MB compact)")
+        print(f"Previous per-process copy (list of float64 arrays): {args.rows * args.dim * 8 / 1e6:.1f} MB")
+
+        ctx = mp.get_context('spawn')
+        results, attached = ctx.Queue(), ctx.Semaphore(0)
+        measure_event, start_event, stop_event = ctx.Event(), ctx.Event(), ctx.Event()
+        procs = [ctx.Process(target=reader, args=(persist_dir, args.precision, results, attached,
+                                                  measure_event, start_event, stop_event))
+                 for _ in range(args.processes)]
+        for p in procs:
+            p.start()
+        for _ in procs:
+            attached.acquire(timeout=600)
+        measure_event.set()
+        for _ in procs:
+            _, pid, anon_kb, rss_kb, pss_kb = results.get(timeout=600)
+            print(f"  reader {pid}: +{anon_kb / 1024:5.1f} MB private (ids, caches); mapped index "
+                  f"{rss_kb / 1024:5.1f} MB resident, {pss_kb / 1024:5.1f} MB proportional share")
+
+        publisher.add_defects(defects.iloc[:1000], rng.normal(size=(1000, args.dim)).astype(np.float32))
+        start_event.set()
+        for _ in procs:
+            _, pid, seconds, rows = results.get(timeout=60)
+            print(f"  reader {pid}: attached new version ({rows} rows) after {seconds:.2f}s")
+        stop_event.set()
+        for p in procs:
+            p.join()
+    finally:
+        shutil.rmtree(persist_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Streaming document indexing benchmark.
+Indexes one large generated knowledge-base file and reports time and peak memory:
+  - stream: DocumentSearch.sync_documents (extract -> chunk -> embed -> append, batch by batch)
+  - whole:  the same file read into memory, split with _split_text and embedded in one call
+Embeddings come from a hashing stand-in for the model, so the numbers show the pipeline's
+own memory and time rather than the encoder's. Each mode runs in a fresh process so peak
+RSS is measured separately.
+Usage: python benchmarks/bench_streaming_index.py [--mb 100] [--batch 2048]
+"""
+
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmarks.synthetic_corpus import write_documents
+from modules.genai.document_search import DocumentSearch
+from modules.genai.vector_store import VectorStore
+
+
+class HashingEmbedder:
+    """Deterministic 384-dim vectors from word hashes (stands in for EmbeddingService)."""
+
+    dimension = 384
+
+    def __init__(self, batch_size: int):
+        self.bulk_batch_size = batch_size
+
+    def generate_embeddings(self, texts):
+        matrix = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.split()[:256]:
+                matrix[row, zlib.crc32(word.encode('utf-8')) % self.dimension] += 1.0
+        return matrix
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux, bytes on macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2 ** 20
+
+
+def write_large_file(path: str, megabytes: int):
+    """Concatenate generated guide documents into one file of roughly `megabytes` MB."""
+    tmp = tempfile.mkdtemp()
+    try:
+        parts = write_documents(tmp, count=8, words=20000)
+        texts = [Path(p).read_text(encoding='utf-8') for p in parts]
+        written = 0
+        with open(path, 'w', encoding='utf-8') as f:
+            while written < megabytes * 2 ** 20:
+                for text in texts:
+                    f.write(text + "\n\n")
+                    written += len(text) + 2
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def run_mode(mode: str, workdir: str, batch: int) -> dict:
+    docs = os.path.join(workdir, "documents")
+    baseline = peak_rss_mb()
+    embedder = HashingEmbedder(batch)
+    store = VectorStore(persist_directory=os.path.join(workdir, f"vector_store_{mode}"))
+    search = DocumentSearch(embedder, store, documents_path=docs, extraction_workers=0,
+                            extraction_cache_dir=os.path.join(workdir, "extraction_cache"))
+    start = time.perf_counter()
+    if mode == 'stream':
+        chunks = search.sync_documents(full_rebuild=True)['chunks']
+    else:
+        path = search.list_documents()[0]
+        text = Path(path).read_text(encoding='utf-8')
+        chunks = search._process_file(path, content=text)
+        store.add_documents(chunks, embedder.generate_embeddings([c['content'] for c in chunks]))
+        chunks = len(chunks)
+    return {
+        'mode': mode,
+        'seconds': round(time.perf_counter() - start, 2),
+        'chunks': chunks,
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'growth_mb': round(peak_rss_mb() - baseline, 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming vs whole-file document indexing (time, peak memory).")
+    parser.add_argument("--mb", type=int, default=100, help="Size of the generated document in MB")
+    parser.add_argument("--batch", type=int, default=2048, help="Chunks embedded and appended per batch")
+    parser.add_argument("--mode", choices=['stream', 'whole'], help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args.workdir, args.batch)))
+        return
+
+    workdir = tempfile.mkdtemp()
+    try:
+        os.makedirs(os.path.join(workdir, "documents"))
+        write_large_file(os.path.join(workdir, "documents", "large_guide.txt"), args.mb)
+        print(f"{args.mb} MB document, batches of {args.batch} chunks")
+        for mode in ('stream', 'whole'):
+            output = subprocess.run(
+                [sys.executable, __file__, "--mode", mode, "--workdir", workdir, "--batch", str(args.batch)],
+                capture_output=True, text=True, check=True
+            ).stdout.strip().splitlines()[-1]
+            result = json.loads(output)
+            print(f"  {mode:<8} {result['seconds']:8.2f} s   {result['chunks']:>8} chunks   "
+                  f"peak RSS {result['peak_rss_mb']:8.1f} MB (+{result['growth_mb']:.1f} MB)")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
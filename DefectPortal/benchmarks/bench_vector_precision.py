@@ -0,0 +1,112 @@
+"""
+Vector precision benchmark.
+Embeds the real ACC/SIT defects, loads them into VectorStore at float32, float16 and int8
+precision (with and without float32 rescoring) and reports memory per vector, search
+latency and recall@k against exact float32 similarities. Also runs the same check on the
+document vectors already stored in knowledge_base/vector_store/documents.json.
+Usage: python benchmarks/bench_vector_precision.py [--model all-MiniLM-L6-v2] [--queries 300] [--k 5]
+"""
+
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmarks.bench_index_prep import load_real_defects
+from modules.genai.embedding_service import EmbeddingService
+from modules.genai.vector_store import VectorStore
+
+CONFIGS = [
+    ('float32', 0),
+    ('float16', 0),
+    ('float16', 50),
+    ('int8', 0),
+    ('int8', 50),
+]
+
+
+def run_collection(name: str, collection: str, embeddings: np.ndarray, queries: np.ndarray, k: int):
+    """Print memory, latency and recall@k for every precision config on one collection."""
+    tmp = tempfile.mkdtemp()
+    try:
+        ids = [f"{name}_{i}" for i in range(len(embeddings))]
+        with open(Path(tmp) / f"{collection}.json", 'w', encoding='utf-8') as f:
+            json.dump({
+                'ids': ids,
+                'embeddings': embeddings.tolist(),
+                'metadata': [{} for _ in ids],
+                'documents': ['' for _ in ids]
+            }, f)
+
+        float64_bytes = embeddings.shape[0] * embeddings.shape[1] * 8
+        print(f"\n{name}: {embeddings.shape[0]} vectors x {embeddings.shape[1]} dims, {len(queries)} queries, recall@{k}")
+        print(f"  previous list of float64 arrays: {float64_bytes / 1e6:8.2f} MB ({float64_bytes / len(embeddings):.0f} B/vector)")
+
+        # Exact float32 similarities; a hit is any result scoring at least the exact k-th best
+        # (real data has many identical re-raised defects, so exact ties are common)
+        normalized = embeddings / np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        exact = (queries / np.linalg.norm(queries, axis=1, keepdims=True)) @ normalized.T
+        kth = np.sort(exact, axis=1)[:, -k]
+        index = {key: i for i, key in enumerate(ids)}
+
+        search = 'search_similar_defects' if collection == 'defects' else 'search_documents'
+        for precision, rescore in CONFIGS:
+            store = VectorStore(tmp, precision=precision, rescore_candidates=rescore)
+            vectors = store.defect_vectors if collection == 'defects' else store.document_vectors
+            run = getattr(store, search)
+
+            start = time.perf_counter()
+            results = [[r.get('issue_key', r.get('id')) for r in run(q, k, -1.0)] for q in queries]
+            latency = (time.perf_counter() - start) / len(queries) * 1000
+
+            recall = np.mean([
+                np.mean([exact[qi, index[key]] >= kth[qi] - 1e-6 for key in keys]) if keys else 1.0
+                for qi, keys in enumerate(results)
+            ])
+            label = f"{precision}{' + rescore ' + str(rescore) if rescore else ''}"
+            print(f"  {label:<20} {vectors.nbytes / 1e6:8.2f} MB ({vectors.nbytes / len(embeddings):5.0f} B/vector)  "
+                  f"{latency:6.2f} ms/query  recall@{k} {recall:.4f}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VectorStore precision: memory, latency and recall.")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    service = EmbeddingService(args.model)
+
+    defects = pd.concat([
+        load_real_defects(str(project_root / "combine_acc")),
+        load_real_defects(str(project_root / "combine_sit")),
+    ], ignore_index=True)
+    embeddings = np.asarray(service.generate_embeddings(service.create_defect_texts(defects)), dtype=np.float32)
+    # Queries are defect summaries, the way users search
+    picks = rng.choice(len(defects), size=min(args.queries, len(defects)), replace=False)
+    summaries = [str(s) or "error" for s in defects['Summary'].iloc[picks]]
+    queries = np.asarray(service.generate_embeddings(summaries), dtype=np.float32)
+    run_collection("ACC/SIT defects", 'defects', embeddings, queries, args.k)
+
+    doc_file = project_root / "knowledge_base" / "vector_store" / "documents.json"
+    if doc_file.exists():
+        with open(doc_file, 'r', encoding='utf-8') as f:
+            doc_embeddings = np.asarray(json.load(f).get('embeddings', []), dtype=np.float32)
+        if len(doc_embeddings) and doc_embeddings.shape[1] == queries.shape[1]:
+            run_collection("Knowledge documents", 'documents', doc_embeddings, queries, min(args.k, 3))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Wave CSV ingestion benchmark for utilities/combine_acc.py and combine_sit.py.
+Combines the bundled wave exports (combine_acc/, combine_sit/) with:
+  - pandas:  the previous pd.read_csv of every column, pd.concat and to_csv
+  - pyarrow: utilities.wave_ingest.combine_waves (parallel read of the converter columns, Parquet)
+Each run is a separate process so its peak memory can be reported, and the merged sheets
+(as used by the Excel converters) are checked to hold the same rows.
+Usage: python benchmarks/bench_wave_ingest.py [--folders combine_acc,combine_sit]
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+import pandas as pd
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utilities.jira_csv import merge_duplicate_columns
+from utilities.wave_ingest import DEFECT_COLUMNS, SOURCE_COLUMN, combine_waves, read_sheet
+
+
+def pandas_combine(folder: str, output_stem: str) -> str:
+    """The previous combine_*.py (reference implementation)."""
+    frames = []
+    for file in sorted(f for f in os.listdir(folder) if f.endswith(".csv")):
+        df = pd.read_csv(os.path.join(folder, file), low_memory=False)
+        df[SOURCE_COLUMN] = file
+        frames.append(df)
+    output = f"{output_stem}.csv"
+    pd.concat(frames, ignore_index=True).to_csv(output, index=False)
+    return output
+
+
+def peak_rss_mb() -> float:
+    """Peak resident memory of this process (VmHWM; ru_maxrss would include the parent's, kept across exec)."""
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def run_child(mode: str, folder: str, output_stem: str):
+    """Run one combine in this process and print seconds, peak RSS (MB) and the output path."""
+    warnings.simplefilter("ignore")
+    start = time.perf_counter()
+    if mode == 'pandas':
+        output = pandas_combine(folder, output_stem)
+    else:
+        output = combine_waves(folder, output_stem, DEFECT_COLUMNS)['output']
+    seconds = time.perf_counter() - start
+    peak = peak_rss_mb()
+    print(f"{seconds} {peak} {output}")
+
+
+def converter_rows(path: str) -> pd.DataFrame:
+    """The converter view of a combined sheet: merged columns, sorted, as text."""
+    merged = merge_duplicate_columns(read_sheet(path))
+    aligned = merged.reindex(columns=DEFECT_COLUMNS, fill_value="").astype(object).fillna("").astype(str)
+    return aligned.sort_values(DEFECT_COLUMNS).reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="pandas vs pyarrow ingestion of the wave CSV exports.")
+    parser.add_argument("--folders", default="combine_acc,combine_sit")
+    parser.add_argument("--child", nargs=3, metavar=("MODE", "FOLDER", "OUTPUT_STEM"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        run_child(*args.child)
+        return
+    warnings.simplefilter("ignore")
+
+    tmp = tempfile.mkdtemp()
+    try:
+        print(f"  {'folder':<12} {'reader':<8} {'seconds':>8} {'peak MB':>8} {'output MB':>10}")
+        for name in args.folders.split(','):
+            outputs = {}
+            for mode in ('pandas', 'pyarrow'):
+                result = subprocess.run(
+                    [sys.executable, __file__, "--child", mode, str(project_root / name),
+                     os.path.join(tmp, f"{name}_{mode}")],
+                    capture_output=True, text=True, check=True
+                )
+                seconds, peak, output = result.stdout.split()[-3:]
+                outputs[mode] = output
+                size = os.path.getsize(output) / (1 << 20)
+                print(f"  {name:<12} {mode:<8} {float(seconds):8.2f} {float(peak):8.0f} {size:10.1f}")
+
+            same = converter_rows(outputs['pandas']).equals(converter_rows(outputs['pyarrow']))
+            print(f"  {name:<12} same converter rows: {same}")
+            if not same:
+                sys.exit(1)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
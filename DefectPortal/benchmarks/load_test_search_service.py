@@ -0,0 +1,155 @@
+"""
+Search service load test.
+Sends concurrent requests to a running search service (utilities/run_search_service.py) and
+reports throughput and p50/p95/p99 latency per endpoint. Queries are real defect summaries
+from combine_acc/combine_sit, so the mix looks like what users type.
+Usage: python benchmarks/load_test_search_service.py [--url http://127.0.0.1:8765] [--clients 8]
+       [--requests 200] [--endpoint search|analyze_defect|find_similar_batch] [--batch 20]
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import requests
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmarks.bench_index_prep import load_real_defects
+
+
+def build_payloads(endpoint: str, count: int, batch: int, seed: int = 0) -> list:
+    """Request bodies for one endpoint, drawn from the bundled ACC/SIT CSVs."""
+    import pandas as pd
+
+    defects = pd.concat([
+        load_real_defects(str(project_root / "combine_acc")),
+        load_real_defects(str(project_root / "combine_sit")),
+    ], ignore_index=True)
+    columns = [c for c in ('Issue key', 'Summary', 'Description', 'Component/s', 'Priority') if c in defects.columns]
+    records = defects[columns].astype(str).to_dict(orient='records')
+    rng = np.random.default_rng(seed)
+
+    payloads = []
+    for _ in range(count):
+        if endpoint == 'search':
+            summary = records[rng.integers(len(records))].get('Summary') or "error"
+            payloads.append({'query': summary, 'n_similar_defects': 5, 'n_related_docs': 3, 'min_similarity': 0.3})
+        elif endpoint == 'analyze_defect':
+            payloads.append({'defect': records[rng.integers(len(records))], 'n_similar': 5, 'n_docs': 3})
+        else:
+            picks = rng.choice(len(records), size=min(batch, len(records)), replace=False)
+            payloads.append({'defects': [records[i] for i in picks], 'n_similar': 5, 'min_similarity': 0.5})
+    return payloads
+
+
+def wait_for_service(url: str, timeout: float):
+    """Block until /status reports ready."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            status = requests.get(f"{url}/status", timeout=5).json()
+            if status.get('ready'):
+                return status
+            if status.get('init_progress', {}).get('error'):
+                raise RuntimeError(status['init_progress']['error'])
+        except requests.RequestException:
+            pass
+        time.sleep(1.0)
+    raise TimeoutError(f"Search service at {url} not ready after {timeout:.0f}s")
+
+
+def run_load(url: str, endpoint: str, payloads: list, clients: int, timeout: float) -> dict:
+    """Send the payloads from `clients` threads (one HTTP session each); return timings."""
+    latencies = []
+    errors = {}
+    lock = threading.Lock()
+    next_index = [0]
+
+    def client():
+        session = requests.Session()
+        while True:
+            with lock:
+                i = next_index[0]
+                next_index[0] += 1
+            if i >= len(payloads):
+                return
+            start = time.perf_counter()
+            try:
+                response = session.post(f"{url}/{endpoint}", json=payloads[i], timeout=timeout)
+                key = None if response.status_code == 200 else f"HTTP {response.status_code}"
+            except requests.RequestException as e:
+                key = type(e).__name__
+            elapsed = time.perf_counter() - start
+            with lock:
+                if key is None:
+                    latencies.append(elapsed)
+                else:
+                    errors[key] = errors.get(key, 0) + 1
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - start
+
+    ms = np.asarray(latencies) * 1000
+    return {
+        'endpoint': endpoint,
+        'clients': clients,
+        'requests': len(payloads),
+        'ok': len(latencies),
+        'errors': errors,
+        'wall_seconds': round(wall, 3),
+        'throughput_rps': round(len(latencies) / wall, 2) if wall else 0.0,
+        'p50_ms': round(float(np.percentile(ms, 50)), 1) if len(ms) else None,
+        'p95_ms': round(float(np.percentile(ms, 95)), 1) if len(ms) else None,
+        'p99_ms': round(float(np.percentile(ms, 99)), 1) if len(ms) else None,
+        'max_ms': round(float(ms.max()), 1) if len(ms) else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the standalone search service.")
+    parser.add_argument("--url", default="http://127.0.0.1:8765")
+    parser.add_argument("--endpoint", default="search", choices=["search", "analyze_defect", "find_similar_batch"])
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 4, 8], help="Concurrent clients (one run per value)")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per run")
+    parser.add_argument("--batch", type=int, default=20, help="Defects per find_similar_batch request")
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=300, help="Per-request timeout (seconds)")
+    parser.add_argument("--json", default=None, help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    url = args.url.rstrip('/')
+    status = wait_for_service(url, timeout=600)
+    print(f"Service ready: {status.get('defects_indexed', 0)} defects, {status.get('documents_indexed', 0)} documents, "
+          f"{status.get('service', {}).get('worker_threads')} worker threads, LLM {'on' if status.get('llm_available') else 'fallback'}")
+
+    payloads = build_payloads(args.endpoint, args.requests + args.warmup, args.batch)
+    run_load(url, args.endpoint, payloads[:args.warmup], 1, args.timeout)
+
+    results = []
+    print(f"\n{args.endpoint}: {args.requests} requests per run")
+    print(f"  {'clients':>7} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}  errors")
+    for clients in args.clients:
+        result = run_load(url, args.endpoint, payloads[args.warmup:], clients, args.timeout)
+        results.append(result)
+        fmt = lambda v: f"{v:9.1f}" if v is not None else f"{'-':>9}"
+        print(f"  {clients:>7} {result['throughput_rps']:8.2f} {fmt(result['p50_ms'])} {fmt(result['p95_ms'])} "
+              f"{fmt(result['p99_ms'])} {fmt(result['max_ms'])}  {result['errors'] or '-'}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
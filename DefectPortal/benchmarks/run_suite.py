@@ -0,0 +1,358 @@
+"""
+Benchmark suite.
+Runs repeatable benchmarks on a synthetic ACC/SIT corpus (see synthetic_corpus.py) and writes
+the results as JSON, so two commits can be compared on the same machine:
+
+    python benchmarks/run_suite.py --rows 20000 --output before.json
+    git checkout <other commit>
+    python benchmarks/run_suite.py --rows 20000 --output after.json --compare before.json
+
+Benchmarks:
+    indexing        index preparation (texts, ids, records), embedding and VectorStore writes
+    vector_search   VectorStore.search_similar_defects latency per precision
+    keyword_search  the portal keyword filter (str.contains over columns) and document keyword fallback
+    chunking        DocumentSearch._process_file over generated knowledge-base documents
+    etl             utilities/combine_*.py, excel_converter_*.py and defect_pipeline.py on generated wave CSVs
+
+Every timing is the median of --repeat runs. With --skip-embedding (or when the model cannot
+be loaded) random unit vectors stand in for embeddings and the embedding timings are omitted.
+Usage: python benchmarks/run_suite.py [--rows 5000] [--only indexing,chunking] [--output results.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmarks.bench_index_prep import columnar_prepare
+from benchmarks.synthetic_corpus import generate_defects, write_documents, write_wave_csvs
+from modules.genai.document_search import DocumentSearch
+from modules.genai.vector_store import VectorStore
+
+ETL_SCRIPTS = ['combine_acc.py', 'combine_sit.py', 'excel_converter_acc.py', 'excel_converter_sit.py']
+# utilities/defect_pipeline.py runs (wave CSVs to rows, without a database), by result name
+ETL_PIPELINE_RUNS = {
+    'defect_pipeline_s': ['defect_pipeline.py', '--no-db'],
+    'defect_pipeline_excel_s': ['defect_pipeline.py', '--no-db', '--excel'],
+}
+# Modules the scripts import from the utilities package
+ETL_MODULES = ['__init__.py', 'jira_csv.py', 'wave_ingest.py', 'defect_tables.py', 'mysql_connection.py', 'defect_pipeline.py']
+KEYWORD_COLUMNS = ["Summary", "Description", "Custom field (OSF-Fix Description)", "Comment"]
+KEYWORDS = ['timeout', 'SetMarketingPermissions', 'HTTP 500', 'retest', 'no-such-term']
+
+
+def median_time(fn, repeat: int) -> float:
+    """Median wall time of `repeat` calls in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings))
+
+
+def percentiles_ms(timings: list) -> dict:
+    ms = np.asarray(timings) * 1000
+    return {'p50_ms': round(float(np.percentile(ms, 50)), 3), 'p95_ms': round(float(np.percentile(ms, 95)), 3)}
+
+
+def random_embeddings(count: int, dim: int, seed: int) -> np.ndarray:
+    vectors = np.random.default_rng(seed).standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=project_root, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def load_embedding_service(model: str):
+    """EmbeddingService for `model`, or None if it cannot be loaded (e.g. offline)."""
+    try:
+        from modules.genai.embedding_service import EmbeddingService
+        service = EmbeddingService(model_name=model)
+        service.generate_embedding("warm up")
+        return service
+    except Exception as e:
+        print(f"  embedding model not available ({e}); using random vectors")
+        return None
+
+
+def bench_indexing(ctx: dict) -> dict:
+    acc, sit, repeat = ctx['acc'], ctx['sit'], ctx['repeat']
+    rows = len(acc) + len(sit)
+    prep_s = median_time(lambda: columnar_prepare(acc, sit), repeat)
+    texts, ids, documents, metadata = columnar_prepare(acc, sit)
+    results = {'rows': rows, 'prepare_s': round(prep_s, 4), 'prepare_rows_per_s': round(rows / prep_s)}
+
+    service = ctx['embedding_service']
+    if service is not None:
+        start = time.perf_counter()
+        embeddings = np.asarray(service.generate_embeddings(texts), dtype=np.float32)
+        embed_s = time.perf_counter() - start
+        results.update({'embed_s': round(embed_s, 3), 'embed_texts_per_s': round(rows / embed_s, 1)})
+    else:
+        embeddings = random_embeddings(rows, ctx['dim'], ctx['seed'])
+    ctx['embeddings'] = embeddings
+
+    all_defects = pd.concat([acc.assign(source='ACC'), sit.assign(source='SIT')], ignore_index=True)
+    tmp = tempfile.mkdtemp()
+    try:
+        store = VectorStore(persist_directory=tmp)
+        store_s = median_time(lambda: store.add_defects(all_defects, embeddings), repeat)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    results.update({'store_s': round(store_s, 4), 'store_rows_per_s': round(rows / store_s)})
+    return results
+
+
+def bench_vector_search(ctx: dict) -> dict:
+    acc, sit = ctx['acc'], ctx['sit']
+    embeddings = ctx.get('embeddings')
+    if embeddings is None:
+        embeddings = random_embeddings(len(acc) + len(sit), ctx['dim'], ctx['seed'])
+    all_defects = pd.concat([acc.assign(source='ACC'), sit.assign(source='SIT')], ignore_index=True)
+    # Queries near stored vectors, so the similarity threshold lets real result rows through
+    rng = np.random.default_rng(ctx['seed'] + 1)
+    picks = rng.choice(len(embeddings), size=ctx['queries'])
+    queries = embeddings[picks] + rng.normal(0, 0.05, (len(picks), embeddings.shape[1])).astype(np.float32)
+
+    results = {'vectors': len(embeddings), 'queries': len(queries)}
+    for precision in ('float32', 'float16', 'int8'):
+        tmp = tempfile.mkdtemp()
+        try:
+            store = VectorStore(persist_directory=tmp, precision=precision)
+            store.add_defects(all_defects, embeddings)
+            for query in queries[:5]:
+                store.search_similar_defects(query, n_results=5, min_similarity=0.3)
+            timings = []
+            for query in queries:
+                start = time.perf_counter()
+                store.search_similar_defects(query, n_results=5, min_similarity=0.3)
+                timings.append(time.perf_counter() - start)
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+        results[precision] = percentiles_ms(timings)
+    return results
+
+
+def bench_keyword_search(ctx: dict) -> dict:
+    acc, sit, repeat = ctx['acc'], ctx['sit'], ctx['repeat']
+
+    def portal_filter():
+        # Same masks as modules/search_keyword.py for every keyword over all searchable columns
+        for keyword in KEYWORDS:
+            for frame in (acc, sit):
+                mask = pd.Series([False] * len(frame))
+                for col in KEYWORD_COLUMNS:
+                    mask = mask | frame[col].astype(str).str.contains(keyword, case=False, na=False)
+                frame[mask]
+
+    results = {'rows': len(acc) + len(sit), 'keywords': len(KEYWORDS)}
+    results['portal_filter_ms_per_keyword'] = round(median_time(portal_filter, repeat) * 1000 / len(KEYWORDS), 3)
+
+    chunks = ctx.get('chunks')
+    if chunks:
+        tmp = tempfile.mkdtemp()
+        try:
+            store = VectorStore(persist_directory=tmp)
+            store.add_documents(chunks, random_embeddings(len(chunks), ctx['dim'], ctx['seed']).tolist())
+            queries = [f"An error was encountered while invoking KIAS-{k}" for k in KEYWORDS]
+            timings = []
+            for query in queries * repeat:
+                start = time.perf_counter()
+                store.search_documents_by_keywords(query, n_results=3)
+                timings.append(time.perf_counter() - start)
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+        results['document_chunks'] = len(chunks)
+        results['document_fallback'] = percentiles_ms(timings)
+    return results
+
+
+def bench_chunking(ctx: dict) -> dict:
+    tmp = tempfile.mkdtemp()
+    try:
+        docs = os.path.join(tmp, 'documents')
+        paths = write_documents(docs, count=ctx['docs'], words=ctx['doc_words'], seed=ctx['seed'])
+        search = DocumentSearch(
+            None, None, documents_path=docs, extraction_cache_dir=os.path.join(tmp, 'extraction_cache')
+        )
+        words = sum(len(Path(p).read_text(encoding='utf-8').split()) for p in paths)
+
+        def chunk_all():
+            return [chunk for path in paths for chunk in search._process_file(path)]
+
+        elapsed = median_time(chunk_all, ctx['repeat'])
+        chunks = chunk_all()
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    ctx['chunks'] = chunks
+    return {
+        'documents': len(paths),
+        'words': words,
+        'chunks': len(chunks),
+        'seconds': round(elapsed, 4),
+        'words_per_s': round(words / elapsed)
+    }
+
+
+def bench_etl(ctx: dict) -> dict:
+    tmp = tempfile.mkdtemp()
+    try:
+        # The scripts resolve their folders relative to their own location, so run copies in a scratch tree
+        os.makedirs(os.path.join(tmp, 'utilities'))
+        for script in ETL_SCRIPTS + ETL_MODULES:
+            shutil.copy(project_root / 'utilities' / script, os.path.join(tmp, 'utilities', script))
+        half = ctx['rows'] // 2
+        write_wave_csvs(os.path.join(tmp, 'combine_acc'), half, env='ACC', seed=ctx['seed'])
+        write_wave_csvs(os.path.join(tmp, 'combine_sit'), ctx['rows'] - half, env='SIT', seed=ctx['seed'] + 100)
+
+        results = {'rows': ctx['rows']}
+        runs = {script.replace('.py', '_s'): [script] for script in ETL_SCRIPTS}
+        runs.update(ETL_PIPELINE_RUNS)
+        for name, (script, *script_args) in runs.items():
+            def run():
+                subprocess.run(
+                    [sys.executable, os.path.join(tmp, 'utilities', script), *script_args],
+                    cwd=tmp, check=True, capture_output=True
+                )
+            try:
+                results[name] = round(median_time(run, ctx['repeat']), 3)
+            except subprocess.CalledProcessError as e:
+                error = e.stderr.decode('utf-8', errors='replace').strip().splitlines()
+                results[name[:-len('_s')] + '_error'] = error[-1] if error else f"exit code {e.returncode}"
+        # Process startup and imports are included; report them so they can be subtracted
+        results['python_startup_s'] = round(median_time(
+            lambda: subprocess.run([sys.executable, '-c', 'import pandas, openpyxl'], check=True), ctx['repeat']
+        ), 3)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return results
+
+
+# Run order matters: indexing provides the embeddings for vector_search, chunking the chunks for keyword_search
+BENCHMARKS = {
+    'indexing': bench_indexing,
+    'vector_search': bench_vector_search,
+    'chunking': bench_chunking,
+    'keyword_search': bench_keyword_search,
+    'etl': bench_etl,
+}
+
+
+def flatten(results: dict, prefix: str = '') -> dict:
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{name}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def print_comparison(old: dict, new: dict):
+    """Side-by-side numbers of two result files (timings: lower is better; *_per_s: higher is better)."""
+    old_flat, new_flat = flatten(old['results']), flatten(new['results'])
+    print(f"\nComparison {old['meta'].get('commit') or '?'} -> {new['meta'].get('commit') or '?'}")
+    if old['meta'].get('params') != new['meta'].get('params'):
+        print("  warning: runs used different parameters")
+    for name in sorted(set(old_flat) & set(new_flat)):
+        before, after = old_flat[name], new_flat[name]
+        change = f"{(after - before) / before * 100:+7.1f}%" if before else "      -"
+        print(f"  {name:<45} {before:>14,.3f} {after:>14,.3f} {change}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark suite on a synthetic ACC/SIT corpus.")
+    parser.add_argument("--rows", type=int, default=5000, help="Total defects (split evenly over ACC and SIT)")
+    parser.add_argument("--queries", type=int, default=200, help="Vector search queries")
+    parser.add_argument("--docs", type=int, default=20, help="Generated knowledge-base documents")
+    parser.add_argument("--doc-words", type=int, default=5000, help="Words per document")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per timing (median is reported)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--model", default="all-MiniLM-L6-v2", help="Embedding model for the indexing benchmark")
+    parser.add_argument("--skip-embedding", action="store_true", help="Use random vectors instead of the model")
+    parser.add_argument("--dim", type=int, default=384, help="Dimension of random vectors")
+    parser.add_argument("--only", default="", help=f"Comma-separated subset of: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--output", default="", help="Write results JSON to this file")
+    parser.add_argument("--compare", default="", help="Results JSON of an earlier run to compare against")
+    args = parser.parse_args()
+
+    selected = [name.strip() for name in args.only.split(',') if name.strip()] or list(BENCHMARKS)
+    unknown = set(selected) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(sorted(unknown))}")
+
+    half = args.rows // 2
+    ctx = {
+        'rows': args.rows,
+        'queries': args.queries,
+        'docs': args.docs,
+        'doc_words': args.doc_words,
+        'repeat': args.repeat,
+        'seed': args.seed,
+        'dim': args.dim,
+        'acc': generate_defects(half, env='ACC', seed=args.seed),
+        'sit': generate_defects(args.rows - half, env='SIT', seed=args.seed + 100),
+        'embedding_service': None,
+    }
+    if 'indexing' in selected and not args.skip_embedding:
+        ctx['embedding_service'] = load_embedding_service(args.model)
+        if ctx['embedding_service'] is not None:
+            ctx['dim'] = len(ctx['embedding_service'].generate_embedding("dimension"))
+
+    params = {k: getattr(args, k) for k in ('rows', 'queries', 'docs', 'doc_words', 'repeat', 'seed')}
+    params['embedding_model'] = args.model if ctx['embedding_service'] is not None else None
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'params': params
+        },
+        'results': {}
+    }
+
+    for name in BENCHMARKS:
+        if name not in selected:
+            continue
+        print(f"Running {name}...")
+        start = time.perf_counter()
+        report['results'][name] = BENCHMARKS[name](ctx)
+        print(f"  {json.dumps(report['results'][name])}  ({time.perf_counter() - start:.1f}s)")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            print_comparison(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+Synthetic defect corpus.
+Generates ACC/SIT defect data shaped like the real Jira exports in combine_acc/combine_sit
+(same column names, repeated column groups such as Comment/Fix Version/s, comments in the
+`dd/Mon/yy h:mm AM;author;text` format) and knowledge-base documents, at any size and
+fully determined by the seed, so benchmark runs are comparable across commits.
+
+    from benchmarks.synthetic_corpus import generate_defects, write_wave_csvs, write_documents
+"""
+
+import csv
+import os
+from datetime import datetime, timedelta
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_index_prep import DB_COLUMNS
+
+SYSTEMS = ['KIAS', 'SAP CRM', 'OSF-Billing', 'OSF-Payment', 'Order Management', 'Provisioning', 'eShop', 'MyVodafone App']
+STACKS = ['Frontend', 'Middleware', 'Backend', 'Integration', 'Database', 'Batch']
+VENDORS = ['Amdocs - CES', 'Amdocs - OMS', 'SAP - CRM', 'Vodafone - IT', 'Accenture - Web', 'TCS - Billing']
+OPERATIONS = ['SetMarketingPermissions', 'GetCustomerProfile', 'CreateOrder', 'SendDocument', 'ActivateSIM',
+              'PortInNumber', 'ChangeTariff', 'RenewSubscription', 'CapturePayment', 'GenerateInvoice']
+SYMPTOMS = ['fails with timeout', 'returns HTTP 500', 'shows wrong amount', 'is not triggered', 'hangs after submit',
+            'creates duplicate entries', 'returns empty response', 'rejects valid input', 'is stuck in pending status']
+CONTEXTS = ['during subscription renewal', 'for business customers', 'after tariff change', 'in the checkout flow',
+            'when porting a number', 'for prepaid contracts', 'in the nightly batch', 'on invoice generation']
+FIXES = ['Corrected the mapping in the {system} adapter', 'Increased the timeout for {operation}',
+         'Fixed null handling in {operation} response', 'Re-deployed {system} with the missing configuration',
+         'Data fix applied for affected orders', 'Rejected: works as designed', 'Duplicate of an existing defect']
+COMMENT_TEXTS = ['Issue is reproducible in {env}', 'Logs attached, please check {system}', 'Fix deployed, please retest',
+                 'Retested, issue is resolved now', 'Still failing after the fix', 'Assigning to {vendor} team',
+                 'Root cause identified in {operation}', 'Waiting for test data']
+STATUSES = ['Closed', 'Resolved', 'Open', 'In Progress', 'Reopened', 'Rejected']
+PRIORITIES = ['Blocker', 'Critical', 'Major', 'Minor', 'Trivial']
+RESOLUTIONS = ['Fixed', 'Done', "Won't Fix", 'Duplicate', 'Cannot Reproduce', '']
+AUTHORS = ['anna.schmidt@example.com', 'ravi.kumar@example.com', 'lukas.meyer@example.com', 'priya.nair@example.com']
+
+# Repeated column groups of the Jira CSV export (pandas reads them as Comment, Comment.1, ...)
+REPEATED_GROUPS = {'Fix Version/s': 3, 'Component/s': 2, 'Labels': 3, 'Watchers': 4, 'Comment': 6}
+
+
+def _comment_timestamp(when: datetime) -> str:
+    """Jira comment timestamp, e.g. '09/Oct/25 1:19 PM'."""
+    hour = when.hour % 12 or 12
+    return f"{when.strftime('%d/%b/%y')} {hour}:{when.strftime('%M %p')}"
+
+
+class _Generator:
+    """Seeded random source for one corpus."""
+
+    def __init__(self, seed: int):
+        self.rng = np.random.default_rng(seed)
+        self.start = datetime(2025, 1, 6, 9, 0)
+
+    def pick(self, values: List[str]) -> str:
+        return values[int(self.rng.integers(len(values)))]
+
+    def fill(self, template: str, **values) -> str:
+        return template.format(**values)
+
+    def defect(self, env: str, number: int, wave: str) -> dict:
+        system, operation = self.pick(SYSTEMS), self.pick(OPERATIONS)
+        vendor, stack = self.pick(VENDORS), self.pick(STACKS)
+        symptom, context = self.pick(SYMPTOMS), self.pick(CONTEXTS)
+        created = self.start + timedelta(minutes=int(self.rng.integers(0, 60 * 24 * 300)))
+        status = self.pick(STATUSES)
+        closed = status in ('Closed', 'Resolved', 'Rejected')
+
+        description = (
+            f"Steps: open {system} and call {operation} {context}.\n"
+            f"Actual: the call {symptom}. An error was encountered while invoking {system}-{operation}.\n"
+            f"Expected: {operation} completes successfully.\n"
+        ) * int(self.rng.integers(1, 4))
+        comments = []
+        when = created
+        for _ in range(int(self.rng.integers(0, REPEATED_GROUPS['Comment'] + 1))):
+            when += timedelta(minutes=int(self.rng.integers(30, 60 * 72)))
+            text = self.fill(self.pick(COMMENT_TEXTS), env=env, system=system, vendor=vendor, operation=operation)
+            comments.append(f"{_comment_timestamp(when)};{self.pick(AUTHORS)};{text}")
+
+        return {
+            'Summary': f"{system}: {operation} {symptom} {context}",
+            'Issue key': f"{env}-{number}",
+            'Issue id': str(100000 + number),
+            'Issue Type': 'Bug',
+            'Status': status,
+            'Priority': self.pick(PRIORITIES),
+            'Resolution': self.pick(RESOLUTIONS) if closed else '',
+            'Assignee': self.pick(AUTHORS),
+            'Reporter': self.pick(AUTHORS),
+            'Created': created.strftime('%d/%b/%y %I:%M %p'),
+            'Fix Version/s': [wave] + ([f"{wave}.1"] if self.rng.random() < 0.2 else []),
+            'Component/s': [stack] + ([system] if self.rng.random() < 0.3 else []),
+            'Labels': [env, system.replace(' ', '_')][:int(self.rng.integers(0, 3))],
+            'Watchers': [self.pick(AUTHORS) for _ in range(int(self.rng.integers(1, 4)))],
+            'Description': description,
+            'Custom field (OSF-Fix Description)': (
+                self.fill(self.pick(FIXES), system=system, operation=operation) if closed else ''
+            ),
+            'Custom field (OSF-Stack)': stack,
+            'Custom field (OSF-System)': system,
+            'Custom field (Vendor + Application)': vendor,
+            'Comment': comments
+        }
+
+
+def _export_header() -> List[str]:
+    """Column names of the raw Jira export, with repeated groups written as repeated names."""
+    header = ['Summary', 'Issue key', 'Issue id', 'Issue Type', 'Status', 'Priority', 'Resolution',
+              'Assignee', 'Reporter', 'Created']
+    for group in ('Fix Version/s', 'Component/s', 'Labels'):
+        header.extend([group] * REPEATED_GROUPS[group])
+    header.append('Description')
+    header.extend(['Watchers'] * REPEATED_GROUPS['Watchers'])
+    header.extend(['Custom field (OSF-Fix Description)', 'Custom field (OSF-Stack)',
+                   'Custom field (OSF-System)', 'Custom field (Vendor + Application)'])
+    header.extend(['Comment'] * REPEATED_GROUPS['Comment'])
+    return header
+
+
+def generate_defects(rows: int, env: str = 'ACC', seed: int = 0, wave: str = 'Wave 10.0') -> pd.DataFrame:
+    """
+    Defects shaped like defects_table_acc / defects_table_sit (the DB columns).
+
+    Args:
+        rows: Number of defects.
+        env: 'ACC' or 'SIT' (issue key prefix).
+        seed: Random seed.
+        wave: Fix Version/s value.
+
+    Returns:
+        DataFrame with bench_index_prep.DB_COLUMNS.
+    """
+    gen = _Generator(seed)
+    records = []
+    for number in range(1, rows + 1):
+        defect = gen.defect(env, number, wave)
+        for group in REPEATED_GROUPS:
+            # The ETL merges repeated columns with '\n ' (see utilities/excel_converter_*.py)
+            defect[group] = '\n '.join(defect[group])
+        records.append(defect)
+    return pd.DataFrame(records).reindex(columns=DB_COLUMNS, fill_value='')
+
+
+def write_wave_csv(path: str, rows: int, env: str = 'ACC', seed: int = 0, wave: str = 'Wave 10.0', first_number: int = 1):
+    """Write one raw Jira export CSV (repeated column names, as Jira exports them)."""
+    gen = _Generator(seed)
+    header = _export_header()
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        for number in range(first_number, first_number + rows):
+            defect = gen.defect(env, number, wave)
+            counters = {}
+            row = []
+            for name in header:
+                value = defect.get(name, '')
+                if isinstance(value, list):
+                    i = counters.get(name, 0)
+                    counters[name] = i + 1
+                    value = value[i] if i < len(value) else ''
+                row.append(value)
+            writer.writerow(row)
+
+
+def write_wave_csvs(folder: str, rows: int, env: str = 'ACC', waves: int = 3, seed: int = 0) -> List[str]:
+    """
+    Write `rows` defects split over several wave CSVs, like combine_acc/ and combine_sit/.
+
+    Returns:
+        Paths of the written files.
+    """
+    os.makedirs(folder, exist_ok=True)
+    paths = []
+    per_wave = max(1, rows // waves)
+    first = 1
+    for w in range(waves):
+        count = per_wave if w < waves - 1 else rows - per_wave * (waves - 1)
+        wave = f"Wave {8 + w}.0"
+        path = os.path.join(folder, f"{wave} Jira Defects.csv")
+        write_wave_csv(path, count, env=env, seed=seed + w, wave=wave, first_number=first)
+        paths.append(path)
+        first += count
+    return paths
+
+
+def write_documents(folder: str, count: int = 10, words: int = 5000, seed: int = 0, ext: str = '.md') -> List[str]:
+    """
+    Write knowledge-base style documents (headings, procedures, error tables) for chunking benchmarks.
+
+    Returns:
+        Paths of the written files.
+    """
+    os.makedirs(folder, exist_ok=True)
+    gen = _Generator(seed)
+    paths = []
+    for d in range(count):
+        system = SYSTEMS[d % len(SYSTEMS)]
+        lines = [f"# {system} Operations Guide {d + 1}", ""]
+        written = 0
+        section = 0
+        while written < words:
+            section += 1
+            operation = gen.pick(OPERATIONS)
+            lines += [f"## {section}. {operation}", ""]
+            for _ in range(int(gen.rng.integers(2, 6))):
+                sentence = (f"When {operation} {gen.pick(SYMPTOMS)} {gen.pick(CONTEXTS)}, check the {gen.pick(STACKS)} "
+                            f"logs of {system} and contact {gen.pick(VENDORS)}.")
+                lines.append(sentence)
+                written += len(sentence.split())
+            lines += ["", f"Error: An error was encountered while invoking {system}-{operation}", ""]
+            written += 8
+        path = os.path.join(folder, f"{system.replace(' ', '_')}_guide_{d + 1}{ext}")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines))
+        paths.append(path)
+    return paths
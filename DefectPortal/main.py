@@ -29,6 +29,10 @@ def main():
 
     initialize_session_state()
 
+    # Prometheus-style /metrics endpoint (background thread; only the first rerun of a process tries to start it)
+    from modules.genai.metrics import start_metrics_server_from_config
+    start_metrics_server_from_config()
+
     # Load UI
     load_css()
     load_font_css()
@@ -4,6 +4,9 @@ Provides the Streamlit UI components for the AI-powered defect search.
 """
 
 import html
+import os
+import re
+import threading
 import streamlit as st
 import pandas as pd
 import altair as alt
@@ -11,6 +14,8 @@ import logging
 from pathlib import Path
 from typing import Dict, Any, Optional, List
 
+from modules.genai.tracing import span, untraced
+
 logger = logging.getLogger(__name__)
 
 # Path to Recommended Logs Excel (under DefectPortal/data/)
@@ -44,30 +49,117 @@ def _resolve_document_display_name(metadata: Dict[str, Any]) -> str:
     return stored_name
 
 
+# Words of the usual error text ("An error was encountered while invoking ...") that never select a log row
+_LOG_SKIP_WORDS = {"error", "was", "while", "invoking", "encountered", "this", "that", "with", "for", "the", "and"}
+_LOG_TOKEN_PARTS = re.compile(r"[a-z0-9]+")
+
+# Recommended Logs table, loaded once per file version: {'stamp', 'frame', 'errors', 'index'}
+_recommended_logs = {}
+_recommended_logs_lock = threading.Lock()
+
+
+def _log_tokens(text: str, with_parts: bool = True) -> set:
+    """
+    Significant lower-case tokens of an error text: whitespace-separated words (edge
+    punctuation removed), longer than 3 characters and not generic error wording.
+    
+    Args:
+        text: Error description or query.
+        with_parts: Also add the alphanumeric parts of each word, so an indexed
+                    "KIAS-SetMarketingPermissions" is found by "kias" as well.
+    """
+    tokens = set()
+    for word in str(text).lower().split():
+        word = word.strip(".,;:!?()[]{}'\"")
+        for token in [word] + (_LOG_TOKEN_PARTS.findall(word) if with_parts else []):
+            if len(token) > 3 and token not in _LOG_SKIP_WORDS:
+                tokens.add(token)
+    return tokens
+
+
+def _recommended_logs_table() -> Optional[Dict[str, Any]]:
+    """
+    The Recommended Logs Excel with a token index over "Error Description", read once and
+    re-read only when the file's modification time or size changes.
+    """
+    try:
+        stat = os.stat(RECOMMENDED_LOGS_EXCEL)
+    except OSError:
+        logger.warning("Recommended Logs Excel not found: %s", RECOMMENDED_LOGS_EXCEL)
+        return None
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    with _recommended_logs_lock:
+        if _recommended_logs.get('stamp') == stamp:
+            return _recommended_logs
+        try:
+            df = pd.read_excel(RECOMMENDED_LOGS_EXCEL)
+        except Exception as e:
+            logger.error("Failed to load Recommended Logs Excel: %s", e)
+            df = pd.DataFrame()
+        errors, index = [], {}
+        if "Error Description" in df.columns:
+            errors = df["Error Description"].astype(str).str.lower().tolist()
+            for row, text in enumerate(errors):
+                for token in _log_tokens(text):
+                    index.setdefault(token, []).append(row)
+        _recommended_logs.update(stamp=stamp, frame=df, errors=errors, index=index)
+        logger.info("Loaded %d Recommended Logs rows (%d index tokens)", len(df), len(index))
+        return _recommended_logs
+
+
 def _load_recommended_logs_for_query(query: str) -> pd.DataFrame:
-    """Load Recommended Logs Excel and filter rows where Error Description matches the AI search query."""
+    """
+    Recommended Logs rows whose Error Description matches the AI search query, best match first.
+    Rows sharing more significant tokens with the query rank higher; a query without such
+    tokens (e.g. "OMS") matches rows that contain it as a whole.
+    """
     if not query or not query.strip():
         return pd.DataFrame()
-    if not RECOMMENDED_LOGS_EXCEL.exists():
-        logger.warning("Recommended Logs Excel not found: %s", RECOMMENDED_LOGS_EXCEL)
-        return pd.DataFrame()
-    try:
-        df = pd.read_excel(RECOMMENDED_LOGS_EXCEL)
-        if df.empty or "Error Description" not in df.columns:
-            return df
-        q = str(query).strip().lower()
-        err_col = df["Error Description"].astype(str).str.lower()
-        # Match rows where query appears in Error Description
-        mask = err_col.str.contains(q, na=False, regex=False)
-        # Also match if any significant token from query (e.g. KIAS-SetMarketingPermissions) is in error
-        skip_words = {"error", "was", "while", "invoking", "encountered", "this", "that", "with", "for", "the", "and"}
-        for part in q.split():
-            if len(part) > 3 and part not in skip_words:
-                mask = mask | err_col.str.contains(part, na=False, regex=False)
-        return df.loc[mask].drop_duplicates().reset_index(drop=True)
-    except Exception as e:
-        logger.error("Failed to load Recommended Logs Excel: %s", e)
+    table = _recommended_logs_table()
+    if table is None:
         return pd.DataFrame()
+    df = table['frame']
+    if df.empty or "Error Description" not in df.columns:
+        return df
+    q = str(query).strip().lower()
+    overlap = {}
+    for token in _log_tokens(q, with_parts=False):
+        for row in table['index'].get(token, ()):
+            overlap[row] = overlap.get(row, 0) + 1
+    if not overlap:
+        overlap = {row: 1 for row, text in enumerate(table['errors']) if q in text}
+    errors = table['errors']
+    # Most shared tokens first, then rows containing the whole query, then file order
+    rows = sorted(overlap, key=lambda row: (-overlap[row], q not in errors[row], row))
+    return df.iloc[rows].drop_duplicates().reset_index(drop=True)
+
+def _render_ai_loading_status(enhanced_search):
+    """Show background initialization progress; reruns the app once the AI services are ready."""
+    progress = enhanced_search.get_init_progress()
+    if progress['error']:
+        st.error(f"AI Search system could not be initialized: {progress['error']}")
+        if st.button("🔄 Retry", key="ai_init_retry"):
+            st.session_state.pop('genai_system', None)
+            st.rerun()
+        return
+    if enhanced_search.is_ready():
+        st.rerun()
+    
+    completed, total = progress['completed'], progress['total']
+    st.progress(completed / total, text=f"⏳ Starting AI Search ({completed}/{total})...")
+    for stage in progress['stages']:
+        icon = {'ready': '✅', 'loading': '⏳', 'failed': '❌'}.get(stage['state'], '⏳')
+        st.caption(f"{icon} {stage['label']}")
+    st.caption("Quick Defect Search and the defect tables can be used meanwhile.")
+    if _fragment is None:
+        st.button("🔄 Refresh", key="ai_init_refresh")
+
+
+# Poll the loading status without rerunning the whole page (st.fragment needs Streamlit >= 1.37)
+_fragment = getattr(st, 'fragment', None)
+if _fragment is not None:
+    _render_ai_loading_status = _fragment(run_every=1.0)(_render_ai_loading_status)
+
 
 def render_ai_search_section(defect_data_acc: pd.DataFrame, defect_data_sit: pd.DataFrame):
     """
@@ -82,7 +174,7 @@ def render_ai_search_section(defect_data_acc: pd.DataFrame, defect_data_sit: pd.
     
     # Initialize GenAI system
     try:
-        from modules.genai.enhanced_search import EnhancedSearch, initialize_genai_system
+        from modules.genai.enhanced_search import initialize_genai_system
         
         # Get or initialize the GenAI system
         enhanced_search = initialize_genai_system(defect_data_acc, defect_data_sit)
@@ -91,6 +183,11 @@ def render_ai_search_section(defect_data_acc: pd.DataFrame, defect_data_sit: pd.
             st.error("AI Search system could not be initialized.")
             return
         
+        # Services are still loading in the background
+        if not enhanced_search.is_ready():
+            _render_ai_loading_status(enhanced_search)
+            return
+        
         # Show system status
         with st.expander("🔧 AI System Status", expanded=False):
             status = enhanced_search.get_status()
@@ -116,28 +213,37 @@ def render_ai_search_section(defect_data_acc: pd.DataFrame, defect_data_sit: pd.
         with col2:
             search_button = st.button("🚀 AI Search", key="ai_search_btn", use_container_width=True)
         
-        # Perform search
-        if search_button and query:
-            with st.spinner("🔍 Performing AI-enhanced search..."):
-                results = enhanced_search.search(
-                    query=query,
-                    defects_acc=defect_data_acc,
-                    defects_sit=defect_data_sit,
-                    n_similar_defects=5,
-                    n_related_docs=3,
-                    min_similarity=0.3
-                )
-                
-                # Store results in session state
-                st.session_state['ai_search_results'] = results
-        
-        # Display results if available
-        if 'ai_search_results' in st.session_state and st.session_state['ai_search_results']:
-            display_ai_search_results(
-                st.session_state['ai_search_results'],
-                defect_data_acc=defect_data_acc,
-                defect_data_sit=defect_data_sit,
-            )
+        # Perform search and render inside one trace, so the Performance panel shows the whole request.
+        # Reruns without a search (any widget interaction) only redraw and are not traced.
+        searched = bool(search_button and query)
+        with (span("ui.ai_search") if searched else untraced()) as request_span:
+            if searched:
+                with st.spinner("🔍 Performing AI-enhanced search..."):
+                    results = enhanced_search.search(
+                        query=query,
+                        defects_acc=defect_data_acc,
+                        defects_sit=defect_data_sit,
+                        n_similar_defects=5,
+                        n_related_docs=3,
+                        min_similarity=0.3
+                    )
+                    
+                    # Store results in session state
+                    st.session_state['ai_search_results'] = results
+            
+            # Display results if available
+            if 'ai_search_results' in st.session_state and st.session_state['ai_search_results']:
+                with span("ui.render_results"):
+                    display_ai_search_results(
+                        st.session_state['ai_search_results'],
+                        defect_data_acc=defect_data_acc,
+                        defect_data_sit=defect_data_sit,
+                    )
+        if searched:
+            st.session_state['ai_search_trace'] = request_span.trace.to_records()
+        
+        if _show_performance_panel() and st.session_state.get('ai_search_trace'):
+            render_performance_panel(st.session_state['ai_search_trace'])
     
     except ImportError as e:
         st.warning(f"AI Search module not fully installed. Please install required packages: {e}")
@@ -147,6 +253,70 @@ def render_ai_search_section(defect_data_acc: pd.DataFrame, defect_data_sit: pd.
         st.error(f"AI Search error: {e}")
 
 
+def _ready_timeout() -> float:
+    """Seconds a request waits for the AI services to finish loading (ui.ready_timeout_seconds in genai_config.yaml)."""
+    from modules.genai.config import get_config_section
+    return float(get_config_section('ui').get('ready_timeout_seconds', 10))
+
+
+def _wait_for_ai_services(enhanced_search) -> bool:
+    """
+    Wait a bounded time for background initialization; show the loading progress or the
+    initialization error if the AI services are not ready by then.
+    
+    Returns:
+        True if the services are ready.
+    """
+    try:
+        if enhanced_search.wait_until_ready(timeout=_ready_timeout()):
+            return True
+    except Exception as e:
+        st.error(f"AI Search system could not be initialized: {e}")
+        return False
+    progress = enhanced_search.get_init_progress()
+    if progress.get('error'):
+        st.error(f"AI Search system could not be initialized: {progress['error']}")
+    else:
+        st.warning(f"⏳ AI Search is still starting ({progress['completed']}/{progress['total']}). Please try again shortly.")
+    return False
+
+
+def _show_performance_panel() -> bool:
+    """Whether the per-stage timing panel is enabled (ui.show_performance_panel in genai_config.yaml)."""
+    from modules.genai.config import get_config_section
+    return bool(get_config_section('ui').get('show_performance_panel', True))
+
+
+def render_performance_panel(spans: List[Dict[str, Any]]):
+    """
+    Show the timing spans of the last AI search as a waterfall.
+    
+    Args:
+        spans: Span records from tracing.Trace.to_records() (root first).
+    """
+    if not spans:
+        return
+    with st.expander("⏱️ Performance", expanded=False):
+        df = pd.DataFrame(spans)
+        df['end_ms'] = df['start_ms'] + df['duration_ms']
+        # Number the rows (stage names repeat) and indent by nesting depth; keep start order on the y axis
+        df['stage'] = [f"{i + 1:02d} {'· ' * d}{name}" for i, (d, name) in enumerate(zip(df['depth'], df['name']))]
+        st.caption(f"Last AI search: {df['duration_ms'].iloc[0]:.0f} ms total ({len(df)} spans)")
+        waterfall = alt.Chart(df).mark_bar().encode(
+            x=alt.X('start_ms:Q', title='ms since request start'),
+            x2='end_ms:Q',
+            y=alt.Y('stage:N', sort=list(df['stage']), title=None),
+            color=alt.Color('depth:O', legend=None),
+            tooltip=['name', 'start_ms', 'duration_ms', 'thread']
+        ).properties(height=max(120, 24 * len(df)))
+        st.altair_chart(waterfall, use_container_width=True)
+        st.dataframe(
+            df[['stage', 'start_ms', 'duration_ms', 'thread']],
+            hide_index=True,
+            use_container_width=True
+        )
+
+
 def _get_fix_description_from_db(
     issue_key: str,
     defect_data_acc: Optional[pd.DataFrame],
@@ -352,6 +522,13 @@ def display_ai_search_results(
                 source = metadata.get('source', '')
                 if source:
                     st.markdown(f"**Environment:** {source}")
+                
+                # Near-duplicates collapsed into this defect (see utilities/detect_duplicate_defects.py)
+                duplicates = defect.get('duplicates', [])
+                if duplicates:
+                    dup_links = ", ".join(f'<a href="{jira_base_url}/{html.escape(k)}" target="_blank" style="color: #1a73e8; text-decoration: none;">{html.escape(k)}</a>' for k in duplicates[:10])
+                    more = f" (+{len(duplicates) - 10} more)" if len(duplicates) > 10 else ""
+                    st.markdown(f"**Also raised as:** {dup_links}{more}", unsafe_allow_html=True)
     
     # 4. AI Suggested Resolutions (suggestion cards + root causes; AI analysis text is in section 1)
     resolution_data = results.get('resolution_suggestions', {})
@@ -437,7 +614,9 @@ def display_ai_search_results(
     st.markdown("")
     related_docs = results.get('related_documents', [])
     search_query = results.get('query', '')
-    logs_df = _load_recommended_logs_for_query(search_query)
+    with span("ui.recommended_logs_lookup") as stage:
+        logs_df = _load_recommended_logs_for_query(search_query)
+        stage.set(rows=len(logs_df))
 
     # Narrower col for docs, thin separator, wider col for logs table
     col_docs, col_sep, col_logs = st.columns([1, 0.03, 2])
@@ -813,11 +992,13 @@ def render_defect_analysis_modal(defect: Dict[str, Any]):
         defect: The defect to analyze.
     """
     try:
-        from modules.genai.enhanced_search import EnhancedSearch
+        from modules.genai.enhanced_search import get_search_backend
         
-        enhanced_search = EnhancedSearch()
+        enhanced_search = st.session_state.get('genai_system') or get_search_backend()
         
         with st.spinner("🔍 Analyzing defect..."):
+            if not _wait_for_ai_services(enhanced_search):
+                return
             results = enhanced_search.analyze_defect(defect)
         
         # Display results
@@ -875,14 +1056,24 @@ def render_genai_sidebar():
             st.success("Defects will be re-indexed from DB on next load. Refresh the page.")
         
         st.caption("Add new .docx, .pdf, .md, .txt to **knowledge_base/documents** and click below to index them for the Related Documents section.")
-        # Index documents (force_reindex=True so new .docx and other files in knowledge_base/documents are included)
+        # Index documents (force_reindex=True: only added, changed and removed files are processed)
         if st.button("📚 Index Knowledge Base", key="index_docs_btn"):
             try:
-                from modules.genai.enhanced_search import EnhancedSearch
-                enhanced_search = EnhancedSearch()
+                from modules.genai.enhanced_search import get_search_backend
+                enhanced_search = st.session_state.get('genai_system') or get_search_backend()
                 with st.spinner("Indexing documents (including any new .docx, .pdf, .md, .txt in knowledge_base/documents)..."):
-                    enhanced_search.document_search.load_and_index_documents(force_reindex=True)
-                st.success("Documents indexed successfully! New documents will appear in Related Knowledge Documents when relevant.")
+                    # None: still loading or failed (_wait_for_ai_services showed which)
+                    changes = None
+                    if _wait_for_ai_services(enhanced_search):
+                        changes = enhanced_search.index_documents(force_reindex=True) or {}
+                if changes is not None:
+                    if changes.get('added') or changes.get('changed') or changes.get('removed'):
+                        st.success(
+                            f"Documents indexed: {len(changes.get('added', []))} added, {len(changes.get('changed', []))} changed, "
+                            f"{len(changes.get('removed', []))} removed. New documents will appear in Related Knowledge Documents when relevant."
+                        )
+                    else:
+                        st.success("Knowledge base is up to date - no new or changed documents.")
             except Exception as e:
                 st.error(f"Failed to index documents: {e}")
         
@@ -5,11 +5,15 @@ import streamlit as st
 
 logger = setup_logger()
 
-def get_db_engine():
+def create_db_engine():
     """
-    connects to our mysql database and returns a SQLAlchemy engine object.
+    Builds the SQLAlchemy engine for our mysql database without any Streamlit calls
+    (for the search service and command-line tools).
+
+    Raises:
+        RuntimeError: If the engine cannot be created.
     """
-    # --- Database Connection ---     
+    # --- Database Connection ---
     try:
         # Define SQLAlchemy connection string
         username = 'root'
@@ -25,8 +29,18 @@ def get_db_engine():
         engine = create_engine(f"mysql+mysqlconnector://{username}:{encoded_password}@{host}/{database}")
         logger.info(" Database connection established successfully")
         return engine
-        
+
     except Exception as e:
         logger.error(" Database connection failed: %s", e)
-        st.error(f"Database connection error: {e}")
-        st.stop()
\ No newline at end of file
+        raise RuntimeError(f"Database connection error: {e}") from e
+
+def get_db_engine():
+    """
+    connects to our mysql database and returns a SQLAlchemy engine object.
+    Shows the error and stops the Streamlit script if the connection fails.
+    """
+    try:
+        return create_db_engine()
+    except RuntimeError as e:
+        st.error(str(e))
+        st.stop()
@@ -12,6 +12,7 @@ from .llm_service import LLMService
 from .resolution_suggester import ResolutionSuggester
 from .context_summarizer import ContextSummarizer
 from .enhanced_search import EnhancedSearch
+from .duplicate_detector import DuplicateDetector
 
 __all__ = [
     'EmbeddingService',
@@ -21,5 +22,6 @@ __all__ = [
     'LLMService',
     'ResolutionSuggester',
     'ContextSummarizer',
-    'EnhancedSearch'
+    'EnhancedSearch',
+    'DuplicateDetector'
 ]
@@ -0,0 +1,239 @@
+"""
+Chunking Module
+Token-aware, structure-aware splitting of knowledge-base text into chunks that fit the
+embedding model's input.
+
+all-MiniLM-L6-v2 reads at most 256 word-pieces (max_seq_length); anything after that in a
+chunk is never embedded. TokenChunker therefore measures text with the model's tokenizer
+and packs whole paragraphs (then lines, sentences and, as a last resort, words) into chunks
+of at most that many tokens. Headings start a new chunk and are repeated at the top of
+every chunk of their section, so each chunk carries its context and
+DocumentSearch._extract_section finds the section title in it.
+
+    chunker = TokenChunker(embedding_service.count_tokens, max_tokens=254, overlap_tokens=32)
+    for chunk in chunker.iter_chunks(blocks):
+        ...
+"""
+
+import logging
+import re
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Headings longer than this are treated as text (same limit as DocumentSearch._extract_section)
+HEADING_MAX_CHARS = 100
+# A paragraph without a blank line is cut after this many characters (bounds memory per step)
+MAX_PARAGRAPH_CHARS = 20000
+# Paragraphs measured per tokenizer call
+COUNT_BATCH = 256
+
+_PARAGRAPH_BREAK = re.compile(r'\n[ \t\r\f\v]*\n')
+_SENTENCE_END = re.compile(r'(?<=[.!?;])\s+')
+_APPROX_PIECES = re.compile(r'\w+|[^\w\s]')
+
+# Separators between the pieces of a chunk, by how the piece was split off
+PARAGRAPH, LINE, WORD = "\n\n", "\n", " "
+
+
+def approximate_token_counts(texts: List[str]) -> List[int]:
+    """Word and punctuation count per text: a stand-in when no model tokenizer is available."""
+    return [len(_APPROX_PIECES.findall(t)) for t in texts]
+
+
+def is_heading(line: str) -> bool:
+    """
+    Whether a line is a section heading: a Markdown heading, a short all-caps line, or a
+    short label ending in a colon (the patterns _extract_section recognises).
+    """
+    line = line.strip()
+    if not line or len(line) >= HEADING_MAX_CHARS:
+        return False
+    if line.startswith('#'):
+        return True
+    letters = sum(c.isalpha() for c in line)
+    if line.isupper() and letters >= 4:
+        return True
+    return line.endswith(':') and letters >= 2 and len(line.split()) <= 8
+
+
+def _cut_long(text: str, max_chars: int) -> Tuple[List[str], str]:
+    """Cut pieces of at most max_chars off the front of text (at a line break or whitespace); returns (pieces, rest)."""
+    pieces = []
+    while len(text) > max_chars:
+        cut = text.rfind('\n', 0, max_chars)
+        if cut <= 0:
+            cut = text.rfind(' ', 0, max_chars)
+        if cut <= 0:
+            cut = max_chars
+        pieces.append(text[:cut])
+        text = text[cut:]
+    return pieces, text
+
+
+def iter_paragraphs(blocks: Iterable[str], max_chars: int = MAX_PARAGRAPH_CHARS) -> Iterator[str]:
+    """
+    Split streamed text at blank lines. A paragraph longer than max_chars is cut at its last
+    line break (or whitespace) before the limit.
+    """
+    buffer = ''
+    for block in blocks:
+        buffer += block
+        start = 0
+        for match in _PARAGRAPH_BREAK.finditer(buffer):
+            pieces, rest = _cut_long(buffer[start:match.start()], max_chars)
+            for paragraph in pieces + [rest]:
+                if paragraph.strip():
+                    yield paragraph
+            start = match.end()
+        pieces, buffer = _cut_long(buffer[start:], max_chars)
+        for paragraph in pieces:
+            if paragraph.strip():
+                yield paragraph
+    if buffer.strip():
+        yield buffer
+
+
+class TokenChunker:
+    """
+    Packs paragraphs into chunks of at most max_tokens model tokens, starting a new chunk at
+    each heading.
+    """
+
+    def __init__(
+        self,
+        count_tokens: Optional[Callable[[List[str]], List[int]]] = None,
+        max_tokens: int = 254,
+        overlap_tokens: int = 32
+    ):
+        """
+        Args:
+            count_tokens: Token count of each text without special tokens
+                          (e.g. EmbeddingService.count_tokens); word count approximation if None.
+            max_tokens: Tokens per chunk, including the repeated heading
+                        (the model's max_seq_length minus its special tokens).
+            overlap_tokens: Up to this many tokens of trailing text are repeated at the start
+                            of the next chunk of the same section.
+        """
+        self.count_tokens = count_tokens or approximate_token_counts
+        self.max_tokens = max(16, int(max_tokens))
+        self.overlap_tokens = max(0, min(int(overlap_tokens), self.max_tokens // 4))
+
+    @property
+    def signature(self) -> str:
+        """Identifies the chunking settings (stored with indexed files to detect a change)."""
+        return f"tokens-{self.max_tokens}-{self.overlap_tokens}"
+
+    def iter_chunks(self, blocks: Iterable[str]) -> Iterator[str]:
+        """
+        Chunk streamed text.
+
+        Args:
+            blocks: Text blocks (see document_extraction.iter_documents).
+
+        Yields:
+            Chunk texts.
+        """
+        heading, heading_tokens = '', 0
+        pieces: List[Tuple[str, int, str]] = []   # (text, tokens, separator before it)
+        used = 0
+        body_since_heading = False
+
+        def emit():
+            texts = [heading] if heading else []
+            body = "".join((sep if i else '') + text for i, (text, _, sep) in enumerate(pieces))
+            return "\n".join(texts + [body])
+
+        def overlap_tail():
+            """Trailing pieces carried into the next chunk."""
+            tail, tokens = [], 0
+            for piece in reversed(pieces[1:]):
+                if tokens + piece[1] > self.overlap_tokens:
+                    break
+                tail.insert(0, piece)
+                tokens += piece[1]
+            return tail, tokens
+
+        for kind, text, tokens in self._iter_units(blocks):
+            if kind == 'heading':
+                if pieces and body_since_heading:
+                    yield emit()
+                if heading and not body_since_heading:
+                    # Consecutive headings (e.g. document title, then first section) stay together
+                    text, tokens = f"{heading}\n{text}", heading_tokens + tokens
+                if tokens <= self.max_tokens // 2:
+                    heading, heading_tokens = text, tokens
+                    pieces, used, body_since_heading = [], 0, False
+                    continue
+                # Too long to repeat in every chunk: index it as text
+                heading, heading_tokens = '', 0
+                pieces, used = [], 0
+            body_since_heading = True
+            available = self.max_tokens - heading_tokens
+            for piece in self._fit(text, tokens, available):
+                if pieces and used + piece[1] > available:
+                    yield emit()
+                    pieces, used = overlap_tail()
+                    if used + piece[1] > available:
+                        pieces, used = [], 0
+                pieces.append(piece)
+                used += piece[1]
+        if pieces:
+            yield emit()
+        elif heading and not body_since_heading:
+            yield heading
+
+    def _iter_units(self, blocks: Iterable[str]) -> Iterator[Tuple[str, str, int]]:
+        """(kind, text, tokens) per heading line and paragraph, measured in batches."""
+        pending: List[Tuple[str, str]] = []
+        for paragraph in iter_paragraphs(blocks):
+            lines = paragraph.strip('\n').split('\n')
+            # Heading lines at the top of a paragraph (e.g. "# Title" directly followed by text)
+            while lines and is_heading(lines[0]):
+                pending.append(('heading', lines.pop(0).strip()))
+            body = "\n".join(lines).strip()
+            if body:
+                pending.append(('paragraph', body))
+            if len(pending) >= COUNT_BATCH:
+                yield from self._measure(pending)
+                pending = []
+        if pending:
+            yield from self._measure(pending)
+
+    def _measure(self, units: List[Tuple[str, str]]) -> Iterator[Tuple[str, str, int]]:
+        counts = self.count_tokens([text for _, text in units])
+        for (kind, text), tokens in zip(units, counts):
+            yield kind, text, int(tokens)
+
+    def _fit(self, text: str, tokens: int, available: int) -> List[Tuple[str, int, str]]:
+        """Split a paragraph into pieces of at most `available` tokens (lines, then sentences, then words)."""
+        if tokens <= available:
+            return [(text, tokens, PARAGRAPH)]
+        for pattern, separator in ((r'\n', LINE), (_SENTENCE_END, WORD)):
+            parts = [p.strip() for p in re.split(pattern, text) if p.strip()]
+            if len(parts) > 1:
+                pieces = []
+                for part, count in zip(parts, self.count_tokens(parts)):
+                    pieces.extend(self._fit(part, int(count), available))
+                pieces[0] = (pieces[0][0], pieces[0][1], PARAGRAPH)
+                for i in range(1, len(pieces)):
+                    if pieces[i][2] == PARAGRAPH:
+                        pieces[i] = (pieces[i][0], pieces[i][1], separator)
+                return pieces
+        return self._fit_words(text, available)
+
+    def _fit_words(self, text: str, available: int) -> List[Tuple[str, int, str]]:
+        """Pack the words of one long sentence into pieces of at most `available` tokens."""
+        words = text.split()
+        counts = self.count_tokens(words)
+        pieces, current, used = [], [], 0
+        for word, count in zip(words, counts):
+            count = min(int(count), available)
+            if current and used + count > available:
+                pieces.append((" ".join(current), used, WORD if pieces else PARAGRAPH))
+                current, used = [], 0
+            current.append(word)
+            used += count
+        if current:
+            pieces.append((" ".join(current), used, WORD if pieces else PARAGRAPH))
+        return pieces
@@ -0,0 +1,50 @@
+"""
+GenAI Configuration Loader
+Reads config/genai_config.yaml so services can be tuned without code changes.
+"""
+
+import logging
+from pathlib import Path
+from typing import Dict, Any
+
+logger = logging.getLogger(__name__)
+
+CONFIG_PATH = Path(__file__).resolve().parent.parent.parent / "config" / "genai_config.yaml"
+
+
+def load_genai_config(path: str = None) -> Dict[str, Any]:
+    """
+    Load the GenAI configuration file.
+
+    Args:
+        path: Path to the YAML file. Defaults to config/genai_config.yaml.
+
+    Returns:
+        Configuration dictionary (empty if the file is missing or unreadable).
+    """
+    config_path = Path(path) if path else CONFIG_PATH
+    if not config_path.exists():
+        logger.warning(f"GenAI config not found: {config_path}. Using defaults.")
+        return {}
+    try:
+        import yaml
+        with open(config_path, 'r', encoding='utf-8') as f:
+            return yaml.safe_load(f) or {}
+    except Exception as e:
+        logger.warning(f"Could not load GenAI config: {e}. Using defaults.")
+        return {}
+
+
+def get_config_section(name: str, path: str = None) -> Dict[str, Any]:
+    """
+    Get one section of the GenAI configuration (e.g. 'embedding').
+
+    Args:
+        name: Top-level section name.
+        path: Optional path to the YAML file.
+
+    Returns:
+        Section dictionary (empty if missing).
+    """
+    section = load_genai_config(path).get(name)
+    return section if isinstance(section, dict) else {}
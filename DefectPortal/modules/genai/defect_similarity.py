@@ -7,6 +7,8 @@ import logging
 import pandas as pd
 from typing import List, Dict, Any, Optional, Tuple
 
+from .tracing import span
+
 logger = logging.getLogger(__name__)
 
 class DefectSimilaritySearch:
@@ -56,29 +58,24 @@ class DefectSimilaritySearch:
         
         logger.info("Indexing defects for similarity search...")
         
-        all_defects = []
-        all_texts = []
-        
-        # Process ACC defects
+        # Combine ACC and SIT column-wise (columns missing in one source are empty, like dict.get(col, ''))
+        frames = []
         if defects_acc is not None and not defects_acc.empty:
-            for _, row in defects_acc.iterrows():
-                defect = row.to_dict()
-                defect['source'] = 'ACC'
-                all_defects.append(defect)
-                all_texts.append(self.embedding_service.create_defect_text(defect))
-        
-        # Process SIT defects
+            frames.append(defects_acc.assign(source='ACC'))
         if defects_sit is not None and not defects_sit.empty:
-            for _, row in defects_sit.iterrows():
-                defect = row.to_dict()
-                defect['source'] = 'SIT'
-                all_defects.append(defect)
-                all_texts.append(self.embedding_service.create_defect_text(defect))
+            frames.append(defects_sit.assign(source='SIT'))
         
-        if not all_defects:
+        if not frames:
             logger.warning("No defects to index")
             return
         
+        columns = list(dict.fromkeys(col for frame in frames for col in frame.columns))
+        all_defects = pd.concat(
+            [frame.reindex(columns=columns, fill_value='') for frame in frames],
+            ignore_index=True
+        )
+        all_texts = self.embedding_service.create_defect_texts(all_defects)
+        
         # Clear existing defects before re-indexing
         if cached_count > 0:
             logger.info("Clearing old cache for fresh indexing...")
@@ -86,7 +83,7 @@ class DefectSimilaritySearch:
         
         # Generate embeddings in batches (larger batch = faster indexing)
         logger.info(f"Generating embeddings for {len(all_defects)} defects...")
-        batch_size = 256
+        batch_size = self.embedding_service.bulk_batch_size
         all_embeddings = []
         
         for i in range(0, len(all_texts), batch_size):
@@ -137,6 +134,45 @@ class DefectSimilaritySearch:
         
         return similar
     
+    def find_similar_batch(
+        self,
+        defects: List[Dict[str, Any]],
+        n_results: int = 5,
+        min_similarity: float = 0.5,
+        exclude_self: bool = True
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Find similar defects for many defects at once (one batched embedding call).
+        
+        Args:
+            defects: Defects to find similarities for.
+            n_results: Maximum number of similar defects per defect.
+            min_similarity: Minimum similarity threshold (0-1).
+            exclude_self: Whether to exclude each defect from its own results.
+            
+        Returns:
+            One list of similar defects per input defect, in input order.
+        """
+        if not defects:
+            return []
+        
+        texts = [self.embedding_service.create_defect_text(d) for d in defects]
+        embeddings = self.embedding_service.generate_embeddings(texts)
+        
+        results = []
+        for defect, embedding in zip(defects, embeddings):
+            similar = self.vector_store.search_similar_defects(
+                embedding,
+                n_results=n_results + 1 if exclude_self else n_results,
+                min_similarity=min_similarity
+            )
+            if exclude_self:
+                current_key = defect.get('Issue key', '')
+                similar = [s for s in similar if s.get('issue_key') != current_key][:n_results]
+            results.append(similar)
+        
+        return results
+    
     def search_by_text(
         self,
         query_text: str,
@@ -158,14 +194,16 @@ class DefectSimilaritySearch:
             return []
         
         # Generate embedding for query
-        query_embedding = self.embedding_service.generate_embedding(query_text)
+        with span("embedding.query"):
+            query_embedding = self.embedding_service.generate_embedding(query_text)
         
         # Search in vector store
-        results = self.vector_store.search_similar_defects(
-            query_embedding,
-            n_results=n_results,
-            min_similarity=min_similarity
-        )
+        with span("vector_store.search_defects"):
+            results = self.vector_store.search_similar_defects(
+                query_embedding,
+                n_results=n_results,
+                min_similarity=min_similarity
+            )
         
         return results
     
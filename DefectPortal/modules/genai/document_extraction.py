@@ -0,0 +1,383 @@
+"""
+Document Extraction Module
+Text extraction for knowledge-base files (PDF, DOCX, TXT/MD) with a per-file on-disk cache
+and a process pool for the slow formats.
+
+Text is produced as a stream of blocks (a PDF page, a DOCX paragraph, a slice of a text
+file), so a file of any size can be chunked and indexed without holding all of its text
+in memory. Joining the blocks gives the complete text.
+
+Extracted PDF/DOCX text is cached by content hash; a small index maps each path to its last
+seen (size, mtime, sha256). Unchanged files are served from the cache without being read
+again, a touched but identical file costs one hash, and only new or changed files are
+extracted - in parallel worker processes (which write straight into the cache) when there
+are several of them.
+
+    cache = ExtractionCache("knowledge_base/extraction_cache")
+    for path, blocks in iter_documents(paths, cache=cache, workers=4):
+        ...
+    texts = extract_documents(paths, cache=cache)   # {path: text}, for small files
+
+A file whose text cannot be extracted (unreadable, or its library is not installed) raises
+ExtractionError when its blocks are read, so callers can tell it from a file without text.
+"""
+
+import codecs
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Formats whose extraction is slow enough to cache and parallelise; .txt/.md are read directly
+EXTRACTED_FORMATS = ('.pdf', '.docx')
+INDEX_FILE = "index.json"
+CACHE_SUFFIX = ".txt.z"
+# Characters per block when reading text files and the cache (bounds memory per step)
+BLOCK_CHARS = 1 << 20
+
+
+class ExtractionError(Exception):
+    """The text of a file could not be extracted (unreadable file, extraction library missing)."""
+
+
+def iter_pdf_text(filepath: str) -> Iterator[str]:
+    """Text of a PDF file, one page per block."""
+    try:
+        import pypdf
+    except ImportError:
+        raise ExtractionError("pypdf not installed")
+    with open(filepath, 'rb') as f:
+        reader = pypdf.PdfReader(f)
+        for i, page in enumerate(reader.pages):
+            yield ("\n" if i else "") + (page.extract_text() or '')
+
+
+def iter_docx_text(filepath: str) -> Iterator[str]:
+    """Text of a DOCX file (paragraphs, then table rows), one block each."""
+    try:
+        from docx import Document
+    except ImportError:
+        raise ExtractionError("python-docx not installed")
+    doc = Document(filepath)
+    first = True
+    for p in doc.paragraphs:
+        if p.text.strip():
+            yield p.text if first else "\n" + p.text
+            first = False
+    for table in doc.tables:
+        for row in table.rows:
+            row_text = " | ".join(cell.text.strip() for cell in row.cells if cell.text.strip())
+            if row_text:
+                yield row_text if first else "\n" + row_text
+                first = False
+
+
+def iter_plain_text(filepath: str) -> Iterator[str]:
+    """Text of a .txt/.md file in blocks of BLOCK_CHARS characters."""
+    with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
+        for block in iter(lambda: f.read(BLOCK_CHARS), ''):
+            yield block
+
+
+def iter_text_blocks(filepath: str) -> Iterator[str]:
+    """
+    Stream the text of one file by extension (no cache).
+
+    Raises:
+        ExtractionError: If the text cannot be extracted (possibly after some blocks).
+    """
+    ext = os.path.splitext(filepath)[1].lower()
+    if ext in ('.txt', '.md'):
+        blocks = iter_plain_text(filepath)
+    elif ext == '.pdf':
+        blocks = iter_pdf_text(filepath)
+    elif ext == '.docx':
+        blocks = iter_docx_text(filepath)
+    else:
+        return
+    try:
+        yield from blocks
+    except ExtractionError:
+        raise
+    except Exception as e:
+        raise ExtractionError(str(e)) from e
+
+
+def _failed_blocks(error: str) -> Iterator[str]:
+    """Blocks of a file whose extraction failed: raises ExtractionError when read."""
+    raise ExtractionError(error)
+    yield  # makes this a generator, so the error is raised when the blocks are read
+
+
+def extract_text(filepath: str) -> str:
+    """
+    Extract the whole text of one file (no cache).
+
+    Raises:
+        ExtractionError: If the text cannot be extracted.
+    """
+    return "".join(iter_text_blocks(filepath))
+
+
+def _write_compressed(path: str, blocks: Iterable[str]) -> int:
+    """Stream text blocks into a zlib file (written to a temp name, then renamed). Returns characters written."""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    compressor = zlib.compressobj(6)
+    chars = 0
+    try:
+        with open(tmp_path, 'wb') as f:
+            for block in blocks:
+                chars += len(block)
+                f.write(compressor.compress(block.encode('utf-8')))
+            f.write(compressor.flush())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return chars
+
+
+def _read_compressed(path: str) -> Iterator[str]:
+    """Stream the text of a zlib file written by _write_compressed."""
+    decompressor = zlib.decompressobj()
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    with open(path, 'rb') as f:
+        for raw in iter(lambda: f.read(BLOCK_CHARS), b''):
+            text = decoder.decode(decompressor.decompress(raw))
+            if text:
+                yield text
+        text = decoder.decode(decompressor.flush(), final=True)
+        if text:
+            yield text
+
+
+def _extract_to_file(filepath: str, target: str) -> Tuple[bool, float, Optional[str]]:
+    """
+    Pool task: extract one file straight into a cache file (no text is sent back).
+
+    Returns:
+        (text written, seconds, error message if extraction failed).
+    """
+    start = time.perf_counter()
+    error = None
+    try:
+        ext = os.path.splitext(filepath)[1].lower()
+        blocks = iter_pdf_text(filepath) if ext == '.pdf' else iter_docx_text(filepath)
+        ok = _write_compressed(target, blocks) > 0
+    except Exception as e:
+        logger.error(f"Failed to extract text from {filepath}: {e}")
+        ok, error = False, str(e)
+    if not ok and os.path.exists(target):
+        os.remove(target)
+    return ok, time.perf_counter() - start, error
+
+
+def _extract_in_pool(jobs: List[Tuple[str, str]], workers: int) -> List[Tuple[bool, float, Optional[str]]]:
+    """Run extraction jobs (source, cache file) in worker processes (in this process if the pool cannot run)."""
+    try:
+        # spawn: the app process may have torch threads running (see EmbeddingService.start_pool)
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(jobs)),
+            mp_context=multiprocessing.get_context('spawn')
+        ) as pool:
+            return list(pool.map(_extract_to_file, *zip(*jobs)))
+    except (BrokenProcessPool, OSError, RuntimeError) as e:
+        logger.warning(f"Extraction pool failed ({e}); extracting in process")
+        return [_extract_to_file(source, target) for source, target in jobs]
+
+
+def file_sha256(filepath: str) -> str:
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """
+    On-disk cache of extracted text, keyed by (path, size, mtime, content hash).
+    Text is stored once per content hash as a zlib-compressed file.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        self._index_path = os.path.join(cache_dir, INDEX_FILE)
+        self._lock = threading.Lock()
+        self._index = self._load_index()
+
+    def _load_index(self) -> Dict[str, Dict]:
+        try:
+            with open(self._index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Extraction cache index unreadable, starting empty: {e}")
+            return {}
+
+    def text_path(self, fingerprint: Dict) -> str:
+        """Cache file holding the text of a fingerprinted file."""
+        return os.path.join(self.cache_dir, f"{fingerprint['sha256']}{CACHE_SUFFIX}")
+
+    def lookup(self, filepath: str) -> Tuple[bool, Dict]:
+        """
+        Check whether a file's text is cached.
+
+        Returns:
+            (hit, fingerprint {size, mtime_ns, sha256}); after extracting a miss into
+            text_path(fingerprint), pass the fingerprint to register().
+        """
+        stat = os.stat(filepath)
+        key = os.path.abspath(filepath)
+        with self._lock:
+            entry = self._index.get(key)
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            if os.path.exists(self.text_path(entry)):
+                return True, entry
+        # Size or mtime changed (or first sighting): the content hash decides
+        fingerprint = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': file_sha256(filepath)}
+        hit = os.path.exists(self.text_path(fingerprint))
+        if hit:
+            self.register(filepath, fingerprint)
+        return hit, fingerprint
+
+    def iter_blocks(self, fingerprint: Dict) -> Iterator[str]:
+        """Stream the cached text of a fingerprinted file."""
+        return _read_compressed(self.text_path(fingerprint))
+
+    def register(self, filepath: str, fingerprint: Dict):
+        """Record that text_path(fingerprint) holds the text of this file."""
+        with self._lock:
+            self._index[os.path.abspath(filepath)] = fingerprint
+
+    def save(self, keep: Optional[List[str]] = None):
+        """
+        Write the index (atomically).
+
+        Args:
+            keep: If given, forget every path not in this list and delete cached texts no
+                  remaining path refers to (e.g. after files were removed from the knowledge base).
+        """
+        with self._lock:
+            if keep is not None:
+                wanted = {os.path.abspath(p) for p in keep}
+                self._index = {k: v for k, v in self._index.items() if k in wanted}
+                live = {v['sha256'] for v in self._index.values()}
+                for name in os.listdir(self.cache_dir):
+                    if name.endswith(CACHE_SUFFIX) and name[:-len(CACHE_SUFFIX)] not in live:
+                        try:
+                            os.remove(os.path.join(self.cache_dir, name))
+                        except OSError:
+                            pass
+            snapshot = dict(self._index)
+        tmp_path = f"{self._index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, self._index_path)
+
+
+def iter_documents(
+    paths: List[str],
+    cache: Optional[ExtractionCache] = None,
+    workers: int = 0,
+    prune: bool = False
+) -> Iterator[Tuple[str, Iterator[str]]]:
+    """
+    Stream the text of many files.
+    With a cache, PDF/DOCX files missing from it are extracted into it first (in parallel
+    when workers > 1); every file is then streamed from the cache or read directly.
+
+    Args:
+        paths: Files to extract.
+        cache: Extraction cache for PDF/DOCX files (None = always extract, in this process).
+        workers: Worker processes for cache misses (0 or 1 = extract in this process).
+        prune: `paths` is the whole knowledge base: drop cache entries of files not in it.
+
+    Yields:
+        (path, text blocks) in the order of `paths`; consume each file's blocks before the next.
+        Reading the blocks of a file that could not be extracted raises ExtractionError
+        (a file without any text just has no blocks).
+    """
+    fingerprints = {}
+    errors = {}
+    if cache is not None:
+        misses = []
+        for path in paths:
+            if os.path.splitext(path)[1].lower() not in EXTRACTED_FORMATS:
+                continue
+            try:
+                hit, fingerprint = cache.lookup(path)
+            except OSError as e:
+                logger.error(f"Failed to read {path}: {e}")
+                errors[path] = str(e)
+                continue
+            fingerprints[path] = fingerprint
+            if not hit:
+                misses.append(path)
+
+        if misses:
+            start = time.perf_counter()
+            # Largest files first so a big PDF does not start last and hold up the whole run
+            misses.sort(key=lambda p: fingerprints[p]['size'], reverse=True)
+            jobs = [(path, cache.text_path(fingerprints[path])) for path in misses]
+            if workers > 1 and len(jobs) > 1:
+                results = _extract_in_pool(jobs, workers)
+            else:
+                results = [_extract_to_file(source, target) for source, target in jobs]
+            for path, (ok, seconds, error) in zip(misses, results):
+                logger.info(f"Extracted {os.path.basename(path)} in {seconds:.2f}s")
+                if ok:
+                    cache.register(path, fingerprints[path])
+                else:
+                    # Nothing extracted: not cached, so the next run tries again
+                    del fingerprints[path]
+                    if error is not None:
+                        errors[path] = error
+            logger.info(
+                f"Extracted {len(misses)} of {len(paths)} files in {time.perf_counter() - start:.2f}s "
+                f"({len(paths) - len(misses)} unchanged)"
+            )
+        cache.save(keep=paths if prune else None)
+
+    for path in paths:
+        if path in fingerprints:
+            yield path, cache.iter_blocks(fingerprints[path])
+        elif path in errors:
+            yield path, _failed_blocks(errors[path])
+        elif cache is not None and os.path.splitext(path)[1].lower() in EXTRACTED_FORMATS:
+            yield path, iter([])
+        else:
+            yield path, iter_text_blocks(path)
+
+
+def extract_documents(
+    paths: List[str],
+    cache: Optional[ExtractionCache] = None,
+    workers: int = 0,
+    prune: bool = False
+) -> Dict[str, str]:
+    """
+    Extract the whole text of many files (see iter_documents; for files that fit in memory).
+
+    Returns:
+        Dict of path -> text (empty string if nothing could be extracted).
+    """
+    texts = {}
+    for path, blocks in iter_documents(paths, cache, workers, prune):
+        try:
+            texts[path] = "".join(blocks)
+        except ExtractionError as e:
+            logger.error(f"Failed to extract text from {path}: {e}")
+            texts[path] = ""
+    return texts
@@ -5,9 +5,15 @@ Searches knowledge base documents for relevant information.
 
 import logging
 import os
-from typing import List, Dict, Any, Optional
+import threading
+import time
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
 from pathlib import Path
 
+from .chunking import TokenChunker
+from .document_extraction import ExtractionCache, iter_documents, file_sha256
+from .tracing import span, traced
+
 logger = logging.getLogger(__name__)
 
 class DocumentSearch:
@@ -16,7 +22,19 @@ class DocumentSearch:
     Processes and indexes documents, then searches for relevant content.
     """
     
-    def __init__(self, embedding_service, vector_store, documents_path: str = None):
+    def __init__(
+        self,
+        embedding_service,
+        vector_store,
+        documents_path: str = None,
+        extraction_workers: Optional[int] = None,
+        extraction_cache_dir: Optional[str] = None,
+        chunking: str = 'tokens',
+        chunk_tokens: Optional[int] = None,
+        chunk_overlap_tokens: int = 32,
+        chunk_size: int = 500,
+        chunk_overlap: int = 50
+    ):
         """
         Initialize the document search service.
         
@@ -24,156 +42,312 @@ class DocumentSearch:
             embedding_service: EmbeddingService instance.
             vector_store: VectorStore instance.
             documents_path: Path to knowledge base documents folder.
+            extraction_workers: Processes for PDF/DOCX extraction (None = up to 4, by CPU count;
+                                0 = extract in this process).
+            extraction_cache_dir: Folder of the extracted-text cache
+                                  (default: knowledge_base/extraction_cache).
+            chunking: 'tokens' (chunks sized in model tokens along headings and paragraphs,
+                      see chunking.py) or 'words' (fixed windows of chunk_size words).
+            chunk_tokens: Tokens per chunk with 'tokens' (None = the model's max_seq_length
+                          minus the [CLS]/[SEP] pair).
+            chunk_overlap_tokens: Tokens repeated between consecutive chunks with 'tokens'.
+            chunk_size: Words per chunk with 'words'.
+            chunk_overlap: Overlapping words between chunks with 'words'.
         """
         self.embedding_service = embedding_service
         self.vector_store = vector_store
         
+        base_path = Path(__file__).parent.parent.parent
         if documents_path is None:
-            base_path = Path(__file__).parent.parent.parent
             documents_path = str(base_path / "knowledge_base" / "documents")
+        if extraction_cache_dir is None:
+            extraction_cache_dir = str(base_path / "knowledge_base" / "extraction_cache")
+        if extraction_workers is None:
+            extraction_workers = min(4, os.cpu_count() or 1)
         
         self.documents_path = documents_path
         self.supported_extensions = ['.txt', '.md', '.pdf', '.docx']
+        self.extraction_workers = extraction_workers
+        self.extraction_cache_dir = extraction_cache_dir
+        self._extraction_cache = None
+        if chunking not in ('tokens', 'words'):
+            raise ValueError(f"Unknown chunking '{chunking}'. Use 'tokens' or 'words'")
+        self.chunking = chunking
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.chunker = None
+        if chunking == 'tokens':
+            if chunk_tokens is None:
+                max_seq_length = getattr(embedding_service, 'max_seq_length', 256)
+                chunk_tokens = max_seq_length - 2
+            self.chunker = TokenChunker(
+                getattr(embedding_service, 'count_tokens', None),
+                max_tokens=chunk_tokens,
+                overlap_tokens=chunk_overlap_tokens
+            )
+        # One sync at a time (sidebar button, search service and the watcher may overlap)
+        self._sync_lock = threading.Lock()
+    
+    @classmethod
+    def from_config(cls, embedding_service, vector_store, kb_config: Optional[Dict[str, Any]] = None) -> 'DocumentSearch':
+        """
+        Create the document search with the knowledge_base settings of the GenAI config
+        (shared by the app and utilities/index_knowledge_base.py).
+        
+        Args:
+            embedding_service: EmbeddingService instance.
+            vector_store: VectorStore instance.
+            kb_config: knowledge_base section (read from the config file if None).
+        """
+        if kb_config is None:
+            from .config import get_config_section
+            kb_config = get_config_section('knowledge_base')
+        return cls(
+            embedding_service,
+            vector_store,
+            extraction_workers=kb_config.get('extraction_workers'),
+            extraction_cache_dir=kb_config.get('extraction_cache_dir'),
+            chunking=kb_config.get('chunking', 'tokens'),
+            chunk_tokens=kb_config.get('chunk_tokens'),
+            chunk_overlap_tokens=kb_config.get('chunk_overlap_tokens', 32),
+            chunk_size=kb_config.get('chunk_size', 500),
+            chunk_overlap=kb_config.get('chunk_overlap', 50)
+        )
+    
+    @property
+    def chunking_signature(self) -> str:
+        """Identifies the chunking settings; files indexed with other settings are re-chunked."""
+        if self.chunker is not None:
+            return self.chunker.signature
+        return f"words-{self.chunk_size}-{self.chunk_overlap}"
+    
+    @property
+    def extraction_cache(self) -> ExtractionCache:
+        """Extracted-text cache (created on first use)."""
+        if self._extraction_cache is None:
+            self._extraction_cache = ExtractionCache(self.extraction_cache_dir)
+        return self._extraction_cache
+    
+    def list_documents(self) -> List[str]:
+        """Paths of all supported files in the knowledge base folder."""
+        paths = []
+        for root, dirs, files in os.walk(self.documents_path):
+            for file in sorted(files):
+                if os.path.splitext(file)[1].lower() in self.supported_extensions:
+                    paths.append(os.path.join(root, file))
+        return paths
     
-    def load_and_index_documents(self, force_reindex: bool = False):
+    def load_and_index_documents(self, force_reindex: bool = False, full_rebuild: bool = False) -> Dict[str, Any]:
         """
-        Load all documents from the knowledge base and index them.
-        Skips re-indexing if documents are already cached (unless force_reindex=True).
+        Load the knowledge base documents and index them.
+        Skips indexing if documents are already cached (unless force_reindex=True). A reindex only
+        processes files that were added, changed or removed since the last one.
         
         Args:
-            force_reindex: Force re-indexing even if cache exists.
+            force_reindex: Check every file for changes even if documents are already indexed.
+            full_rebuild: Re-extract and re-embed every file instead of only the changed ones.
+            
+        Returns:
+            Summary of the changes (see sync_documents); empty if indexing was skipped.
         """
         # Check if already indexed (use cache)
-        if not force_reindex:
+        if not force_reindex and not full_rebuild:
             stats = self.vector_store.get_collection_stats()
             cached_count = stats.get('document_count', 0)
             if cached_count > 0:
                 logger.info(f"Using cached document embeddings ({cached_count} chunks already indexed)")
-                return
+                return {}
         
         if not os.path.exists(self.documents_path):
             logger.warning(f"Documents path does not exist: {self.documents_path}")
             os.makedirs(self.documents_path, exist_ok=True)
-            return
+            return {}
         
         logger.info(f"Loading documents from: {self.documents_path}")
+        return self.sync_documents(full_rebuild=full_rebuild)
+    
+    def _source_key(self, filepath: str) -> str:
+        """Per-file key stored with each chunk: path relative to the documents folder."""
+        return os.path.relpath(filepath, self.documents_path).replace(os.sep, '/')
+    
+    def sync_documents(self, full_rebuild: bool = False) -> Dict[str, Any]:
+        """
+        Bring the document collection in line with the files in the documents folder.
+        Each file's fingerprint (size, mtime, content hash, chunking settings) is stored with its
+        chunks; only added and changed files are extracted and embedded, and removed files'
+        chunks are deleted. Unchanged files cost a stat (plus a hash if only their mtime changed).
         
-        all_chunks = []
-        
-        # Walk through all files
-        for root, dirs, files in os.walk(self.documents_path):
-            for file in files:
-                filepath = os.path.join(root, file)
-                ext = os.path.splitext(file)[1].lower()
-                
-                if ext in self.supported_extensions:
-                    chunks = self._process_file(filepath)
-                    all_chunks.extend(chunks)
+        Args:
+            full_rebuild: Treat every file as changed.
+            
+        Returns:
+            Dict with 'added', 'changed', 'removed' and 'failed' source lists (failed files are
+            retried on the next sync), the 'unchanged' file count, the resulting 'chunks' count
+            and 'seconds'.
+        """
+        with self._sync_lock:
+            return self._sync_documents(full_rebuild)
+    
+    def _sync_documents(self, full_rebuild: bool) -> Dict[str, Any]:
+        start = time.perf_counter()
+        paths = {self._source_key(p): p for p in self.list_documents()}
+        indexed = self.vector_store.get_document_sources()
         
-        if not all_chunks:
-            logger.warning("No document chunks found to index")
-            return
+        # Fingerprint: "size:mtime_ns:sha256@chunking" - a change of chunking settings re-chunks every file
+        chunking = "@" + self.chunking_signature
+        added, changed, fingerprints, touched = [], [], {}, {}
+        for source, path in paths.items():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue  # removed while listing; picked up on the next sync
+            old = indexed.get(source)
+            stamp = f"{stat.st_size}:{stat.st_mtime_ns}"
+            if not full_rebuild and old and old.startswith(stamp + ":") and old.endswith(chunking):
+                continue
+            fingerprint = f"{stamp}:{file_sha256(path)}{chunking}"
+            if not full_rebuild and old and old.split(':')[-1] == fingerprint.split(':')[-1]:
+                touched[source] = fingerprint  # touched but identical: only the stamp is refreshed
+                continue
+            fingerprints[source] = fingerprint
+            (changed if source in indexed else added).append(source)
+        removed = [source for source in indexed if source not in paths]
         
-        # Clear existing documents before re-indexing
-        stats = self.vector_store.get_collection_stats()
-        if stats.get('document_count', 0) > 0:
-            self.vector_store.clear_documents()
+        summary = {'added': added, 'changed': changed, 'removed': removed, 'failed': []}
+        updated = added + changed
+        if updated or removed:
+            batches = self._embedded_batches([paths[source] for source in updated], fingerprints, summary['failed'])
+            # Fingerprints are recorded per file, so files without chunks are not re-added next
+            # sync; the dict is read after the batches, with failed files blanked
+            fingerprints.update(touched)
+            count = self.vector_store.stream_document_files(updated + removed, batches, fingerprints=fingerprints)
+        else:
+            self.vector_store.refresh_document_fingerprints(touched)
+            count = self.vector_store.get_collection_stats().get('document_count', 0)
+        self.extraction_cache.save(keep=list(paths.values()))
         
-        # Generate embeddings
-        logger.info(f"Generating embeddings for {len(all_chunks)} document chunks...")
-        texts = [chunk['content'] for chunk in all_chunks]
-        embeddings = self.embedding_service.generate_embeddings(texts)
+        summary.update({
+            'unchanged': len(paths) - len(updated),
+            'chunks': count,
+            'seconds': round(time.perf_counter() - start, 3)
+        })
+        logger.info(
+            f"Document index synced in {summary['seconds']}s: {len(added)} added, {len(changed)} changed, "
+            f"{len(summary['removed'])} removed, {summary['unchanged']} unchanged, "
+            f"{len(summary['failed'])} failed ({count} chunks)"
+        )
+        return summary
+    
+    def _embedded_batches(
+        self,
+        paths: List[str],
+        fingerprints: Dict[str, str],
+        failed: Optional[List[str]] = None
+    ) -> Iterator[Tuple[List[Dict[str, Any]], List[List[float]]]]:
+        """
+        Stream files through extraction, chunking and embedding, one batch of chunks at a time.
+        Only the current batch (and the current block of text) is held in memory, so a file of
+        any size is indexed with bounded memory.
         
-        # Store in vector database
-        self.vector_store.add_documents(all_chunks, embeddings)
-        logger.info(f"Successfully indexed {len(all_chunks)} document chunks")
+        Args:
+            paths: Files to index.
+            fingerprints: Source -> file fingerprint stored with each chunk. A file whose text
+                          cannot be extracted, or that fails midway, gets an empty fingerprint,
+                          so the next sync picks it up again.
+            failed: Collects the sources of files that failed.
+            
+        Yields:
+            (chunk dictionaries, embeddings) batches.
+        """
+        batch_size = getattr(self.embedding_service, 'bulk_batch_size', 256)
+        batch = []
+        total = 0
+        documents = iter_documents(paths, cache=self.extraction_cache, workers=self.extraction_workers)
+        for filepath, blocks in documents:
+            source = self._source_key(filepath)
+            chunks = self._iter_file_chunks(filepath, blocks)
+            while True:
+                try:
+                    chunk = next(chunks, None)
+                except Exception as e:
+                    logger.error(f"Failed to process {filepath}: {e}")
+                    # Chunks already embedded stay until the retry replaces them
+                    fingerprints[source] = ''
+                    batch = [c for c in batch if c['source'] != source]
+                    if failed is not None:
+                        failed.append(source)
+                    break
+                if chunk is None:
+                    break
+                chunk['file_fingerprint'] = fingerprints[source]
+                batch.append(chunk)
+                if len(batch) >= batch_size:
+                    yield batch, self.embedding_service.generate_embeddings([c['content'] for c in batch])
+                    total += len(batch)
+                    batch = []
+        if batch:
+            yield batch, self.embedding_service.generate_embeddings([c['content'] for c in batch])
+            total += len(batch)
+        logger.info(f"Generated embeddings for {total} document chunks")
     
-    def _process_file(self, filepath: str) -> List[Dict[str, Any]]:
+    def _process_file(self, filepath: str, content: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         Process a single file and split into chunks.
         
         Args:
             filepath: Path to the file.
+            content: Already extracted text (extracted through the cache if None).
             
         Returns:
             List of chunk dictionaries.
         """
-        chunks = []
-        filename = os.path.basename(filepath)
-        ext = os.path.splitext(filename)[1].lower()
-        
+        if content is None:
+            blocks = next(iter_documents([filepath], cache=self.extraction_cache))[1]
+        else:
+            blocks = [content]
         try:
-            content = ""
-            
-            if ext in ['.txt', '.md']:
-                with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-            
-            elif ext == '.pdf':
-                content = self._extract_pdf_text(filepath)
-            
-            elif ext == '.docx':
-                content = self._extract_docx_text(filepath)
-            
-            if content:
-                # Split into chunks
-                file_chunks = self._split_text(content, chunk_size=500, overlap=50)
-                
-                for i, chunk_text in enumerate(file_chunks):
-                    chunks.append({
-                        'id': f"{filename}_{i}",
-                        'content': chunk_text,
-                        'filename': filename,
-                        'filepath': filepath,
-                        'section': self._extract_section(chunk_text),
-                        'chunk_index': i
-                    })
-            
-            logger.info(f"Processed {filename}: {len(chunks)} chunks")
-            
+            return list(self._iter_file_chunks(filepath, blocks))
         except Exception as e:
             logger.error(f"Failed to process {filepath}: {e}")
-        
-        return chunks
+            return []
     
-    def _extract_pdf_text(self, filepath: str) -> str:
-        """Extract text from PDF file."""
-        try:
-            import pypdf
-            text_parts = []
-            with open(filepath, 'rb') as f:
-                reader = pypdf.PdfReader(f)
-                for page in reader.pages:
-                    text_parts.append(page.extract_text() or '')
-            return "\n".join(text_parts)
-        except ImportError:
-            logger.warning("pypdf not installed, skipping PDF files")
-            return ""
-        except Exception as e:
-            logger.error(f"Failed to extract PDF text: {e}")
-            return ""
+    def _iter_file_chunks(self, filepath: str, blocks: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        """
+        Chunk dictionaries of one file from its stream of text blocks.
+        
+        Args:
+            filepath: Path to the file.
+            blocks: The file's text (see document_extraction.iter_documents).
+            
+        Yields:
+            Chunk dictionaries.
+            
+        Raises:
+            Exception: Whatever reading `blocks` raises; the file is then incomplete.
+        """
+        filename = os.path.basename(filepath)
+        source = self._source_key(filepath)
+        count = 0
+        
+        for i, chunk_text in enumerate(self._chunk_blocks(blocks)):
+            count += 1
+            yield {
+                'id': f"{source}_{i}",
+                'content': chunk_text,
+                'filename': filename,
+                'filepath': filepath,
+                'source': source,
+                'section': self._extract_section(chunk_text),
+                'chunk_index': i
+            }
+        
+        logger.info(f"Processed {filename}: {count} chunks")
     
-    def _extract_docx_text(self, filepath: str) -> str:
-        """Extract text from DOCX file (paragraphs and tables)."""
-        try:
-            from docx import Document
-            doc = Document(filepath)
-            parts = []
-            for p in doc.paragraphs:
-                if p.text.strip():
-                    parts.append(p.text)
-            for table in doc.tables:
-                for row in table.rows:
-                    row_text = " | ".join(cell.text.strip() for cell in row.cells if cell.text.strip())
-                    if row_text:
-                        parts.append(row_text)
-            return "\n".join(parts)
-        except ImportError:
-            logger.warning("python-docx not installed, skipping DOCX files")
-            return ""
-        except Exception as e:
-            logger.error(f"Failed to extract DOCX text: {e}")
-            return ""
+    def _chunk_blocks(self, blocks: Iterable[str]) -> Iterator[str]:
+        """Chunk a file's text with the configured strategy."""
+        if self.chunker is not None:
+            return self.chunker.iter_chunks(blocks)
+        return self._iter_chunks(blocks, chunk_size=self.chunk_size, overlap=self.chunk_overlap)
     
     def _split_text(self, text: str, chunk_size: int = 500, overlap: int = 50) -> List[str]:
         """
@@ -187,21 +361,57 @@ class DocumentSearch:
         Returns:
             List of text chunks.
         """
-        words = text.split()
-        chunks = []
+        return list(self._iter_chunks([text], chunk_size, overlap))
+    
+    def _iter_chunks(self, blocks: Iterable[str], chunk_size: int = 500, overlap: int = 50) -> Iterator[str]:
+        """
+        Split streamed text into overlapping chunks (same chunks as _split_text on the joined
+        text). Only the words of the current window are kept, plus the raw text while a
+        document is still short enough to become a single chunk.
         
-        if len(words) <= chunk_size:
-            return [text] if text.strip() else []
+        Args:
+            blocks: Text blocks; a word may continue across a block boundary.
+            chunk_size: Target size of each chunk in words.
+            overlap: Number of overlapping words between chunks.
+            
+        Yields:
+            Text chunks.
+        """
+        step = chunk_size - overlap
+        raw = []          # text so far, until it has more than chunk_size words
+        words = []        # words from the current window start on
+        carry = ''        # word cut off at the end of the previous block
         
-        start = 0
-        while start < len(words):
-            end = start + chunk_size
-            chunk = " ".join(words[start:end])
-            if chunk.strip():
-                chunks.append(chunk)
-            start = end - overlap
+        for block in blocks:
+            if raw is not None:
+                raw.append(block)
+            text = carry + block
+            carry = ''
+            parts = text.split()
+            if parts and not text[-1].isspace():
+                carry = parts.pop()
+            words.extend(parts)
+            if raw is not None and len(words) + (1 if carry else 0) > chunk_size:
+                raw = None
+            if raw is None:
+                start = 0
+                while len(words) - start >= chunk_size:
+                    yield " ".join(words[start:start + chunk_size])
+                    start += step
+                del words[:start]
         
-        return chunks
+        if carry:
+            words.append(carry)
+        if raw is not None:
+            # Whole text within chunk_size words: one chunk, as it is
+            text = "".join(raw)
+            if text.strip():
+                yield text
+            return
+        # Last windows, including one that is all overlap (as in the original word-index loop)
+        while words:
+            yield " ".join(words[:chunk_size])
+            del words[:step]
     
     def _extract_section(self, text: str) -> str:
         """
@@ -245,6 +455,7 @@ class DocumentSearch:
                 unique.append(r)
         return unique
 
+    @traced("DocumentSearch.search")
     def search(
         self,
         query: str,
@@ -270,17 +481,22 @@ class DocumentSearch:
             return []
         
         # Semantic search (lower threshold so "An error was encountered while invoking KIAS-SetMarketingPermissions" can match)
-        query_embedding = self.embedding_service.generate_embedding(query)
-        results = self.vector_store.search_documents(
-            query_embedding,
-            n_results=n_results,
-            min_similarity=min_similarity
-        )
+        with span("embedding.query"):
+            query_embedding = self.embedding_service.generate_embedding(query)
+        with span("vector_store.search_documents") as stage:
+            results = self.vector_store.search_documents(
+                query_embedding,
+                n_results=n_results,
+                min_similarity=min_similarity
+            )
+            stage.set(results=len(results))
         
         # If no semantic hits (e.g. long error message), use keyword fallback so docs containing
         # terms like KIAS, SetMarketingPermissions still appear in Related Knowledge Documents
         if not results:
-            results = self.vector_store.search_documents_by_keywords(query, n_results=n_results)
+            with span("vector_store.keyword_fallback") as stage:
+                results = self.vector_store.search_documents_by_keywords(query, n_results=n_results)
+                stage.set(results=len(results))
             if results:
                 logger.info("Document search used keyword fallback for query terms")
         
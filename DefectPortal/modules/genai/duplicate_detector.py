@@ -0,0 +1,256 @@
+"""
+Duplicate Defect Detection Module
+Offline all-pairs near-duplicate detection over the indexed defect embeddings.
+Groups re-raised copies of the same defect (e.g. across waves) so the index and UI can collapse them.
+"""
+
+import json
+import logging
+import os
+import numpy as np
+from typing import List, Dict, Any, Tuple
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_GROUPS_FILE = "duplicate_groups.json"
+
+
+class DuplicateDetector:
+    """
+    Finds near-duplicate defects in the VectorStore defect matrix.
+    Uses blocked matrix products (exact) for small/medium indexes and
+    random-hyperplane LSH candidate generation (approximate) for very large ones.
+    """
+
+    def __init__(
+        self,
+        vector_store,
+        threshold: float = 0.95,
+        method: str = "auto",
+        block_size: int = 2048,
+        exact_max_vectors: int = 200000,
+        lsh_bits: int = 16,
+        lsh_tables: int = 8,
+        seed: int = 42
+    ):
+        """
+        Initialize the duplicate detector.
+
+        Args:
+            vector_store: VectorStore instance holding the defect embeddings.
+            threshold: Minimum cosine similarity (0-1) for two defects to be duplicates.
+            method: 'exact' (blocked all-pairs), 'lsh' (approximate) or 'auto'.
+            block_size: Rows per block for the blocked matrix products.
+            exact_max_vectors: In 'auto' mode, use exact search up to this many defects.
+            lsh_bits: Hyperplanes (hash bits) per LSH table.
+            lsh_tables: Number of independent LSH tables.
+            seed: Random seed for the LSH hyperplanes.
+        """
+        self.vector_store = vector_store
+        self.threshold = threshold
+        self.method = method
+        self.block_size = block_size
+        self.exact_max_vectors = exact_max_vectors
+        self.lsh_bits = lsh_bits
+        self.lsh_tables = lsh_tables
+        self.seed = seed
+
+    def find_duplicate_pairs(self, matrix: np.ndarray) -> List[Tuple[int, int, float]]:
+        """
+        Find all pairs of rows with cosine similarity >= threshold.
+
+        Args:
+            matrix: L2-normalised float32 matrix (n x d).
+
+        Returns:
+            List of (i, j, similarity) with i < j.
+        """
+        n = matrix.shape[0]
+        if n < 2:
+            return []
+
+        method = self.method
+        if method == "auto":
+            method = "exact" if n <= self.exact_max_vectors else "lsh"
+
+        logger.info(f"Detecting duplicates among {n} defects (method={method}, threshold={self.threshold})")
+        if method == "lsh":
+            return self._lsh_pairs(matrix)
+        return self._blocked_pairs(matrix)
+
+    def _blocked_pairs(self, matrix: np.ndarray) -> List[Tuple[int, int, float]]:
+        """Exact all-pairs search with blocked matrix products over the upper triangle."""
+        n = matrix.shape[0]
+        bs = self.block_size
+        # Column tiles keep each similarity block at bs x col_bs floats (bounded memory)
+        col_bs = bs * 8
+        pairs = []
+
+        for r0 in range(0, n, bs):
+            r1 = min(r0 + bs, n)
+            rows = matrix[r0:r1]
+            for c0 in range(r0, n, col_bs):
+                c1 = min(c0 + col_bs, n)
+                sims = rows @ matrix[c0:c1].T
+                ii, jj = np.nonzero(sims >= self.threshold)
+                gi = ii + r0
+                gj = jj + c0
+                upper = gi < gj
+                for i, j, s in zip(gi[upper], gj[upper], sims[ii[upper], jj[upper]]):
+                    pairs.append((int(i), int(j), float(s)))
+            logger.info(f"Duplicate scan: {r1}/{n} rows, {len(pairs)} pairs so far")
+
+        return pairs
+
+    def _lsh_pairs(self, matrix: np.ndarray) -> List[Tuple[int, int, float]]:
+        """
+        Approximate search: bucket rows by random-hyperplane signatures, then verify
+        candidate pairs inside each bucket with exact dot products.
+        """
+        n, dim = matrix.shape
+        rng = np.random.default_rng(self.seed)
+        weights = (1 << np.arange(self.lsh_bits, dtype=np.int64))
+        found = {}
+
+        for t in range(self.lsh_tables):
+            planes = rng.standard_normal((dim, self.lsh_bits)).astype(np.float32)
+            codes = np.empty(n, dtype=np.int64)
+            for r0 in range(0, n, self.block_size * 8):
+                r1 = min(r0 + self.block_size * 8, n)
+                codes[r0:r1] = ((matrix[r0:r1] @ planes) > 0).astype(np.int64) @ weights
+
+            order = np.argsort(codes, kind="stable")
+            sorted_codes = codes[order]
+            bounds = np.flatnonzero(np.diff(sorted_codes)) + 1
+            starts = np.concatenate(([0], bounds))
+            ends = np.concatenate((bounds, [n]))
+
+            for s, e in zip(starts, ends):
+                if e - s < 2:
+                    continue
+                members = np.sort(order[s:e])
+                # Verify bucket members exactly (in blocks for oversized buckets)
+                for b0 in range(0, len(members), self.block_size):
+                    block = members[b0:b0 + self.block_size]
+                    rest = members[b0:]
+                    sims = matrix[block] @ matrix[rest].T
+                    ii, jj = np.nonzero(sims >= self.threshold)
+                    for i, j in zip(ii, jj):
+                        a, b = int(block[i]), int(rest[j])
+                        if a < b:
+                            found[(a, b)] = float(sims[i, j])
+            logger.info(f"LSH table {t + 1}/{self.lsh_tables}: {len(found)} pairs so far")
+
+        return [(a, b, s) for (a, b), s in found.items()]
+
+    def build_groups(
+        self,
+        pairs: List[Tuple[int, int, float]],
+        ids: List[str],
+        metadata: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Cluster duplicate pairs into groups (connected components) and pick a canonical defect per group.
+        The canonical defect is the first resolved one with a fix description, otherwise the first indexed.
+
+        Args:
+            pairs: Duplicate pairs from find_duplicate_pairs().
+            ids: Defect issue keys, aligned with the matrix rows.
+            metadata: Defect metadata dicts, aligned with the matrix rows.
+
+        Returns:
+            List of group dictionaries.
+        """
+        parent = {}
+
+        def find(x):
+            parent.setdefault(x, x)
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        for i, j, _ in pairs:
+            ri, rj = find(i), find(j)
+            if ri != rj:
+                parent[max(ri, rj)] = min(ri, rj)
+        min_sim = {}
+        for i, j, sim in pairs:
+            root = find(i)
+            min_sim[root] = min(min_sim.get(root, 1.0), sim)
+
+        components = {}
+        for x in list(parent.keys()):
+            components.setdefault(find(x), []).append(x)
+
+        groups = []
+        for root, members in sorted(components.items()):
+            members.sort()
+            canonical = next((m for m in members if self._has_fix(metadata[m])), members[0])
+            groups.append({
+                'group_id': f"dup_{len(groups)}",
+                'canonical': ids[canonical],
+                'members': [ids[m] for m in members],
+                'min_similarity': round(min_sim.get(root, 1.0) * 100, 1)
+            })
+        return groups
+
+    def _has_fix(self, metadata: Dict[str, Any]) -> bool:
+        """Check whether a defect carries a usable fix description."""
+        fix_desc = str(metadata.get('fix_description', '')).strip().lower()
+        return bool(fix_desc) and fix_desc not in ('nan', 'none')
+
+    def run(self, save: bool = True) -> Dict[str, Any]:
+        """
+        Detect duplicate groups over the full defect index and optionally persist them.
+
+        Args:
+            save: Write the duplicate-group table next to the vector store files.
+
+        Returns:
+            The duplicate-group table.
+        """
+        matrix = self.vector_store.get_defect_matrix()
+        pairs = self.find_duplicate_pairs(matrix)
+        groups = self.build_groups(pairs, self.vector_store.defect_ids, self.vector_store.get_defect_metadata())
+
+        table = {
+            'threshold': self.threshold,
+            'defect_count': int(matrix.shape[0]),
+            'pair_count': len(pairs),
+            'groups': groups
+        }
+        duplicates = sum(len(g['members']) - 1 for g in groups)
+        logger.info(f"Found {len(groups)} duplicate groups covering {duplicates} redundant defects")
+
+        if save:
+            self.vector_store.set_duplicate_groups(table)
+        return table
+
+
+def load_duplicate_groups(persist_directory: str) -> Dict[str, Any]:
+    """Load the duplicate-group table from the vector store directory (empty table if missing)."""
+    path = os.path.join(persist_directory, DUPLICATE_GROUPS_FILE)
+    if not os.path.exists(path):
+        return {'groups': []}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        logger.warning(f"Could not load duplicate groups: {e}")
+        return {'groups': []}
+
+
+def save_duplicate_groups(persist_directory: str, table: Dict[str, Any]):
+    """
+    Write the duplicate-group table to the vector store directory. The file is replaced
+    atomically, so other processes never read a partly written table.
+    """
+    path = os.path.join(persist_directory, DUPLICATE_GROUPS_FILE)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(table, f)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        logger.error(f"Could not save duplicate groups: {e}")
@@ -1,38 +1,192 @@
 """
 Embedding Service using sentence-transformers (free, runs locally)
 Generates vector embeddings for defects and documents.
+Backends: 'torch' (SentenceTransformer) or 'onnx' (onnxruntime, optionally int8-quantized; see onnx_encoder.py).
 """
 
+import atexit
+import contextlib
 import logging
-from typing import List, Union
+import os
+import threading
+import time
+from typing import List, Union, Optional
 import numpy as np
+import pandas as pd
+
+from .metrics import EMBEDDED_TEXTS, EMBEDDING_SECONDS, EMBEDDING_THROUGHPUT
 
 logger = logging.getLogger(__name__)
 
+# Model loaded once per pool worker process (see _init_pool_worker)
+_worker_model = None
+
+
+def _load_encoder(
+    model_name: str,
+    backend: str = "torch",
+    onnx_quantized: bool = False,
+    onnx_dir: Optional[str] = None,
+    threads: Optional[int] = None
+):
+    """
+    Load the embedding model for a backend.
+    'onnx' returns an OnnxSentenceEncoder (no torch import); 'torch' a SentenceTransformer.
+    """
+    if backend == "onnx":
+        from .onnx_encoder import load_onnx_encoder
+        return load_onnx_encoder(model_name, onnx_dir=onnx_dir, quantized=onnx_quantized, num_threads=threads)
+    
+    if threads:
+        import torch
+        torch.set_num_threads(threads)
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name, device='cpu') if threads else SentenceTransformer(model_name)
+
+
+def _init_pool_worker(encoder_args: dict, threads: int, cpu_queue):
+    """Pool worker initializer: pin to a CPU set, limit threads and load one model per process."""
+    global _worker_model
+    cpus = cpu_queue.get() if cpu_queue is not None else None
+    if cpus and hasattr(os, 'sched_setaffinity'):
+        try:
+            os.sched_setaffinity(0, cpus)
+        except OSError as e:
+            logger.warning(f"Could not pin embedding worker to CPUs {cpus}: {e}")
+    _worker_model = _load_encoder(threads=threads, **encoder_args)
+
+
+def _encode_batches(model, batches: List[List[str]], lock: Optional[threading.Lock] = None) -> np.ndarray:
+    """
+    Encode pre-planned batches one by one (each batch is a single forward pass).
+    With a lock, it is held per batch, so query embeddings can run between the batches of a bulk call.
+    """
+    outputs = []
+    for batch in batches:
+        with lock or contextlib.nullcontext():
+            outputs.append(model.encode(batch, batch_size=len(batch), convert_to_numpy=True, show_progress_bar=False))
+    return np.vstack(outputs)
+
+
+def _pool_encode(batches: List[List[str]]) -> np.ndarray:
+    """Pool task: encode a group of batches with this worker's model."""
+    return _encode_batches(_worker_model, batches)
+
+# Defect fields combined (in this order) into the text that gets embedded
+DEFECT_TEXT_FIELDS = [
+    'Summary',
+    'Description',
+    'Custom field (OSF-Fix Description)',
+    'Resolution',
+    'OSF-System',
+    'Comment'
+]
+
+
+def defect_texts_from_frame(defects: pd.DataFrame, field_max_chars: Optional[int] = None) -> List[str]:
+    """
+    Columnar version of EmbeddingService.create_defect_text for a whole DataFrame.
+    Produces exactly the same text per row, using pandas column operations instead of a row loop.
+    
+    Args:
+        defects: DataFrame of defects (one row per defect).
+        field_max_chars: Cap each field at this many characters before joining (None = no cap).
+        
+    Returns:
+        Combined text for embedding, one per row.
+    """
+    combined = pd.Series('', index=defects.index, dtype=object)
+    for field in DEFECT_TEXT_FIELDS:
+        if field not in defects.columns:
+            continue
+        raw = defects[field]
+        as_str = raw.map(str).astype(object)
+        part = as_str.str.strip()
+        # Same filter as create_defect_text: truthy, non-blank, not the string 'nan'
+        keep = raw.notna() & ~raw.eq(0) & part.ne('') & as_str.str.lower().ne('nan')
+        if field_max_chars:
+            part = part.str[:field_max_chars]
+        joined = combined.where(combined.eq(''), combined + ' ') + part
+        combined = combined.where(~keep, joined)
+    return combined.tolist()
+
 class EmbeddingService:
     """
     Service for generating text embeddings using sentence-transformers.
     Uses the all-MiniLM-L6-v2 model which is lightweight and effective.
     """
     
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(
+        self,
+        model_name: str = "all-MiniLM-L6-v2",
+        batch_size: int = 32,
+        num_workers: int = 0,
+        threads_per_worker: Optional[int] = None,
+        pin_threads: bool = False,
+        pool_min_texts: int = 2000,
+        defect_field_max_chars: Optional[int] = 500,
+        backend: str = "torch",
+        onnx_quantized: bool = False,
+        onnx_dir: Optional[str] = None
+    ):
         """
         Initialize the embedding service.
         
         Args:
             model_name: Name of the sentence-transformer model to use.
                        Default is 'all-MiniLM-L6-v2' (384 dimensions, fast).
+            batch_size: Texts per forward pass.
+            num_workers: Worker processes for bulk encoding (0 = encode in this process).
+            threads_per_worker: Torch/onnxruntime threads per worker (default: CPU cores / num_workers).
+            pin_threads: Pin each worker to its own set of CPU cores (Linux only).
+            pool_min_texts: Use the worker pool only for calls with at least this many texts.
+            defect_field_max_chars: Cap each defect field at this many characters in create_defect_text,
+                       so one long field (e.g. Comment) cannot push the others past the model's input limit.
+            backend: 'torch' (SentenceTransformer) or 'onnx' (onnxruntime on CPU, no torch import).
+            onnx_quantized: With the onnx backend, use the int8 dynamic-quantized model.
+            onnx_dir: Folder with the exported ONNX model (default: knowledge_base/onnx_models/<model>).
         """
         self.model_name = model_name
         self.model = None
+        self.batch_size = batch_size
+        self.num_workers = num_workers
+        self.threads_per_worker = threads_per_worker
+        self.pin_threads = pin_threads
+        self.pool_min_texts = pool_min_texts
+        self.defect_field_max_chars = defect_field_max_chars
+        self.backend = backend
+        self.onnx_quantized = onnx_quantized
+        self.onnx_dir = onnx_dir
+        self._pool = None
+        # HF fast tokenizers switch truncation/padding state per call, so concurrent
+        # callers (search service worker threads) must not share the model at the same time
+        self._model_lock = threading.Lock()
         self._load_model()
     
+    @property
+    def _encoder_args(self) -> dict:
+        """Arguments for _load_encoder (also sent to pool workers)."""
+        return {
+            'model_name': self.model_name,
+            'backend': self.backend,
+            'onnx_quantized': self.onnx_quantized,
+            'onnx_dir': self.onnx_dir
+        }
+    
     def _load_model(self):
-        """Load the sentence-transformer model."""
+        """Load the embedding model for the configured backend (falls back to torch if ONNX fails)."""
+        if self.backend == "onnx":
+            try:
+                logger.info(f"Loading ONNX embedding model: {self.model_name} (int8={self.onnx_quantized})")
+                self.model = _load_encoder(**self._encoder_args)
+                logger.info("Embedding model loaded successfully")
+                return
+            except Exception as e:
+                logger.warning(f"ONNX backend unavailable ({e}). Falling back to torch backend.")
+                self.backend = "torch"
         try:
-            from sentence_transformers import SentenceTransformer
             logger.info(f"Loading embedding model: {self.model_name}")
-            self.model = SentenceTransformer(self.model_name)
+            self.model = _load_encoder(self.model_name)
             logger.info("Embedding model loaded successfully")
         except ImportError:
             logger.error("sentence-transformers not installed. Run: pip install sentence-transformers")
@@ -56,7 +210,11 @@ class EmbeddingService:
             return [0.0] * 384  # Default dimension for all-MiniLM-L6-v2
         
         try:
-            embedding = self.model.encode(text, convert_to_numpy=True)
+            start = time.perf_counter()
+            with self._model_lock:
+                embedding = self.model.encode(text, convert_to_numpy=True)
+            EMBEDDED_TEXTS.inc(mode='query')
+            EMBEDDING_SECONDS.inc(time.perf_counter() - start, mode='query')
             return embedding.tolist()
         except Exception as e:
             logger.error(f"Failed to generate embedding: {e}")
@@ -65,6 +223,8 @@ class EmbeddingService:
     def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
         """
         Generate embeddings for multiple texts (batch processing).
+        Large calls are spread over the worker pool when num_workers > 0; the
+        batches are planned the same way in both modes so the output is identical.
         
         Args:
             texts: List of texts to embed.
@@ -79,12 +239,145 @@ class EmbeddingService:
         cleaned_texts = [t if t and t.strip() else " " for t in texts]
         
         try:
-            embeddings = self.model.encode(cleaned_texts, convert_to_numpy=True, show_progress_bar=False)
+            start = time.perf_counter()
+            with self._model_lock:
+                order, batches = self._plan_batches(cleaned_texts)
+            if self.num_workers > 0 and len(cleaned_texts) >= self.pool_min_texts:
+                encoded = self._encode_with_pool(batches)
+            else:
+                encoded = _encode_batches(self.model, batches, lock=self._model_lock)
+            # Restore the caller's order
+            embeddings = np.empty_like(encoded)
+            embeddings[order] = encoded
+            elapsed = time.perf_counter() - start
+            EMBEDDED_TEXTS.inc(len(texts), mode='batch')
+            EMBEDDING_SECONDS.inc(elapsed, mode='batch')
+            EMBEDDING_THROUGHPUT.set(len(texts) / elapsed if elapsed > 0 else 0.0)
             return embeddings.tolist()
         except Exception as e:
             logger.error(f"Failed to generate batch embeddings: {e}")
             return [[0.0] * 384 for _ in texts]
     
+    def _token_lengths(self, texts: List[str]) -> np.ndarray:
+        """Token count of each text as the model will see it (capped at max_seq_length); character count as fallback."""
+        tokenizer = getattr(self.model, 'tokenizer', None)
+        max_length = getattr(self.model, 'max_seq_length', None) or 512
+        if tokenizer is not None:
+            try:
+                encoded = tokenizer(
+                    texts,
+                    truncation=True,
+                    max_length=max_length,
+                    return_attention_mask=False,
+                    return_token_type_ids=False
+                )
+                return np.array([len(ids) for ids in encoded['input_ids']])
+            except Exception as e:
+                logger.warning(f"Tokenizer length check failed, using character lengths: {e}")
+        return np.array([len(t) for t in texts])
+    
+    @property
+    def max_seq_length(self) -> int:
+        """Tokens the model reads per text, including its special tokens (the rest is truncated)."""
+        return int(getattr(self.model, 'max_seq_length', None) or 256)
+    
+    @property
+    def has_tokenizer(self) -> bool:
+        return getattr(self.model, 'tokenizer', None) is not None
+    
+    def count_tokens(self, texts: List[str]) -> List[int]:
+        """
+        Word-piece count of each text, without the model's special tokens, for sizing chunks
+        to max_seq_length. Counts past max_seq_length may be capped (the ONNX tokenizer truncates).
+        
+        Args:
+            texts: Texts to measure.
+            
+        Returns:
+            Token count per text (word and punctuation count if the model has no tokenizer).
+        """
+        tokenizer = getattr(self.model, 'tokenizer', None)
+        if tokenizer is not None and texts:
+            try:
+                with self._model_lock:
+                    encoded = tokenizer(
+                        list(texts),
+                        add_special_tokens=False,
+                        verbose=False,
+                        return_attention_mask=False,
+                        return_token_type_ids=False
+                    )
+                return [len(ids) for ids in encoded['input_ids']]
+            except Exception as e:
+                logger.warning(f"Tokenizer count failed, approximating by words: {e}")
+        from .chunking import approximate_token_counts
+        return approximate_token_counts(texts)
+    
+    def _plan_batches(self, texts: List[str]):
+        """
+        Bucket texts by token length (longest first) so each batch pads only to its own longest member.
+        
+        Returns:
+            Tuple of (order, batches): order[i] is the original index of the i-th encoded text.
+        """
+        order = np.argsort(-self._token_lengths(texts), kind='stable')
+        batches = [
+            [texts[i] for i in order[start:start + self.batch_size]]
+            for start in range(0, len(order), self.batch_size)
+        ]
+        return order, batches
+    
+    @property
+    def bulk_batch_size(self) -> int:
+        """Texts per generate_embeddings call for bulk indexing loops (larger when a pool is configured)."""
+        # Large calls let length bucketing group similar texts across the whole chunk
+        if self.num_workers > 0:
+            return max(2048, self.batch_size * self.num_workers * 8)
+        return 2048
+    
+    def start_pool(self):
+        """Start the worker pool (one model per process). Called lazily on the first bulk call."""
+        if self._pool is not None or self.num_workers <= 0:
+            return
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        
+        cores = os.cpu_count() or 1
+        threads = self.threads_per_worker or max(1, cores // self.num_workers)
+        ctx = multiprocessing.get_context('spawn')  # avoid forking a process with torch threads running
+        
+        cpu_queue = None
+        if self.pin_threads:
+            available = sorted(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else list(range(cores))
+            cpu_queue = ctx.Queue()
+            for w in range(self.num_workers):
+                cpus = available[(w * threads) % len(available):][:threads] or available[:threads]
+                cpu_queue.put(set(cpus))
+        
+        logger.info(f"Starting embedding pool: {self.num_workers} workers x {threads} threads (pinned={self.pin_threads})")
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.num_workers,
+            mp_context=ctx,
+            initializer=_init_pool_worker,
+            initargs=(self._encoder_args, threads, cpu_queue)
+        )
+        atexit.register(self.close_pool)
+    
+    def close_pool(self):
+        """Shut down the worker pool if running."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+            logger.info("Embedding pool stopped")
+    
+    def _encode_with_pool(self, batches: List[List[str]]) -> np.ndarray:
+        """Encode planned batches across the worker pool, keeping batch order."""
+        self.start_pool()
+        # Several tasks per worker so long and short batches balance out
+        per_task = max(1, -(-len(batches) // (self.num_workers * 4)))
+        tasks = [batches[i:i + per_task] for i in range(0, len(batches), per_task)]
+        return np.vstack(list(self._pool.map(_pool_encode, tasks)))
+    
     def compute_similarity(self, embedding1: List[float], embedding2: List[float]) -> float:
         """
         Compute cosine similarity between two embeddings.
@@ -125,15 +418,22 @@ class EmbeddingService:
         Returns:
             Combined text for embedding.
         """
-        fields = [
-            defect.get('Summary', ''),
-            defect.get('Description', ''),
-            defect.get('Custom field (OSF-Fix Description)', ''),
-            defect.get('Resolution', ''),
-            defect.get('OSF-System', ''),
-            defect.get('Comment', '')
-        ]
+        fields = [defect.get(field, '') for field in DEFECT_TEXT_FIELDS]
         
-        # Filter and join non-empty fields
+        # Filter, cap and join non-empty fields
         text_parts = [str(f).strip() for f in fields if f and str(f).strip() and str(f).lower() != 'nan']
+        if self.defect_field_max_chars:
+            text_parts = [p[:self.defect_field_max_chars] for p in text_parts]
         return " ".join(text_parts)
+    
+    def create_defect_texts(self, defects: pd.DataFrame) -> List[str]:
+        """
+        Create searchable texts for a whole DataFrame of defects (vectorised create_defect_text).
+        
+        Args:
+            defects: DataFrame containing defect fields.
+            
+        Returns:
+            Combined texts for embedding, one per row.
+        """
+        return defect_texts_from_frame(defects, self.defect_field_max_chars)
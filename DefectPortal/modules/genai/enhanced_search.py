@@ -5,12 +5,16 @@ Orchestrates all GenAI components for comprehensive defect search.
 
 import html
 import logging
-import streamlit as st
 import pandas as pd
-from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
 
+from .tracing import span, traced, current_span, propagate
+from .metrics import SEARCH_LATENCY
+
 logger = logging.getLogger(__name__)
 
 
@@ -45,57 +49,62 @@ class EnhancedSearch:
     
     _instance = None
     _initialized = False
+    _init_lock = threading.Lock()
+    
+    # Background loading stages, in the order they are shown in the UI
+    INIT_STAGES = {
+        'embedding_model': "Loading embedding model",
+        'vector_store': "Loading vector index",
+        'llm': "Connecting to LLM",
+        'services': "Preparing search services"
+    }
     
-    def __new__(cls):
+    def __new__(cls, background: bool = False):
         """Singleton pattern to reuse initialized services."""
         if cls._instance is None:
             cls._instance = super().__new__(cls)
         return cls._instance
     
-    def __init__(self):
-        """Initialize the enhanced search system."""
-        if EnhancedSearch._initialized:
-            return
-        
-        self.embedding_service = None
-        self.vector_store = None
-        self.defect_similarity = None
-        self.document_search = None
-        self.llm_service = None
-        self.resolution_suggester = None
-        self.context_summarizer = None
+    def __init__(self, background: bool = False):
+        """
+        Initialize the enhanced search system.
         
-        self._initialize_services()
-        EnhancedSearch._initialized = True
+        Args:
+            background: Load the model, vector store and LLM connection in background threads
+                        and return immediately. Use is_ready()/wait_until_ready() before searching.
+        """
+        with EnhancedSearch._init_lock:
+            if EnhancedSearch._initialized:
+                return
+            
+            self.embedding_service = None
+            self.vector_store = None
+            self.defect_similarity = None
+            self.document_search = None
+            self.llm_service = None
+            self.resolution_suggester = None
+            self.context_summarizer = None
+            self.kb_watcher = None
+            self._init_futures = {}
+            self._ready_future = None
+            self.result_cache = self._create_result_cache()
+            
+            if background:
+                self._start_background_initialization()
+            else:
+                self._initialize_services()
+            EnhancedSearch._initialized = True
     
     def _initialize_services(self):
         """Initialize all GenAI services."""
         try:
             logger.info("Initializing GenAI services...")
             
-            # Import services
-            from .embedding_service import EmbeddingService
-            from .vector_store import VectorStore
-            from .defect_similarity import DefectSimilaritySearch
-            from .document_search import DocumentSearch
-            from .llm_service import LLMService
-            from .resolution_suggester import ResolutionSuggester
-            from .context_summarizer import ContextSummarizer
-            
             # Initialize in order
-            self.embedding_service = EmbeddingService()
-            self.vector_store = VectorStore()
-            self.defect_similarity = DefectSimilaritySearch(
-                self.embedding_service, 
-                self.vector_store
-            )
-            self.document_search = DocumentSearch(
-                self.embedding_service,
-                self.vector_store
-            )
-            self.llm_service = LLMService()
-            self.resolution_suggester = ResolutionSuggester(self.llm_service)
-            self.context_summarizer = ContextSummarizer(self.llm_service)
+            embedding_service = self._create_embedding_service()
+            vector_store = self._create_vector_store()
+            llm_service = self._create_llm_service()
+            self._assemble_services(embedding_service, vector_store, llm_service)
             
             logger.info("GenAI services initialized successfully")
             
@@ -103,6 +112,171 @@ class EnhancedSearch:
             logger.error(f"Failed to initialize GenAI services: {e}")
             raise
     
+    def _start_background_initialization(self):
+        """Start loading the services in background threads; each stage gets a readiness future."""
+        logger.info("Initializing GenAI services in the background...")
+        executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="genai-init")
+        self._init_futures = {
+            'embedding_model': executor.submit(self._create_embedding_service),
+            'vector_store': executor.submit(self._create_vector_store),
+            'llm': executor.submit(self._create_llm_service)
+        }
+        self._ready_future = executor.submit(self._finish_background_initialization)
+        self._init_futures['services'] = self._ready_future
+        executor.shutdown(wait=False)
+    
+    def _finish_background_initialization(self):
+        """Wait for the loading stages and wire the dependent services together."""
+        try:
+            self._assemble_services(
+                self._init_futures['embedding_model'].result(),
+                self._init_futures['vector_store'].result(),
+                self._init_futures['llm'].result()
+            )
+            logger.info("GenAI services initialized successfully")
+        except Exception as e:
+            logger.error(f"Failed to initialize GenAI services: {e}")
+            # Let the next EnhancedSearch() call retry
+            EnhancedSearch._initialized = False
+            raise
+    
+    def _create_embedding_service(self):
+        """Load the embedding model (the slowest stage)."""
+        from .embedding_service import EmbeddingService
+        from .config import get_config_section
+        
+        embedding_config = get_config_section('embedding')
+        return EmbeddingService(
+            model_name=embedding_config.get('model_name', 'all-MiniLM-L6-v2'),
+            batch_size=embedding_config.get('batch_size', 32),
+            num_workers=embedding_config.get('num_workers', 0),
+            threads_per_worker=embedding_config.get('threads_per_worker'),
+            pin_threads=embedding_config.get('pin_threads', False),
+            pool_min_texts=embedding_config.get('pool_min_texts', 2000),
+            defect_field_max_chars=embedding_config.get('defect_field_max_chars', 500),
+            backend=embedding_config.get('backend', 'torch'),
+            onnx_quantized=embedding_config.get('onnx_quantized', False),
+            onnx_dir=embedding_config.get('onnx_dir')
+        )
+    
+    def _create_vector_store(self):
+        """Load the persisted vector index."""
+        from .vector_store import VectorStore
+        from .config import get_config_section
+        
+        store_config = get_config_section('vector_store')
+        return VectorStore(
+            precision=store_config.get('precision', 'float32'),
+            rescore_candidates=store_config.get('rescore_candidates', 50),
+            reload_interval=store_config.get('reload_interval', 2.0)
+        )
+    
+    def _create_result_cache(self):
+        """Process-wide cache for search() results (None when disabled in the config)."""
+        from .config import get_config_section
+        from .result_cache import ResultCache
+        
+        cache_config = get_config_section('result_cache')
+        if not cache_config.get('enabled', True):
+            return None
+        return ResultCache(
+            'search_results',
+            max_entries=cache_config.get('max_entries', 256),
+            ttl_seconds=cache_config.get('ttl_seconds', 900)
+        )
+    
+    def _create_llm_service(self):
+        """Create the LLM service (probes the Ollama server)."""
+        from .llm_service import LLMService
+        return LLMService()
+    
+    def _assemble_services(self, embedding_service, vector_store, llm_service):
+        """Build the search and generation services on top of the loaded components."""
+        from .defect_similarity import DefectSimilaritySearch
+        from .document_search import DocumentSearch
+        from .resolution_suggester import ResolutionSuggester
+        from .context_summarizer import ContextSummarizer
+        from .config import get_config_section
+        
+        kb_config = get_config_section('knowledge_base')
+        defect_similarity = DefectSimilaritySearch(embedding_service, vector_store)
+        document_search = DocumentSearch.from_config(embedding_service, vector_store, kb_config)
+        resolution_suggester = ResolutionSuggester(llm_service)
+        context_summarizer = ContextSummarizer(llm_service)
+        
+        self.embedding_service = embedding_service
+        self.vector_store = vector_store
+        self.llm_service = llm_service
+        self.defect_similarity = defect_similarity
+        self.document_search = document_search
+        self.resolution_suggester = resolution_suggester
+        self.context_summarizer = context_summarizer
+        self.kb_watcher = self._start_kb_watcher(document_search, kb_config.get('watch') or {})
+    
+    def _start_kb_watcher(self, document_search, watch_config: Dict[str, Any]):
+        """Start the knowledge-base watcher (None when disabled in the config)."""
+        if not watch_config.get('enabled', True):
+            return None
+        from .kb_watcher import KnowledgeBaseWatcher
+        
+        watcher = KnowledgeBaseWatcher.from_config(document_search, watch_config)
+        watcher.start()
+        return watcher
+    
+    def is_ready(self) -> bool:
+        """Check whether all services are loaded and usable."""
+        if self._ready_future is None:
+            return self.defect_similarity is not None
+        return self._ready_future.done() and self._ready_future.exception() is None
+    
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until background initialization finishes.
+        
+        Args:
+            timeout: Maximum seconds to wait (None = wait indefinitely).
+            
+        Returns:
+            True if the services are ready, False on timeout.
+            
+        Raises:
+            The initialization error if loading failed.
+        """
+        if self._ready_future is not None:
+            try:
+                self._ready_future.result(timeout=timeout)
+            except FutureTimeoutError:
+                return False
+        return self.is_ready()
+    
+    def get_init_progress(self) -> Dict[str, Any]:
+        """
+        Get the state of each initialization stage.
+        
+        Returns:
+            Dictionary with 'stages' (list of {'name', 'label', 'state', 'error'}),
+            'completed' and 'total' stage counts, and the first 'error' if any stage failed.
+        """
+        stages = []
+        error = None
+        for name, label in self.INIT_STAGES.items():
+            future = self._init_futures.get(name)
+            stage = {'name': name, 'label': label, 'state': 'ready', 'error': None}
+            if future is not None and not future.done():
+                stage['state'] = 'loading'
+            elif future is not None and future.exception() is not None:
+                stage['state'] = 'failed'
+                stage['error'] = str(future.exception())
+                error = error or stage['error']
+            stages.append(stage)
+        
+        return {
+            'stages': stages,
+            'completed': sum(1 for stage in stages if stage['state'] == 'ready'),
+            'total': len(stages),
+            'error': error
+        }
+    
     def index_data(
         self,
         defects_acc: pd.DataFrame = None,
@@ -127,6 +301,20 @@ class EnhancedSearch:
         if index_documents and not force_reindex:
             self.document_search.load_and_index_documents()
     
+    def index_documents(self, force_reindex: bool = False, full_rebuild: bool = False) -> Dict[str, Any]:
+        """
+        Index the knowledge base documents.
+        
+        Args:
+            force_reindex: Check every file (picks up new, changed and removed documents).
+            full_rebuild: Re-extract and re-embed every file.
+            
+        Returns:
+            Summary of added/changed/removed files (empty if indexing was skipped).
+        """
+        return self.document_search.load_and_index_documents(force_reindex=force_reindex, full_rebuild=full_rebuild)
+    
+    @traced("EnhancedSearch.search")
     def search(
         self,
         query: str,
@@ -161,13 +349,39 @@ class EnhancedSearch:
         
         if not query or not query.strip():
             return results
+        start = time.perf_counter()
+        
+        # Same query and parameters against the same index version: reuse the earlier result
+        cache_key = None
+        if self.result_cache is not None:
+            from .result_cache import normalize_query
+            with span("search.cache_lookup") as lookup:
+                cache_key = (
+                    normalize_query(query),
+                    n_similar_defects,
+                    n_related_docs,
+                    round(float(min_similarity), 4),
+                    self.vector_store.get_index_version(),
+                    self.llm_service.is_available()
+                )
+                cached = self.result_cache.get(cache_key)
+                lookup.set(hit=cached is not None)
+            if cached is not None:
+                cached['query'] = query
+                request_span = current_span()
+                if request_span is not None:  # None inside untraced()
+                    request_span.set(cache_hit=True)
+                SEARCH_LATENCY.observe(time.perf_counter() - start, operation='search', cache='hit')
+                return cached
         
         # Step 1: Find matching defects using AI similarity
-        similar = self.defect_similarity.search_by_text(
-            query,
-            n_results=n_similar_defects * 2,
-            min_similarity=min_similarity
-        )
+        with span("search.similar_defects") as stage:
+            similar = self.defect_similarity.search_by_text(
+                query,
+                n_results=n_similar_defects * 2,
+                min_similarity=min_similarity
+            )
+            stage.set(results=len(similar))
         
         # Separate by source
         for s in similar:
@@ -178,35 +392,38 @@ class EnhancedSearch:
                 results['matching_defects']['sit'].append(s)
         
         # Step 2: Find related documents
-        related_docs = self.document_search.search(
-            query,
-            n_results=n_related_docs
-        )
+        with span("search.related_documents") as stage:
+            related_docs = self.document_search.search(
+                query,
+                n_results=n_related_docs
+            )
+            stage.set(results=len(related_docs))
         results['related_documents'] = related_docs
         
         # Steps 3 & 4: Resolution suggestions and context summary (run LLM parts in parallel to stay under 2 min)
         query_defect = {'Summary': query, 'Description': query}
         if similar:
-            results['resolution_suggestions'] = self.resolution_suggester.suggest_resolutions(
-                query_defect,
-                similar[:5],
-                skip_llm=True
-            )
+            with span("search.resolution_suggestions"):
+                results['resolution_suggestions'] = self.resolution_suggester.suggest_resolutions(
+                    query_defect,
+                    similar[:5],
+                    skip_llm=True
+                )
         else:
             results['resolution_suggestions'] = {}
         if similar or related_docs:
             resolution_data = results['resolution_suggestions']
             # Run LLM for resolution ai_suggestions and context summary in parallel.
             # Pass full similar list to context summary so Historical Data shows total matched count and dynamic resolution rate.
-            with ThreadPoolExecutor(max_workers=2) as executor:
+            with span("search.llm_generation"), ThreadPoolExecutor(max_workers=2) as executor:
                 future_ai = executor.submit(
-                    self.resolution_suggester.fill_ai_suggestions,
+                    propagate(traced("ResolutionSuggester.fill_ai_suggestions")(self.resolution_suggester.fill_ai_suggestions)),
                     results['resolution_suggestions'],
                     query_defect,
                     similar[:5]
                 )
                 future_summary = executor.submit(
-                    self.context_summarizer.generate_summary,
+                    propagate(traced("ContextSummarizer.generate_summary")(self.context_summarizer.generate_summary)),
                     query_defect,
                     similar,
                     related_docs,
@@ -215,6 +432,11 @@ class EnhancedSearch:
                 future_ai.result()
                 results['context_summary'] = future_summary.result()
         
+        if cache_key is not None:
+            self.result_cache.put(cache_key, results)
+        SEARCH_LATENCY.observe(
+            time.perf_counter() - start, operation='search', cache='miss' if cache_key is not None else 'off'
+        )
         return results
     
     def analyze_defect(
@@ -234,6 +456,7 @@ class EnhancedSearch:
         Returns:
             Dictionary containing analysis results.
         """
+        start = time.perf_counter()
         results = {
             'defect': defect,
             'similar_defects': [],
@@ -269,13 +492,40 @@ class EnhancedSearch:
             results['resolution_suggestions']
         )
         
+        SEARCH_LATENCY.observe(time.perf_counter() - start, operation='analyze_defect', cache='off')
         return results
     
+    def find_similar_batch(
+        self,
+        defects: List[Dict[str, Any]],
+        n_similar: int = 5,
+        min_similarity: float = 0.5
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Find similar past defects for a batch of defects (e.g. a Jira bot triaging new issues).
+        
+        Args:
+            defects: Defects to look up (JIRA column names, e.g. 'Issue key', 'Summary').
+            n_similar: Number of similar defects per defect.
+            min_similarity: Minimum similarity threshold.
+            
+        Returns:
+            One list of similar defects per input defect.
+        """
+        with SEARCH_LATENCY.time(operation='find_similar_batch', cache='off'):
+            return self.defect_similarity.find_similar_batch(
+                defects,
+                n_results=n_similar,
+                min_similarity=min_similarity,
+                exclude_self=True
+            )
+    
     def get_status(self) -> Dict[str, Any]:
         """Get the status of the GenAI system."""
         status = {
             'initialized': EnhancedSearch._initialized,
-            'embedding_model': 'all-MiniLM-L6-v2',
+            'ready': self.is_ready(),
+            'embedding_model': self.embedding_service.model_name if self.embedding_service else 'N/A',
             'llm_available': self.llm_service.is_available() if self.llm_service else False,
             'llm_model': self.llm_service.model_name if self.llm_service else 'N/A',
             'defects_indexed': 0,
@@ -286,6 +536,10 @@ class EnhancedSearch:
             stats = self.vector_store.get_collection_stats()
             status['defects_indexed'] = stats.get('defect_count', 0)
             status['documents_indexed'] = stats.get('document_count', 0)
+        if self.result_cache is not None:
+            status['result_cache'] = self.result_cache.stats()
+        if getattr(self, 'kb_watcher', None) is not None:
+            status['kb_watcher'] = self.kb_watcher.status()
         
         return status
 
@@ -297,6 +551,8 @@ def display_enhanced_results(results: Dict[str, Any]):
     Args:
         results: Results from EnhancedSearch.search() or analyze_defect().
     """
+    import streamlit as st
+    
     # 1. Similar Defects Section
     similar = results.get('similar_defects', [])
     if similar:
@@ -414,29 +670,56 @@ def display_enhanced_results(results: Dict[str, Any]):
                 st.metric("Avg Similarity", f"{insights.get('avg_similarity', 0)}%")
 
 
+def get_search_backend():
+    """
+    Get the object the UI searches through: a SearchServiceClient when search_service.enabled
+    is set in the GenAI config (the standalone service owns the model and index), otherwise
+    the in-process EnhancedSearch singleton (loading in the background).
+    """
+    from .config import get_config_section
+    
+    service_config = get_config_section('search_service')
+    if service_config.get('enabled', False):
+        from .search_client import SearchServiceClient
+        host = service_config.get('host', '127.0.0.1')
+        port = service_config.get('port', 8765)
+        return SearchServiceClient(
+            service_config.get('url') or f"http://{host}:{port}",
+            timeout=service_config.get('request_timeout', 180)
+        )
+    return EnhancedSearch(background=True)
+
+
 def initialize_genai_system(defects_acc: pd.DataFrame = None, defects_sit: pd.DataFrame = None):
     """
     Initialize or get the GenAI system and optionally index data.
+    Services load in background threads, so this returns at once on first page load;
+    indexing runs on a later rerun once EnhancedSearch.is_ready() is True.
+    With search_service.enabled the standalone service is used instead (see get_search_backend).
     
     Args:
         defects_acc: ACC defects DataFrame.
         defects_sit: SIT defects DataFrame.
         
     Returns:
-        EnhancedSearch instance.
+        EnhancedSearch instance or SearchServiceClient (possibly still loading).
     """
+    # Imported here so the headless search service does not need Streamlit
+    import streamlit as st
+    
     # Use session state to track initialization
     if 'genai_system' not in st.session_state:
-        with st.spinner("🚀 Initializing AI Search System..."):
-            try:
-                enhanced_search = EnhancedSearch()
-                st.session_state['genai_system'] = enhanced_search
-                st.session_state['genai_indexed'] = False
-            except Exception as e:
-                st.error(f"Failed to initialize AI system: {e}")
-                return None
+        try:
+            enhanced_search = get_search_backend()
+            st.session_state['genai_system'] = enhanced_search
+            st.session_state['genai_indexed'] = False
+        except Exception as e:
+            st.error(f"Failed to initialize AI system: {e}")
+            return None
     
     enhanced_search = st.session_state['genai_system']
+    if not enhanced_search.is_ready():
+        return enhanced_search
     
     # Index data if not already done, or force reindex after DB update
     force_reindex = st.session_state.get('genai_force_reindex', False)
@@ -0,0 +1,249 @@
+"""
+Knowledge Base Watcher Module
+Keeps the document index in line with knowledge_base/documents without anyone clicking
+"Index Knowledge Base": a background thread notices added, changed and removed files
+(inotify/FSEvents through watchdog when installed, otherwise mtime snapshots), waits until
+the folder has been quiet for the debounce period, and runs DocumentSearch.sync_documents.
+
+Syncing happens on the watcher thread only, so searches keep running against the current
+index version; the new version is published atomically when the sync finishes (see
+VectorStore.replace_document_files). With several server processes, only the one holding
+the watcher lock file syncs; the others pick up the published version.
+
+    watcher = KnowledgeBaseWatcher(document_search, debounce_seconds=3.0)
+    watcher.start()
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+LOCK_FILE = ".kb_watcher.lock"
+
+
+class _ProcessLock:
+    """Non-blocking exclusive lock on a file, held until release or process exit (no-op where fcntl is missing)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def acquire(self) -> bool:
+        if self._file is not None:
+            return True
+        try:
+            import fcntl
+        except ImportError:
+            return True
+        handle = open(self.path, 'a')
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return False
+        self._file = handle
+        return True
+
+    def release(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class KnowledgeBaseWatcher:
+    """
+    Background watcher that feeds document changes into incremental indexing.
+    """
+
+    def __init__(
+        self,
+        document_search,
+        poll_interval: float = 2.0,
+        debounce_seconds: float = 3.0,
+        use_watchdog: bool = True,
+        lock_path: Optional[str] = None
+    ):
+        """
+        Args:
+            document_search: DocumentSearch whose documents folder is watched and synced.
+            poll_interval: Seconds between folder snapshots (polling mode) and debounce checks.
+            debounce_seconds: Quiet period after the last change before syncing, so a copy of
+                              many files (or a large file still being written) is indexed once.
+            use_watchdog: Use filesystem events from the watchdog package if it is installed.
+            lock_path: Lock file electing one syncing process (default: next to the documents folder).
+        """
+        self.document_search = document_search
+        self.poll_interval = poll_interval
+        self.debounce_seconds = debounce_seconds
+        self.use_watchdog = use_watchdog
+        self.backend = None
+        self._lock = _ProcessLock(lock_path or os.path.join(
+            os.path.dirname(os.path.abspath(document_search.documents_path)), LOCK_FILE
+        ))
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._state_lock = threading.Lock()
+        self._thread = None
+        self._observer = None
+        self._snapshot = None
+        # Sync once at start to pick up changes made while no watcher was running
+        self._pending = True
+        self._last_change = 0.0
+        self.last_sync: Dict[str, Any] = {}
+        self.last_error: Optional[str] = None
+        self.syncs = 0
+
+    @classmethod
+    def from_config(cls, document_search, watch_config: Optional[Dict[str, Any]] = None) -> 'KnowledgeBaseWatcher':
+        """
+        Create a watcher (not started) with the knowledge_base.watch settings of the GenAI config.
+
+        Args:
+            document_search: DocumentSearch whose documents folder is watched and synced.
+            watch_config: knowledge_base.watch section (read from the config file if None).
+        """
+        if watch_config is None:
+            from .config import get_config_section
+            watch_config = get_config_section('knowledge_base').get('watch') or {}
+        return cls(
+            document_search,
+            poll_interval=watch_config.get('poll_interval', 2.0),
+            debounce_seconds=watch_config.get('debounce_seconds', 3.0),
+            use_watchdog=watch_config.get('use_watchdog', True)
+        )
+
+    def start(self):
+        """Start watching (idempotent)."""
+        if self._thread is not None:
+            return
+        os.makedirs(self.document_search.documents_path, exist_ok=True)
+        if self.use_watchdog and self._start_observer():
+            self.backend = 'watchdog'
+        else:
+            self.backend = 'polling'
+            self._snapshot = self._take_snapshot()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="kb-watcher", daemon=True)
+        self._thread.start()
+        logger.info(
+            f"Watching {self.document_search.documents_path} for document changes "
+            f"({self.backend}, debounce {self.debounce_seconds}s)"
+        )
+
+    def stop(self):
+        """Stop watching; a sync in progress finishes first."""
+        self._stop.set()
+        self._wake.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=5)
+            self._observer = None
+        if self._thread is not None:
+            self._thread.join(timeout=60)
+            self._thread = None
+        self._lock.release()
+
+    def notify_change(self):
+        """Record a change in the documents folder (restarts the debounce period)."""
+        with self._state_lock:
+            self._pending = True
+            self._last_change = time.monotonic()
+        self._wake.set()
+
+    def status(self) -> Dict[str, Any]:
+        with self._state_lock:
+            return {
+                'running': self._thread is not None and self._thread.is_alive(),
+                'backend': self.backend,
+                'pending': self._pending,
+                'syncs': self.syncs,
+                'last_sync': self.last_sync,
+                'last_error': self.last_error
+            }
+
+    def _start_observer(self) -> bool:
+        """Subscribe to filesystem events; False if watchdog is unavailable."""
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            return False
+
+        watcher = self
+        extensions = tuple(self.document_search.supported_extensions)
+
+        class _Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if event.event_type in ('opened', 'closed_no_write'):
+                    return
+                paths = [getattr(event, 'src_path', ''), getattr(event, 'dest_path', '')]
+                if event.is_directory or any(str(p).lower().endswith(extensions) for p in paths if p):
+                    watcher.notify_change()
+
+        try:
+            observer = Observer()
+            observer.daemon = True
+            observer.schedule(_Handler(), self.document_search.documents_path, recursive=True)
+            observer.start()
+        except Exception as e:
+            logger.warning(f"Filesystem events unavailable ({e}); polling the documents folder instead")
+            return False
+        self._observer = observer
+        return True
+
+    def _take_snapshot(self) -> Dict[str, Tuple[int, int]]:
+        """(size, mtime_ns) of every supported file."""
+        snapshot = {}
+        for path in self.document_search.list_documents():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            snapshot[path] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            if self.backend == 'polling':
+                snapshot = self._take_snapshot()
+                if snapshot != self._snapshot:
+                    self._snapshot = snapshot
+                    self.notify_change()
+                    self._wake.clear()
+            with self._state_lock:
+                due = self._pending and time.monotonic() - self._last_change >= self.debounce_seconds
+            if due:
+                self._sync()
+            elif self._pending:
+                # Come back when the debounce period is over
+                self._wake.wait(max(0.0, self.debounce_seconds - (time.monotonic() - self._last_change)))
+
+    def _sync(self):
+        if not self._lock.acquire():
+            # Another server process syncs; this one attaches to what it publishes
+            with self._state_lock:
+                self._pending = False
+            return
+        with self._state_lock:
+            self._pending = False
+        try:
+            summary = self.document_search.sync_documents()
+            with self._state_lock:
+                self.last_sync = summary
+                self.last_error = None
+                self.syncs += 1
+        except Exception as e:
+            logger.error(f"Knowledge base sync failed: {e}")
+            with self._state_lock:
+                self.last_error = str(e)
+                # Retry after the next debounce period
+                self._pending = True
+                self._last_change = time.monotonic()
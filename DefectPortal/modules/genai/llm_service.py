@@ -8,6 +8,9 @@ import requests
 import json
 from typing import Optional, Dict, Any, List
 
+from .tracing import span
+from .metrics import LLM_IN_FLIGHT, LLM_REQUESTS, LLM_LATENCY
+
 logger = logging.getLogger(__name__)
 
 class LLMService:
@@ -75,10 +78,16 @@ class LLMService:
         Returns:
             Generated text.
         """
-        if self.ollama_available:
-            return self._generate_ollama(prompt, max_tokens, temperature, timeout)
-        else:
-            return self._generate_fallback(prompt)
+        backend = 'ollama' if self.ollama_available else 'fallback'
+        with span("LLMService.generate", backend=backend, model=self.model_name, prompt_chars=len(prompt)) as stage, \
+                LLM_LATENCY.time(backend=backend), LLM_IN_FLIGHT.track_in_progress():
+            if self.ollama_available:
+                text = self._generate_ollama(prompt, max_tokens, temperature, timeout)
+            else:
+                text = self._generate_fallback(prompt)
+                LLM_REQUESTS.inc(backend=backend, outcome='ok')
+            stage.set(output_chars=len(text))
+        return text
     
     def _generate_ollama(
         self,
@@ -106,13 +115,17 @@ class LLMService:
             
             if response.status_code == 200:
                 result = response.json()
+                LLM_REQUESTS.inc(backend='ollama', outcome='ok')
                 return result.get('response', '').strip()
             else:
                 logger.error(f"Ollama API error: {response.status_code}")
+                LLM_REQUESTS.inc(backend='ollama', outcome='error')
                 return self._generate_fallback(prompt)
                 
         except Exception as e:
             logger.error(f"Ollama generation failed: {e}")
+            outcome = 'timeout' if isinstance(e, requests.Timeout) else 'error'
+            LLM_REQUESTS.inc(backend='ollama', outcome=outcome)
             return self._generate_fallback(prompt)
     
     def _generate_fallback(self, prompt: str) -> str:
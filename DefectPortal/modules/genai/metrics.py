@@ -0,0 +1,284 @@
+"""
+Metrics Module
+In-process counters, gauges and histograms for the portal and GenAI hot paths, exposed in
+the Prometheus text format on a local port by a background HTTP thread (no Prometheus
+client library or external service needed; point a Prometheus scrape job at it if wanted).
+
+    GET http://127.0.0.1:9108/metrics
+
+Metrics:
+    defectportal_search_latency_seconds{operation,cache}   EnhancedSearch search/analyze/batch calls
+    defectportal_stage_duration_seconds{stage}             every tracing span (see tracing.py)
+    defectportal_embedded_texts_total{mode}                texts embedded (query / batch)
+    defectportal_embedding_seconds_total{mode}             time spent embedding; rate ratio = embeddings/sec
+    defectportal_embedding_throughput_texts_per_second     throughput of the last batch call
+    defectportal_vector_store_vectors{collection}          vectors in the attached index
+    defectportal_vector_store_bytes{collection}            memory of the compact vectors
+    defectportal_llm_in_flight_requests                    LLM calls running or waiting on Ollama
+    defectportal_llm_requests_total{backend,outcome}       LLM calls by outcome (ok/error/timeout)
+    defectportal_llm_latency_seconds{backend}              LLM call latency
+    defectportal_cache_requests_total{cache,result}        cache lookups (hit/miss); hit ratio in PromQL
+    defectportal_cache_entries{cache}                      cached entries
+    defectportal_db_query_seconds{table}                   DB table reads
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 9108
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers cached searches (< 1 ms) up to slow LLM calls (minutes)
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = '') -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    """Base for a named metric family with optional labels."""
+
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], object] = {}
+        REGISTRY.register(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_sample(key, value))
+        return lines
+
+    def _render_sample(self, key, value) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"]
+
+
+class Counter(_Metric):
+    """Monotonically increasing value."""
+
+    kind = 'counter'
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    kind = 'gauge'
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track_in_progress(self, **labels):
+        """Count the block as in progress while it runs."""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets."""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        super().__init__(name, documentation, labelnames)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the block in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _render_sample(self, key, value) -> List[str]:
+        counts, total, count = value
+        lines = []
+        cumulative = 0
+        for bound, n in zip(self.buckets, counts):
+            cumulative += n
+            le = f'le="{_format_value(bound)}"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+    """All metric families of the process."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+SEARCH_LATENCY = Histogram(
+    'defectportal_search_latency_seconds', "EnhancedSearch call latency.", ['operation', 'cache']
+)
+STAGE_DURATION = Histogram(
+    'defectportal_stage_duration_seconds', "Duration of traced pipeline stages.", ['stage']
+)
+EMBEDDED_TEXTS = Counter('defectportal_embedded_texts_total', "Texts embedded.", ['mode'])
+EMBEDDING_SECONDS = Counter('defectportal_embedding_seconds_total', "Seconds spent embedding.", ['mode'])
+EMBEDDING_THROUGHPUT = Gauge(
+    'defectportal_embedding_throughput_texts_per_second', "Texts per second of the last batch embedding call."
+)
+VECTOR_STORE_VECTORS = Gauge('defectportal_vector_store_vectors', "Vectors in the attached index.", ['collection'])
+VECTOR_STORE_BYTES = Gauge('defectportal_vector_store_bytes', "Bytes of the compact search vectors.", ['collection'])
+LLM_IN_FLIGHT = Gauge('defectportal_llm_in_flight_requests', "LLM calls running or queued at Ollama.")
+LLM_REQUESTS = Counter('defectportal_llm_requests_total', "LLM calls by backend and outcome.", ['backend', 'outcome'])
+LLM_LATENCY = Histogram('defectportal_llm_latency_seconds', "LLM call latency.", ['backend'])
+CACHE_REQUESTS = Counter('defectportal_cache_requests_total', "Cache lookups by result.", ['cache', 'result'])
+CACHE_ENTRIES = Gauge('defectportal_cache_entries', "Entries held by a cache.", ['cache'])
+DB_QUERY_SECONDS = Histogram('defectportal_db_query_seconds', "Database read time.", ['table'])
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes every few seconds would flood the app log
+        pass
+
+
+_server: Optional[ThreadingHTTPServer] = None
+_server_lock = threading.Lock()
+# start_metrics_server_from_config ran in this process (whether or not the port was free)
+_config_start_attempted = False
+
+
+def start_metrics_server(port: int = DEFAULT_PORT, host: str = "127.0.0.1") -> Optional[ThreadingHTTPServer]:
+    """
+    Serve /metrics from a daemon thread (once per process; later calls return the running server).
+
+    Returns:
+        The server, or None if the port is taken (e.g. by another Streamlit server process).
+    """
+    global _server
+    with _server_lock:
+        if _server is not None:
+            return _server
+        try:
+            server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        except OSError as e:
+            logger.warning(f"Metrics endpoint not started on {host}:{port}: {e}")
+            return None
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+        _server = server
+        logger.info(f"Metrics available at http://{host}:{port}/metrics")
+        return server
+
+
+def start_metrics_server_from_config(port: Optional[int] = None) -> Optional[ThreadingHTTPServer]:
+    """
+    Start the endpoint if metrics.enabled is set in the GenAI config. Only the first call in a
+    process reads the config and tries to bind; later calls (e.g. every Streamlit rerun)
+    return the result of that attempt.
+    """
+    global _config_start_attempted
+    with _server_lock:
+        if _config_start_attempted:
+            return _server
+        _config_start_attempted = True
+
+    from .config import get_config_section
+
+    metrics_config = get_config_section('metrics')
+    if not metrics_config.get('enabled', True):
+        return None
+    return start_metrics_server(
+        port=port or metrics_config.get('port', DEFAULT_PORT),
+        host=metrics_config.get('host', '127.0.0.1')
+    )
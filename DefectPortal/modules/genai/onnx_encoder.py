@@ -0,0 +1,246 @@
+"""
+ONNX Runtime Embedding Backend
+Runs a sentence-transformer model exported to ONNX (optionally int8 dynamic-quantized) on CPU.
+Loading and encoding only need onnxruntime + tokenizers, so torch is never imported at startup.
+"""
+
+import json
+import logging
+import os
+import numpy as np
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+ONNX_MODEL_FILE = "model.onnx"
+ONNX_INT8_MODEL_FILE = "model_int8.onnx"
+EXPORT_CONFIG_FILE = "export_config.json"
+TOKENIZER_FILE = "tokenizer.json"
+
+
+def default_onnx_dir(model_name: str) -> str:
+    """Folder holding the exported ONNX files for a model (under knowledge_base/onnx_models)."""
+    base_path = Path(__file__).parent.parent.parent
+    return str(base_path / "knowledge_base" / "onnx_models" / model_name.replace('/', '__'))
+
+
+def export_onnx_model(model_name: str, output_dir: str = None, quantize: bool = True, opset: int = 14) -> str:
+    """
+    Export a sentence-transformer model to ONNX (one-off step; needs torch and sentence-transformers).
+
+    Args:
+        model_name: sentence-transformers model name or path.
+        output_dir: Target folder. Defaults to default_onnx_dir(model_name).
+        quantize: Also write an int8 dynamic-quantized copy (needs the onnx package).
+        opset: ONNX opset version.
+
+    Returns:
+        The output folder.
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer, models
+
+    output_dir = output_dir or default_onnx_dir(model_name)
+    os.makedirs(output_dir, exist_ok=True)
+    logger.info(f"Exporting {model_name} to ONNX in {output_dir}")
+
+    st_model = SentenceTransformer(model_name, device='cpu')
+    transformer = st_model[0].auto_model.eval()
+    tokenizer = st_model.tokenizer
+
+    pooling = next((m for m in st_model if isinstance(m, models.Pooling)), None)
+    pooling_mode = 'mean'
+    if pooling is not None:
+        # get_pooling_mode_str() was replaced by a pooling_mode attribute in newer releases
+        get_mode = getattr(pooling, 'get_pooling_mode_str', None)
+        pooling_mode = get_mode() if get_mode else getattr(pooling, 'pooling_mode', 'mean')
+        pooling_mode = {'mean_tokens': 'mean', 'cls_token': 'cls', 'max_tokens': 'max'}.get(pooling_mode, pooling_mode)
+    normalize = any(isinstance(m, models.Normalize) for m in st_model)
+
+    sample = tokenizer(["export sample text"], return_tensors='pt')
+    input_names = [n for n in ('input_ids', 'attention_mask', 'token_type_ids') if n in sample]
+
+    class _HiddenStates(torch.nn.Module):
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, *inputs):
+            return self.model(**dict(zip(input_names, inputs))).last_hidden_state
+
+    dynamic_axes = {n: {0: 'batch', 1: 'sequence'} for n in input_names}
+    dynamic_axes['last_hidden_state'] = {0: 'batch', 1: 'sequence'}
+    export_kwargs = dict(
+        input_names=input_names,
+        output_names=['last_hidden_state'],
+        dynamic_axes=dynamic_axes,
+        opset_version=opset
+    )
+    model_path = os.path.join(output_dir, ONNX_MODEL_FILE)
+    with torch.no_grad():
+        try:
+            torch.onnx.export(_HiddenStates(transformer), tuple(sample[n] for n in input_names), model_path,
+                              dynamo=False, **export_kwargs)
+        except TypeError:
+            # Older torch versions have no dynamo switch
+            torch.onnx.export(_HiddenStates(transformer), tuple(sample[n] for n in input_names), model_path,
+                              **export_kwargs)
+
+    tokenizer.save_pretrained(output_dir)
+    with open(os.path.join(output_dir, EXPORT_CONFIG_FILE), 'w', encoding='utf-8') as f:
+        json.dump({
+            'model_name': model_name,
+            'max_seq_length': st_model.max_seq_length,
+            'pooling': pooling_mode,
+            'normalize': normalize,
+            'pad_token_id': tokenizer.pad_token_id or 0,
+            'dimension': st_model.get_sentence_embedding_dimension()
+        }, f, indent=2)
+
+    if quantize:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        quantize_dynamic(model_path, os.path.join(output_dir, ONNX_INT8_MODEL_FILE), weight_type=QuantType.QInt8)
+        logger.info("Wrote int8 dynamic-quantized model")
+
+    logger.info("ONNX export complete")
+    return output_dir
+
+
+class _OnnxTokenizer:
+    """Callable wrapper giving a `tokenizers.Tokenizer` the part of the HF tokenizer call API we use."""
+
+    def __init__(self, tokenizer):
+        self._tokenizer = tokenizer
+
+    def __call__(self, texts: List[str], **kwargs) -> Dict[str, List[List[int]]]:
+        encodings = self._tokenizer.encode_batch(
+            [str(t).strip() for t in texts],
+            add_special_tokens=kwargs.get('add_special_tokens', True)
+        )
+        return {'input_ids': [e.ids for e in encodings]}
+
+
+class OnnxSentenceEncoder:
+    """
+    Drop-in replacement for the parts of SentenceTransformer used by EmbeddingService
+    (encode, tokenizer, max_seq_length), backed by onnxruntime.
+    """
+
+    def __init__(self, model_dir: str, quantized: bool = False, num_threads: Optional[int] = None):
+        """
+        Load an exported model.
+
+        Args:
+            model_dir: Folder written by export_onnx_model().
+            quantized: Use the int8 model instead of the float32 one.
+            num_threads: onnxruntime intra-op threads (None = onnxruntime default).
+        """
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        with open(os.path.join(model_dir, EXPORT_CONFIG_FILE), 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        self.max_seq_length = config.get('max_seq_length', 256)
+        self.pooling = config.get('pooling', 'mean')
+        self.normalize = config.get('normalize', True)
+        self.dimension = config.get('dimension', 384)
+        self._pad_id = config.get('pad_token_id', 0)
+
+        self._tokenizer = Tokenizer.from_file(os.path.join(model_dir, TOKENIZER_FILE))
+        self._tokenizer.enable_truncation(max_length=self.max_seq_length)
+        self._tokenizer.no_padding()
+        self.tokenizer = _OnnxTokenizer(self._tokenizer)
+
+        model_file = ONNX_INT8_MODEL_FILE if quantized else ONNX_MODEL_FILE
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, model_file),
+            options,
+            providers=['CPUExecutionProvider']
+        )
+        self._input_names = {i.name for i in self.session.get_inputs()}
+        logger.info(f"Loaded ONNX embedding model {model_file} from {model_dir}")
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+
+    def encode(
+        self,
+        sentences: Union[str, List[str]],
+        batch_size: int = 32,
+        convert_to_numpy: bool = True,
+        show_progress_bar: bool = False,
+        **kwargs
+    ) -> np.ndarray:
+        """Encode one text (returns a vector) or a list of texts (returns a matrix)."""
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        outputs = [self._encode_batch(texts[i:i + batch_size]) for i in range(0, len(texts), batch_size)]
+        embeddings = np.vstack(outputs) if outputs else np.zeros((0, self.dimension), dtype=np.float32)
+        return embeddings[0] if single else embeddings
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        """Tokenize, pad to the longest text in the batch, run the model and pool."""
+        encodings = self._tokenizer.encode_batch([str(t).strip() for t in texts])
+        max_len = max(len(e.ids) for e in encodings)
+        input_ids = np.full((len(encodings), max_len), self._pad_id, dtype=np.int64)
+        attention_mask = np.zeros((len(encodings), max_len), dtype=np.int64)
+        token_type_ids = np.zeros((len(encodings), max_len), dtype=np.int64)
+        for i, e in enumerate(encodings):
+            n = len(e.ids)
+            input_ids[i, :n] = e.ids
+            attention_mask[i, :n] = 1
+            token_type_ids[i, :n] = e.type_ids
+
+        feeds = {
+            'input_ids': input_ids,
+            'attention_mask': attention_mask,
+            'token_type_ids': token_type_ids
+        }
+        hidden = self.session.run(None, {k: v for k, v in feeds.items() if k in self._input_names})[0]
+
+        if self.pooling == 'cls':
+            embeddings = hidden[:, 0]
+        elif self.pooling == 'max':
+            masked = np.where(attention_mask[:, :, None] > 0, hidden, -1e9)
+            embeddings = masked.max(axis=1)
+        else:
+            mask = attention_mask[:, :, None].astype(hidden.dtype)
+            embeddings = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+        if self.normalize:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.clip(norms, 1e-12, None)
+        return embeddings.astype(np.float32)
+
+
+def load_onnx_encoder(
+    model_name: str,
+    onnx_dir: str = None,
+    quantized: bool = False,
+    num_threads: Optional[int] = None,
+    export_if_missing: bool = True
+) -> OnnxSentenceEncoder:
+    """
+    Load the ONNX encoder for a model, exporting it first if it has not been exported yet.
+
+    Args:
+        model_name: sentence-transformers model name.
+        onnx_dir: Folder with the exported files. Defaults to default_onnx_dir(model_name).
+        quantized: Use the int8 model.
+        num_threads: onnxruntime intra-op threads.
+        export_if_missing: Run export_onnx_model() when the files are missing (needs torch once).
+
+    Returns:
+        OnnxSentenceEncoder instance.
+    """
+    onnx_dir = onnx_dir or default_onnx_dir(model_name)
+    model_file = ONNX_INT8_MODEL_FILE if quantized else ONNX_MODEL_FILE
+    if not os.path.exists(os.path.join(onnx_dir, model_file)):
+        if not export_if_missing:
+            raise FileNotFoundError(f"ONNX model not found: {os.path.join(onnx_dir, model_file)}")
+        export_onnx_model(model_name, onnx_dir, quantize=quantized)
+    return OnnxSentenceEncoder(onnx_dir, quantized=quantized, num_threads=num_threads)
@@ -0,0 +1,227 @@
+"""
+Record Store Module
+SQLite-backed store for the text and metadata of indexed defects and document chunks.
+VectorStore keeps only ids and the embedding matrix in memory and reads records from
+here for the rows it actually returns.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from typing import List, Dict, Any, Tuple, Optional, Iterator
+
+logger = logging.getLogger(__name__)
+
+RECORDS_FILE = "records.sqlite"
+
+
+class RecordStore:
+    """
+    Row-indexed records (id, metadata, document text) per collection key, addressed by the row
+    number of the matching embedding. VectorStore keys collections by index version
+    ('defects@<version>'), so a published index and its records always match.
+    """
+
+    def __init__(self, persist_directory: str):
+        """
+        Open (or create) the record store.
+
+        Args:
+            persist_directory: Vector store directory; the SQLite file is created inside it.
+        """
+        self.path = os.path.join(persist_directory, RECORDS_FILE)
+        self._lock = threading.Lock()
+        # One shared connection; Streamlit calls in from several threads, so access is serialised
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS records ("
+                " collection TEXT NOT NULL, row INTEGER NOT NULL, id TEXT,"
+                " metadata TEXT, document TEXT, PRIMARY KEY (collection, row))"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS collections ("
+                " collection TEXT PRIMARY KEY, count INTEGER, source_stamp TEXT)"
+            )
+            # Fingerprint per source file of a collection, including files that gave no records
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sources ("
+                " collection TEXT NOT NULL, source TEXT NOT NULL, fingerprint TEXT,"
+                " PRIMARY KEY (collection, source))"
+            )
+
+    def replace(
+        self,
+        collection: str,
+        ids: List[str],
+        metadata: List[Dict[str, Any]],
+        documents: List[str],
+        source_stamp: str = ''
+    ):
+        """
+        Replace all records of a collection.
+
+        Args:
+            collection: Collection key.
+            ids: Record ids, in row order.
+            metadata: Metadata dicts, in row order.
+            documents: Document texts, in row order.
+            source_stamp: Identifies the data the records were built from.
+        """
+        rows = (
+            (collection, i, ids[i], json.dumps(metadata[i]), documents[i])
+            for i in range(len(ids))
+        )
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM records WHERE collection = ?", (collection,))
+            self._conn.executemany(
+                "INSERT INTO records (collection, row, id, metadata, document) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO collections (collection, count, source_stamp) VALUES (?, ?, ?)",
+                (collection, len(ids), source_stamp)
+            )
+        logger.info(f"Stored {len(ids)} {collection} records in {self.path}")
+
+    def append(
+        self,
+        collection: str,
+        first_row: int,
+        ids: List[str],
+        metadata: List[Dict[str, Any]],
+        documents: List[str]
+    ):
+        """
+        Add records to a collection that is being built batch by batch (see finish).
+
+        Args:
+            collection: Collection key.
+            first_row: Row number of the first record.
+            ids: Record ids, in row order.
+            metadata: Metadata dicts, in row order.
+            documents: Document texts, in row order.
+        """
+        rows = (
+            (collection, first_row + i, ids[i], json.dumps(metadata[i]), documents[i])
+            for i in range(len(ids))
+        )
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO records (collection, row, id, metadata, document) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+
+    def finish(self, collection: str, count: int, source_stamp: str = ''):
+        """Record the size of a collection built with append()."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO collections (collection, count, source_stamp) VALUES (?, ?, ?)",
+                (collection, count, source_stamp)
+            )
+        logger.info(f"Stored {count} {collection} records in {self.path}")
+
+    def set_sources(self, collection: str, fingerprints: Dict[str, str]):
+        """
+        Record (or update) source file fingerprints of a collection.
+
+        Args:
+            collection: Collection key.
+            fingerprints: Source -> fingerprint.
+        """
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO sources (collection, source, fingerprint) VALUES (?, ?, ?)",
+                ((collection, source, fingerprint) for source, fingerprint in fingerprints.items())
+            )
+
+    def get_sources(self, collection: str) -> Dict[str, str]:
+        """Source -> fingerprint recorded for a collection."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT source, fingerprint FROM sources WHERE collection = ?", (collection,)
+            ).fetchall()
+        return {source: fingerprint or '' for source, fingerprint in rows}
+
+    def delete(self, collection: str):
+        """Remove all records of a collection."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM records WHERE collection = ?", (collection,))
+            self._conn.execute("DELETE FROM collections WHERE collection = ?", (collection,))
+            self._conn.execute("DELETE FROM sources WHERE collection = ?", (collection,))
+
+    def get(self, collection: str, rows: List[int]) -> List[Tuple[Dict[str, Any], str]]:
+        """
+        Read (metadata, document) for specific rows.
+
+        Args:
+            collection: Collection name.
+            rows: Row numbers.
+
+        Returns:
+            List of (metadata, document) in the order of `rows` (empty values for unknown rows).
+        """
+        if not rows:
+            return []
+        found = {}
+        unique = list(dict.fromkeys(int(r) for r in rows))
+        # Stay below SQLite's bound-parameter limit
+        for start in range(0, len(unique), 500):
+            chunk = unique[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            with self._lock:
+                cursor = self._conn.execute(
+                    f"SELECT row, metadata, document FROM records WHERE collection = ? AND row IN ({placeholders})",
+                    [collection] + chunk
+                )
+                for row, metadata, document in cursor:
+                    found[row] = (json.loads(metadata) if metadata else {}, document or '')
+        return [found.get(int(r), ({}, '')) for r in rows]
+
+    def iter_metadata(self, collection: str) -> Iterator[Dict[str, Any]]:
+        """Yield the metadata of every row of a collection, in row order."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT metadata FROM records WHERE collection = ? ORDER BY row", (collection,)
+            ).fetchall()
+        for (metadata,) in rows:
+            yield json.loads(metadata) if metadata else {}
+
+    def get_all_documents(self, collection: str) -> List[str]:
+        """Return every document text of a collection, in row order."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT document FROM records WHERE collection = ? ORDER BY row", (collection,)
+            ).fetchall()
+        return [document or '' for (document,) in rows]
+
+    def keyword_rows(self, collection: str, terms: List[str], limit: int) -> List[int]:
+        """
+        Rows whose text contains the most of the given terms (case-insensitive substring match).
+
+        Args:
+            collection: Collection name.
+            terms: Lower-cased search terms.
+            limit: Maximum number of rows.
+
+        Returns:
+            Row numbers ordered by number of matching terms (descending), then row.
+        """
+        if not terms:
+            return []
+        score = " + ".join("(instr(lower(document), ?) > 0)" for _ in terms)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT row FROM (SELECT row, {score} AS hits FROM records WHERE collection = ?)"
+                f" WHERE hits > 0 ORDER BY hits DESC, row LIMIT ?",
+                list(terms) + [collection, limit]
+            ).fetchall()
+        return [row for (row,) in rows]
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
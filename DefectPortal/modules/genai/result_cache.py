@@ -0,0 +1,111 @@
+"""
+Search Result Cache Module
+Process-wide LRU + TTL cache for EnhancedSearch.search results, shared by every Streamlit
+session (and search service request) in the process. Entries are stored as compressed
+pickles, so a cached result costs a few KB and callers always get their own copy.
+"""
+
+import logging
+import pickle
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from .metrics import CACHE_REQUESTS, CACHE_ENTRIES
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """Cache form of a query: lower-cased, trimmed, internal whitespace collapsed."""
+    return _WHITESPACE.sub(" ", (query or "").strip().lower())
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache with a time-to-live per entry.
+    """
+
+    def __init__(self, name: str = 'search_results', max_entries: int = 256, ttl_seconds: float = 900, compress_level: int = 1):
+        """
+        Args:
+            name: Cache name in the metrics (defectportal_cache_requests_total{cache=...}).
+            max_entries: Entries kept before the least recently used one is evicted.
+            ttl_seconds: Seconds an entry stays valid (0 = no expiry).
+            compress_level: zlib level for stored entries (1 = fastest).
+        """
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.compress_level = compress_level
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Look up a value.
+
+        Returns:
+            A fresh copy of the cached value, or None on a miss or expired entry.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl_seconds and time.monotonic() > entry[0]:
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                CACHE_REQUESTS.inc(cache=self.name, result='miss')
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            payload = entry[1]
+        CACHE_REQUESTS.inc(cache=self.name, result='hit')
+        return pickle.loads(zlib.decompress(payload))
+
+    def put(self, key: Hashable, value: Any):
+        """Store a value (serialised immediately, so later changes to it are not seen)."""
+        try:
+            payload = zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), self.compress_level)
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            logger.warning(f"Search result not cacheable: {e}")
+            return
+        expires = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expires, payload)
+            self._bytes += len(payload)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+            CACHE_ENTRIES.set(len(self._entries), cache=self.name)
+
+    def _remove(self, key: Hashable):
+        _, payload = self._entries.pop(key)
+        self._bytes -= len(payload)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        CACHE_ENTRIES.set(0, cache=self.name)
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry count, stored bytes and hit/miss counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 3) if lookups else 0.0
+            }
@@ -0,0 +1,152 @@
+"""
+Search Service Client
+Talks to the standalone search service (modules/genai/search_service.py) and exposes the
+parts of the EnhancedSearch API the Streamlit UI uses, so the app can run as a thin client.
+"""
+
+import logging
+import time
+from typing import Dict, Any, List, Optional
+
+import pandas as pd
+import requests
+
+from .tracing import span
+
+logger = logging.getLogger(__name__)
+
+
+class SearchServiceClient:
+    """
+    HTTP client for the search service with the EnhancedSearch interface.
+    """
+
+    def __init__(self, base_url: str, timeout: float = 180, status_ttl: float = 1.0):
+        """
+        Args:
+            base_url: Service URL, e.g. http://127.0.0.1:8765.
+            timeout: Seconds to wait for search/analysis responses (LLM calls can be slow).
+            status_ttl: Seconds a /status response is reused (one page render asks several times).
+        """
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.status_ttl = status_ttl
+        self._session = requests.Session()
+        self._status = None
+        self._status_time = 0.0
+
+    def _request(self, method: str, path: str, payload: Dict[str, Any] = None, timeout: float = None) -> Dict[str, Any]:
+        try:
+            with span(f"search_service{path}") as stage:
+                response = self._session.request(
+                    method, f"{self.base_url}{path}", json=payload, timeout=timeout or self.timeout
+                )
+                stage.set(status=response.status_code)
+        except requests.RequestException as e:
+            raise ConnectionError(f"Search service not reachable at {self.base_url}: {e}")
+        try:
+            body = response.json()
+        except ValueError:
+            body = {}
+        if response.status_code != 200:
+            raise RuntimeError(body.get('error') or f"Search service returned HTTP {response.status_code}")
+        return body
+
+    def _get_service_status(self) -> Dict[str, Any]:
+        """Cached /status; unreachable service is reported as an init error."""
+        now = time.monotonic()
+        if self._status is None or now - self._status_time > self.status_ttl:
+            try:
+                self._status = self._request('GET', '/status', timeout=5)
+            except (ConnectionError, RuntimeError) as e:
+                self._status = {'ready': False, 'error': str(e)}
+            self._status_time = now
+        return self._status
+
+    def is_ready(self) -> bool:
+        return bool(self._get_service_status().get('ready'))
+
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """Poll the service until it is ready; raises if it reports an initialization error."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            self._status = None
+            status = self._get_service_status()
+            if status.get('ready'):
+                return True
+            error = status.get('error') or status.get('init_progress', {}).get('error')
+            if error:
+                raise RuntimeError(error)
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.5)
+
+    def get_init_progress(self) -> Dict[str, Any]:
+        status = self._get_service_status()
+        if 'init_progress' in status:
+            return status['init_progress']
+        # Service unreachable: one failed stage so the UI shows the error and a Retry button
+        stage = {'name': 'service', 'label': "Connecting to search service", 'state': 'failed', 'error': status.get('error')}
+        return {'stages': [stage], 'completed': 0, 'total': 1, 'error': status.get('error')}
+
+    def get_status(self) -> Dict[str, Any]:
+        return self._get_service_status()
+
+    def index_data(
+        self,
+        defects_acc: pd.DataFrame = None,
+        defects_sit: pd.DataFrame = None,
+        index_documents: bool = True,
+        force_reindex: bool = False
+    ):
+        """
+        Make sure the service has an index. The service loads defects from the DB itself,
+        so the DataFrames are not sent; an existing index is only rebuilt on force_reindex.
+        """
+        status = self._get_service_status()
+        if force_reindex or not status.get('defects_indexed'):
+            self._request('POST', '/reindex_defects', {}, timeout=max(self.timeout, 1800))
+        if index_documents and not force_reindex and not status.get('documents_indexed'):
+            self.index_documents()
+        self._status = None
+
+    def index_documents(self, force_reindex: bool = False, full_rebuild: bool = False) -> Dict[str, Any]:
+        body = self._request(
+            'POST', '/index_documents', {'force_reindex': force_reindex, 'full_rebuild': full_rebuild},
+            timeout=max(self.timeout, 1800)
+        )
+        self._status = None
+        return body.get('changes') or {}
+
+    def search(
+        self,
+        query: str,
+        defects_acc: pd.DataFrame = None,
+        defects_sit: pd.DataFrame = None,
+        n_similar_defects: int = 5,
+        n_related_docs: int = 3,
+        min_similarity: float = 0.5
+    ) -> Dict[str, Any]:
+        return self._request('POST', '/search', {
+            'query': query,
+            'n_similar_defects': n_similar_defects,
+            'n_related_docs': n_related_docs,
+            'min_similarity': min_similarity
+        })
+
+    def analyze_defect(self, defect: Dict[str, Any], n_similar: int = 5, n_docs: int = 3) -> Dict[str, Any]:
+        # Send values JSON cannot carry (e.g. Timestamps from DB rows) as text
+        defect = {str(k): (v if isinstance(v, (str, int, float, bool)) or v is None else str(v)) for k, v in defect.items()}
+        return self._request('POST', '/analyze_defect', {'defect': defect, 'n_similar': n_similar, 'n_docs': n_docs})
+
+    def find_similar_batch(
+        self,
+        defects: List[Dict[str, Any]],
+        n_similar: int = 5,
+        min_similarity: float = 0.5
+    ) -> List[List[Dict[str, Any]]]:
+        return self._request('POST', '/find_similar_batch', {
+            'defects': defects,
+            'n_similar': n_similar,
+            'min_similarity': min_similarity
+        })['results']
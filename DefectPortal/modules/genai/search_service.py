@@ -0,0 +1,308 @@
+"""
+Search Service Module
+Headless HTTP/JSON API around EnhancedSearch, so the embedding model, vector index and LLM
+connection are loaded once in one process and shared by every Streamlit session (and by
+other clients such as Jira bots). Run it with utilities/run_search_service.py.
+
+Endpoints:
+    GET  /health                liveness (always 200 once the server is up)
+    GET  /status                EnhancedSearch.get_status() plus init progress and worker stats
+    POST /search                {"query", "n_similar_defects", "n_related_docs", "min_similarity"}
+    POST /analyze_defect        {"defect", "n_similar", "n_docs"}
+    POST /find_similar_batch    {"defects", "n_similar", "min_similarity"}
+    POST /index_documents       {"force_reindex", "full_rebuild"}
+    POST /reindex_defects       {} - reload defects_table_acc/sit from the DB and re-index
+
+The server is asyncio-based (starlette on uvicorn); the blocking search calls run in a
+bounded thread pool, so slow LLM calls never stall /status or other requests' I/O.
+"""
+
+import asyncio
+import logging
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+
+class ServiceError(Exception):
+    """Request error returned to the client with an HTTP status code."""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def to_jsonable(value: Any) -> Any:
+    """Convert numpy/pandas values in a result structure to plain JSON types (NaN -> None)."""
+    if isinstance(value, dict):
+        return {str(k): to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [to_jsonable(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return to_jsonable(value.tolist())
+    if isinstance(value, pd.DataFrame):
+        return to_jsonable(value.to_dict(orient='records'))
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def request_number(body: Dict[str, Any], name: str, default, kind: Callable = int, minimum=None):
+    """
+    A numeric field of a request body (default if absent).
+    
+    Raises:
+        ServiceError: (400) if the value is not a finite number, or is below `minimum`.
+    """
+    value = body.get(name, default)
+    try:
+        number = kind(value)
+    except (TypeError, ValueError, OverflowError):
+        raise ServiceError(f"'{name}' must be a number")
+    if not math.isfinite(number):
+        raise ServiceError(f"'{name}' must be a finite number")
+    if minimum is not None and number < minimum:
+        raise ServiceError(f"'{name}' must be at least {minimum}")
+    return number
+
+
+def load_defects_from_db():
+    """
+    Load the ACC and SIT defect tables the same way the Streamlit app does.
+    
+    Raises:
+        RuntimeError: If the database cannot be reached or a table cannot be read.
+    """
+    from modules.database_connection import create_db_engine
+    from modules.utilities import fetch_defects
+
+    engine = create_db_engine()
+    frames = []
+    for table in ("defects_table_acc", "defects_table_sit"):
+        try:
+            df = fetch_defects(engine, table)
+        except Exception as e:
+            raise RuntimeError(f"Could not load defects from {table}: {e}") from e
+        frames.append(df.fillna("").replace("nan", "").replace("NaN", ""))
+    return frames[0], frames[1]
+
+
+class SearchService:
+    """
+    Owns the EnhancedSearch instance and the worker pool the request handlers run on.
+    """
+
+    def __init__(self, worker_threads: int = 4, max_pending: int = 64):
+        """
+        Args:
+            worker_threads: Threads running blocking search/LLM calls.
+            max_pending: Requests allowed to wait for a worker; more are rejected with 429.
+        """
+        self.worker_threads = worker_threads
+        self.max_pending = max_pending
+        self.enhanced_search = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+        self._served = 0
+        self._failed = 0
+        self._started = time.time()
+        self._index_lock = threading.Lock()
+
+    def start(self):
+        """Start the worker pool and begin loading the GenAI services in the background."""
+        from .enhanced_search import EnhancedSearch
+
+        self._executor = ThreadPoolExecutor(max_workers=self.worker_threads, thread_name_prefix="search-worker")
+        self.enhanced_search = EnhancedSearch(background=True)
+        logger.info(f"Search service started with {self.worker_threads} worker threads")
+
+    def stop(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    async def run(self, func: Callable, *args, require_ready: bool = True, **kwargs) -> Any:
+        """
+        Run a blocking call on the worker pool.
+
+        Raises:
+            ServiceError: 503 while the services are loading, 429 when the queue is full.
+        """
+        if require_ready and not self.enhanced_search.is_ready():
+            progress = self.enhanced_search.get_init_progress()
+            raise ServiceError(progress['error'] or "Search services are still loading", 503)
+        if self._pending >= self.max_pending + self.worker_threads:
+            raise ServiceError("Search service is busy, try again shortly", 429)
+
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._executor, lambda: func(*args, **kwargs))
+            self._served += 1
+            return result
+        except Exception:
+            self._failed += 1
+            raise
+        finally:
+            self._pending -= 1
+
+    def status(self) -> Dict[str, Any]:
+        """Service status: GenAI status (once ready), init progress and worker stats."""
+        search = self.enhanced_search
+        status = search.get_status() if search.is_ready() else {'initialized': True, 'ready': False}
+        status['init_progress'] = search.get_init_progress()
+        status['service'] = {
+            'worker_threads': self.worker_threads,
+            'in_flight': self._pending,
+            'requests_served': self._served,
+            'requests_failed': self._failed,
+            'uptime_seconds': round(time.time() - self._started, 1)
+        }
+        return status
+
+    def index_documents(self, force_reindex: bool = False, full_rebuild: bool = False):
+        with self._index_lock:
+            changes = self.enhanced_search.index_documents(force_reindex=force_reindex, full_rebuild=full_rebuild)
+        return {**self.enhanced_search.get_status(), 'changes': changes}
+
+    def reindex_defects(self):
+        with self._index_lock:
+            defects_acc, defects_sit = load_defects_from_db()
+            self.enhanced_search.index_data(defects_acc, defects_sit, index_documents=False, force_reindex=True)
+        return self.enhanced_search.get_status()
+
+
+def create_app(worker_threads: int = 4, max_pending: int = 64):
+    """
+    Build the ASGI application.
+
+    Args:
+        worker_threads: Threads running blocking search/LLM calls.
+        max_pending: Requests allowed to queue for a worker before returning 429.
+
+    Returns:
+        Starlette application (serve it with uvicorn).
+    """
+    from starlette.applications import Starlette
+    from starlette.requests import Request
+    from starlette.responses import JSONResponse
+    from starlette.routing import Route
+
+    service = SearchService(worker_threads=worker_threads, max_pending=max_pending)
+
+    @asynccontextmanager
+    async def lifespan(app):
+        service.start()
+        yield
+        service.stop()
+
+    async def read_json(request: Request) -> Dict[str, Any]:
+        try:
+            body = await request.json()
+        except ValueError:
+            raise ServiceError("Request body must be JSON")
+        if not isinstance(body, dict):
+            raise ServiceError("Request body must be a JSON object")
+        return body
+
+    def endpoint(handler):
+        """Wrap a handler: JSON-encode its result and map errors to status codes."""
+        async def wrapped(request: Request):
+            try:
+                return JSONResponse(to_jsonable(await handler(request)))
+            except ServiceError as e:
+                return JSONResponse({'error': str(e)}, status_code=e.status_code)
+            except Exception as e:
+                logger.error(f"Search service error on {request.url.path}: {e}")
+                return JSONResponse({'error': str(e)}, status_code=500)
+        return wrapped
+
+    async def health(request: Request):
+        return {'status': 'ok'}
+
+    async def status(request: Request):
+        return service.status()
+
+    async def search(request: Request):
+        body = await read_json(request)
+        query = body.get('query')
+        if not isinstance(query, str):
+            raise ServiceError("'query' must be a string")
+        return await service.run(
+            service.enhanced_search.search,
+            query,
+            n_similar_defects=request_number(body, 'n_similar_defects', 5, minimum=0),
+            n_related_docs=request_number(body, 'n_related_docs', 3, minimum=0),
+            min_similarity=request_number(body, 'min_similarity', 0.5, kind=float)
+        )
+
+    async def analyze_defect(request: Request):
+        body = await read_json(request)
+        defect = body.get('defect')
+        if not isinstance(defect, dict):
+            raise ServiceError("'defect' must be an object with JIRA fields")
+        return await service.run(
+            service.enhanced_search.analyze_defect,
+            defect,
+            n_similar=request_number(body, 'n_similar', 5, minimum=0),
+            n_docs=request_number(body, 'n_docs', 3, minimum=0)
+        )
+
+    async def find_similar_batch(request: Request):
+        body = await read_json(request)
+        defects = body.get('defects')
+        if not isinstance(defects, list) or not all(isinstance(d, dict) for d in defects):
+            raise ServiceError("'defects' must be a list of objects with JIRA fields")
+        results = await service.run(
+            service.enhanced_search.find_similar_batch,
+            defects,
+            n_similar=request_number(body, 'n_similar', 5, minimum=0),
+            min_similarity=request_number(body, 'min_similarity', 0.5, kind=float)
+        )
+        return {'results': results}
+
+    async def index_documents(request: Request):
+        body = await read_json(request)
+        return await service.run(
+            service.index_documents, bool(body.get('force_reindex', False)), bool(body.get('full_rebuild', False))
+        )
+
+    async def reindex_defects(request: Request):
+        return await service.run(service.reindex_defects)
+
+    routes = [
+        Route("/health", endpoint(health), methods=["GET"]),
+        Route("/status", endpoint(status), methods=["GET"]),
+        Route("/search", endpoint(search), methods=["POST"]),
+        Route("/analyze_defect", endpoint(analyze_defect), methods=["POST"]),
+        Route("/find_similar_batch", endpoint(find_similar_batch), methods=["POST"]),
+        Route("/index_documents", endpoint(index_documents), methods=["POST"]),
+        Route("/reindex_defects", endpoint(reindex_defects), methods=["POST"]),
+    ]
+    app = Starlette(routes=routes, lifespan=lifespan)
+    app.state.service = service
+    return app
+
+
+def run_service(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, worker_threads: int = 4, max_pending: int = 64):
+    """Serve the search API with uvicorn (blocks until stopped)."""
+    import uvicorn
+
+    uvicorn.run(create_app(worker_threads, max_pending), host=host, port=port, log_level="info")
@@ -0,0 +1,209 @@
+"""
+Shared Vector Index Module
+Publishes the VectorStore embedding matrices as versioned, memory-mapped .npy files so
+several Streamlit server processes share one copy through the OS page cache.
+
+Layout under <persist_directory>/index:
+    <collection>.current                      name of the active version (replaced atomically)
+    <collection>/<version>/manifest.json      count, dimension, source stamp
+    <collection>/<version>/ids.json           row ids
+    <collection>/<version>/vectors.float32.codes.npy   L2-normalised float32 rows
+    <collection>/<version>/vectors.<precision>.*.npy   compact copies (float16 / int8)
+
+A new version is written to its own folder and only then made current, so readers
+never see a half-written index. Old versions are removed after a publish; processes
+still mapping them keep a valid view until they reload (on Windows the delete is
+retried at the next publish).
+"""
+
+import json
+import logging
+import os
+import shutil
+import time
+import numpy as np
+from typing import List, Optional
+
+from .vector_quantization import QuantizedVectors, load_array
+
+logger = logging.getLogger(__name__)
+
+INDEX_DIR = "index"
+MANIFEST_FILE = "manifest.json"
+IDS_FILE = "ids.json"
+VECTORS_PREFIX = "vectors"
+
+
+class SharedIndex:
+    """One attached (read-only) version of a collection's index."""
+
+    def __init__(
+        self,
+        collection: str,
+        version: Optional[str],
+        ids: List[str],
+        vectors: QuantizedVectors,
+        full: np.ndarray,
+        source_stamp: str = ''
+    ):
+        """
+        Args:
+            collection: 'defects' or 'documents'.
+            version: Version name (None for an empty, unpublished collection).
+            ids: Row ids.
+            vectors: Compact vectors used for scoring.
+            full: L2-normalised float32 rows (memory-mapped), used for rescoring and export.
+            source_stamp: Stamp of the JSON file the version was built from.
+        """
+        self.collection = collection
+        self.version = version
+        self.ids = ids
+        self.vectors = vectors
+        self.full = full
+        self.source_stamp = source_stamp
+
+    @classmethod
+    def empty(cls, collection: str, precision: str) -> 'SharedIndex':
+        return cls(collection, None, [], QuantizedVectors(precision), np.zeros((0, 0), dtype=np.float32))
+
+    @property
+    def records_key(self) -> str:
+        """Collection key of this version's rows in the RecordStore."""
+        return f"{self.collection}@{self.version}"
+
+
+def _collection_dir(index_directory: str, collection: str) -> str:
+    return os.path.join(index_directory, collection)
+
+
+def _pointer_file(index_directory: str, collection: str) -> str:
+    return os.path.join(index_directory, f"{collection}.current")
+
+
+def new_version_name() -> str:
+    """Sortable, process-unique version name."""
+    return f"v{time.time_ns()}_{os.getpid()}"
+
+
+def write_version(
+    index_directory: str,
+    collection: str,
+    version: str,
+    ids: List[str],
+    matrix: np.ndarray,
+    precision: str,
+    source_stamp: str = ''
+):
+    """
+    Write a new (not yet current) version of a collection.
+
+    Args:
+        index_directory: The shared index folder.
+        collection: 'defects' or 'documents'.
+        version: Name from new_version_name().
+        ids: Row ids.
+        matrix: L2-normalised float32 embeddings (n x d).
+        precision: Also write the compact copy for this precision.
+        source_stamp: Stamp of the JSON file the data came from.
+    """
+    version_dir = os.path.join(_collection_dir(index_directory, collection), version)
+    os.makedirs(version_dir, exist_ok=True)
+    prefix = os.path.join(version_dir, VECTORS_PREFIX)
+
+    matrix = np.asarray(matrix, dtype=np.float32)
+    QuantizedVectors.from_codes(matrix, 'float32').save(prefix)
+    if precision != 'float32' and len(matrix):
+        QuantizedVectors.from_matrix(matrix, precision, normalized=True).save(prefix)
+
+    with open(os.path.join(version_dir, IDS_FILE), 'w', encoding='utf-8') as f:
+        json.dump(ids, f)
+    with open(os.path.join(version_dir, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump({
+            'version': version,
+            'count': len(ids),
+            'dimension': int(matrix.shape[1]) if matrix.ndim == 2 else 0,
+            'source_stamp': source_stamp,
+            'created': time.time()
+        }, f)
+
+
+def activate_version(index_directory: str, collection: str, version: str):
+    """Make a written version current (atomic rename of the pointer file)."""
+    pointer = _pointer_file(index_directory, collection)
+    tmp_pointer = f"{pointer}.{os.getpid()}.tmp"
+    with open(tmp_pointer, 'w', encoding='utf-8') as f:
+        f.write(version)
+    os.replace(tmp_pointer, pointer)
+    logger.info(f"Published {collection} index version {version}")
+
+
+def current_version(index_directory: str, collection: str) -> Optional[str]:
+    """Name of the current version of a collection, or None if nothing is published."""
+    try:
+        with open(_pointer_file(index_directory, collection), 'r', encoding='utf-8') as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def read_manifest(index_directory: str, collection: str, version: str) -> Optional[dict]:
+    """Manifest of a version, or None if it is missing or unreadable."""
+    path = os.path.join(_collection_dir(index_directory, collection), version, MANIFEST_FILE)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def attach_version(index_directory: str, collection: str, version: str, precision: str) -> SharedIndex:
+    """
+    Attach read-only to a published version (memory-mapped).
+    If the compact copy for `precision` is missing (another process published with a different
+    precision), it is built from the float32 rows once and saved for the other processes.
+
+    Returns:
+        SharedIndex for the version.
+    """
+    version_dir = os.path.join(_collection_dir(index_directory, collection), version)
+    manifest = read_manifest(index_directory, collection, version) or {}
+    prefix = os.path.join(version_dir, VECTORS_PREFIX)
+
+    with open(os.path.join(version_dir, IDS_FILE), 'r', encoding='utf-8') as f:
+        ids = json.load(f)
+    full = load_array(f"{prefix}.float32.codes.npy")
+
+    if precision == 'float32' or not len(full):
+        vectors = QuantizedVectors.from_codes(full, 'float32') if precision == 'float32' else QuantizedVectors(precision)
+    else:
+        vectors = QuantizedVectors.load(prefix, precision)
+        if vectors is None:
+            QuantizedVectors.from_matrix(np.asarray(full), precision, normalized=True).save(prefix)
+            vectors = QuantizedVectors.load(prefix, precision)
+
+    return SharedIndex(collection, version, ids, vectors, full, manifest.get('source_stamp', ''))
+
+
+def remove_old_versions(index_directory: str, collection: str, keep: int = 2) -> List[str]:
+    """
+    Delete all but the newest `keep` versions of a collection (the current one is always kept).
+
+    Returns:
+        Names of the versions that were removed.
+    """
+    root = _collection_dir(index_directory, collection)
+    if not os.path.isdir(root):
+        return []
+    current = current_version(index_directory, collection)
+    versions = sorted((v for v in os.listdir(root) if os.path.isdir(os.path.join(root, v))), reverse=True)
+    removed = []
+    for version in versions[keep:]:
+        if version == current:
+            continue
+        try:
+            shutil.rmtree(os.path.join(root, version))
+            removed.append(version)
+        except OSError as e:
+            # Still mapped by a process on Windows; retried at the next publish
+            logger.debug(f"Could not remove index version {version}: {e}")
+    return removed
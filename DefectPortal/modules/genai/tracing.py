@@ -0,0 +1,175 @@
+"""
+Tracing Module
+Lightweight nested timing spans for the AI search pipeline (search stages, document search,
+LLM calls, UI render). Each finished trace is written to the log as one structured JSON
+record per span, and the UI can show the spans of the last search as a waterfall.
+
+Usage:
+    with span("EnhancedSearch.search", query_chars=len(query)) as s:
+        with span("embedding.query"):
+            ...
+        s.set(cache_hit=False)
+    s.trace.to_records()   # list of span dicts, parents first
+
+A span opened while no trace is active starts a new trace. Work handed to a thread pool
+stays in the caller's trace when submitted through propagate(). Spans opened inside
+untraced() are neither logged nor counted in STAGE_DURATION.
+"""
+
+import contextvars
+import functools
+import json
+import logging
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+from .metrics import STAGE_DURATION
+
+logger = logging.getLogger(__name__)
+
+_current_span = contextvars.ContextVar('genai_current_span', default=None)
+# Marks an untraced() block in _current_span
+_UNTRACED = object()
+
+
+class Trace:
+    """All spans recorded under one root span (shared by the threads working on it)."""
+
+    def __init__(self, name: str):
+        self.trace_id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.origin = time.perf_counter()
+        self.spans: List['Span'] = []
+        self._lock = threading.Lock()
+
+    def add(self, span: 'Span'):
+        with self._lock:
+            self.spans.append(span)
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """Span dicts ordered by start time; times are ms from the start of the trace."""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.start)
+        return [s.to_record() for s in spans]
+
+    @property
+    def duration_ms(self) -> float:
+        root = self.spans[0] if self.spans else None
+        return root.duration_ms if root is not None else 0.0
+
+
+class Span:
+    """One timed stage."""
+
+    def __init__(self, name: str, trace: Trace, parent: Optional['Span'], attrs: Dict[str, Any]):
+        self.span_id = uuid.uuid4().hex[:8]
+        self.name = name
+        self.trace = trace
+        self.parent = parent
+        self.depth = parent.depth + 1 if parent is not None else 0
+        self.attrs = attrs
+        self.thread = threading.current_thread().name
+        self.start = time.perf_counter()
+        self.end = None
+        self.error = None
+
+    def set(self, **attrs):
+        """Attach attributes (e.g. result counts, cache hit) to the span."""
+        self.attrs.update(attrs)
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end if self.end is not None else time.perf_counter()
+        return (end - self.start) * 1000
+
+    def to_record(self) -> Dict[str, Any]:
+        record = {
+            'trace_id': self.trace.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent.span_id if self.parent is not None else None,
+            'name': self.name,
+            'depth': self.depth,
+            'start_ms': round((self.start - self.trace.origin) * 1000, 2),
+            'duration_ms': round(self.duration_ms, 2),
+            'thread': self.thread
+        }
+        if self.error:
+            record['error'] = self.error
+        record.update(self.attrs)
+        return record
+
+
+def current_span() -> Optional[Span]:
+    """The innermost open span of this context, if any (None inside untraced())."""
+    current = _current_span.get()
+    return None if current is _UNTRACED else current
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """
+    Time a block as a span nested under the current one (or as the root of a new trace).
+    The trace is logged when its root span closes.
+    """
+    parent = _current_span.get()
+    if parent is _UNTRACED:
+        # Not recorded; a detached span so callers can still set attributes
+        yield Span(name, Trace(name), None, attrs)
+        return
+    trace = parent.trace if parent is not None else Trace(name)
+    current = Span(name, trace, parent, attrs)
+    trace.add(current)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = type(e).__name__
+        raise
+    finally:
+        current.end = time.perf_counter()
+        _current_span.reset(token)
+        STAGE_DURATION.observe(current.end - current.start, stage=name)
+        if parent is None:
+            _log_trace(trace)
+
+
+@contextmanager
+def untraced():
+    """
+    Run a block without recording its spans, e.g. a UI rerun that only redraws stored results
+    and would otherwise log a trace on every widget interaction.
+    """
+    token = _current_span.set(_UNTRACED)
+    try:
+        yield
+    finally:
+        _current_span.reset(token)
+
+
+def traced(name: Optional[str] = None):
+    """Decorator running the function inside a span (named after the function by default)."""
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def propagate(func: Callable) -> Callable:
+    """Bind a callable to the current context so spans it opens in a pool thread join this trace."""
+    return functools.partial(contextvars.copy_context().run, func)
+
+
+def _log_trace(trace: Trace):
+    """Write every span of a finished trace to the log as a JSON record."""
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    for record in trace.to_records():
+        logger.info("span %s", json.dumps(record, default=str))
@@ -0,0 +1,203 @@
+"""
+Vector Quantization Module
+Compact storage for the VectorStore embedding matrices: float32, float16 or
+8-bit scalar-quantized codes with a per-dimension scale/offset.
+"""
+
+import logging
+import os
+import numpy as np
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+PRECISIONS = ('float32', 'float16', 'int8')
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Return an L2-normalised float32 copy of a matrix (zero rows stay zero)."""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def load_array(path: str, mmap_mode: Optional[str] = 'r') -> np.ndarray:
+    """np.load with memory mapping (empty arrays cannot be mapped and are read normally)."""
+    array = np.load(path, mmap_mode=mmap_mode)
+    if mmap_mode and array.size == 0:
+        array = np.load(path)
+    return array
+
+
+class QuantizedVectors:
+    """
+    Row-normalised vectors stored in a compact form.
+
+    - float32: stored as-is (4 bytes per value).
+    - float16: half precision (2 bytes per value).
+    - int8: one byte per value; value = offset[d] + scale[d] * code, with the
+      per-dimension offset/scale taken from that dimension's min/max.
+
+    Dot products against a query are computed on the compact form, so the
+    full-precision matrix never has to be resident.
+    """
+
+    def __init__(self, precision: str = 'float32', block_rows: int = 4096):
+        """
+        Create an empty vector set.
+
+        Args:
+            precision: 'float32', 'float16' or 'int8'.
+            block_rows: Rows converted to float32 at a time while scoring (bounds temporary memory).
+        """
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown vector precision '{precision}'. Use one of {PRECISIONS}")
+        self.precision = precision
+        self.block_rows = block_rows
+        self.codes = np.zeros((0, 0), dtype=self._code_dtype)
+        self.scale = None
+        self.offset = None
+
+    @property
+    def _code_dtype(self):
+        return {'float32': np.float32, 'float16': np.float16, 'int8': np.uint8}[self.precision]
+
+    @classmethod
+    def from_matrix(cls, matrix: np.ndarray, precision: str = 'float32', normalized: bool = False) -> 'QuantizedVectors':
+        """
+        Build a vector set from an embedding matrix.
+
+        Args:
+            matrix: Embeddings (n x d).
+            precision: Storage precision.
+            normalized: Rows are already L2-normalised float32.
+
+        Returns:
+            QuantizedVectors instance.
+        """
+        vectors = cls(precision)
+        matrix = np.asarray(matrix, dtype=np.float32)
+        if matrix.size == 0:
+            return vectors
+        if not normalized:
+            matrix = normalize_rows(matrix)
+
+        if precision == 'int8':
+            offset = matrix.min(axis=0)
+            scale = (matrix.max(axis=0) - offset) / 255.0
+            scale[scale == 0] = 1.0
+            vectors.offset = offset.astype(np.float32)
+            vectors.scale = scale.astype(np.float32)
+            codes = np.rint((matrix - vectors.offset) / vectors.scale)
+            vectors.codes = np.clip(codes, 0, 255).astype(np.uint8)
+        else:
+            vectors.codes = matrix.astype(vectors._code_dtype)
+        return vectors
+
+    @classmethod
+    def from_codes(cls, codes: np.ndarray, precision: str, scale: np.ndarray = None, offset: np.ndarray = None) -> 'QuantizedVectors':
+        """Wrap existing (e.g. memory-mapped) codes without copying them."""
+        vectors = cls(precision)
+        vectors.codes = codes
+        vectors.scale = None if scale is None else np.asarray(scale, dtype=np.float32)
+        vectors.offset = None if offset is None else np.asarray(offset, dtype=np.float32)
+        return vectors
+
+    def save(self, prefix: str):
+        """
+        Write the codes (and int8 scale/offset) as .npy files named <prefix>.<precision>.*.npy.
+        Each file is written under a temporary name and renamed into place.
+        """
+        arrays = {'codes': self.codes}
+        if self.precision == 'int8':
+            arrays.update(scale=self.scale, offset=self.offset)
+        for name, array in arrays.items():
+            path = f"{prefix}.{self.precision}.{name}.npy"
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                np.save(f, array)
+            os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, prefix: str, precision: str, mmap_mode: Optional[str] = 'r') -> Optional['QuantizedVectors']:
+        """
+        Load vectors written by save(); the codes are memory-mapped so processes share one copy.
+
+        Returns:
+            QuantizedVectors, or None if the files for this precision do not exist.
+        """
+        codes_path = f"{prefix}.{precision}.codes.npy"
+        if not os.path.exists(codes_path):
+            return None
+        codes = load_array(codes_path, mmap_mode)
+        if precision == 'int8':
+            return cls.from_codes(
+                codes, precision,
+                scale=np.load(f"{prefix}.int8.scale.npy"),
+                offset=np.load(f"{prefix}.int8.offset.npy")
+            )
+        return cls.from_codes(codes, precision)
+
+    def __len__(self) -> int:
+        return self.codes.shape[0]
+
+    @property
+    def dimension(self) -> int:
+        return self.codes.shape[1] if self.codes.ndim == 2 else 0
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the codes plus the scale/offset vectors."""
+        extra = 0 if self.scale is None else self.scale.nbytes + self.offset.nbytes
+        return int(self.codes.nbytes + extra)
+
+    def scores(self, query: np.ndarray) -> np.ndarray:
+        """
+        Dot product of every stored row with a query (cosine similarity for a normalised query).
+
+        Args:
+            query: L2-normalised float32 query vector.
+
+        Returns:
+            float32 array of length len(self).
+        """
+        n = len(self)
+        if n == 0:
+            return np.zeros(0, dtype=np.float32)
+        query = np.asarray(query, dtype=np.float32)
+        if self.precision == 'float32':
+            return np.asarray(self.codes @ query, dtype=np.float32)
+
+        if self.precision == 'int8':
+            # q . (offset + scale * code) = q . offset + (q * scale) . code
+            weights = query * self.scale
+            base = float(query @ self.offset)
+        else:
+            weights = query
+            base = 0.0
+
+        out = np.empty(n, dtype=np.float32)
+        for r0 in range(0, n, self.block_rows):
+            r1 = min(r0 + self.block_rows, n)
+            out[r0:r1] = self.codes[r0:r1].astype(np.float32) @ weights
+        if base:
+            out += base
+        return out
+
+    def reconstruct(self, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Decode rows back to float32 (approximate for float16/int8).
+
+        Args:
+            rows: Row indices to decode (default: all rows).
+
+        Returns:
+            float32 matrix.
+        """
+        codes = self.codes if rows is None else self.codes[rows]
+        if self.precision == 'int8':
+            return self.offset + self.scale * codes.astype(np.float32)
+        return codes.astype(np.float32)
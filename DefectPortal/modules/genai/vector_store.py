@@ -7,43 +7,238 @@ import logging
 import os
 import re
 import json
+import shutil
+import threading
+import time
 import numpy as np
-from typing import List, Dict, Any, Optional
+import pandas as pd
+from typing import List, Dict, Any, Iterable, Optional, Tuple, Union
 from pathlib import Path
 
+from .vector_quantization import QuantizedVectors, normalize_rows
+from .record_store import RecordStore
+from .metrics import VECTOR_STORE_VECTORS, VECTOR_STORE_BYTES
+from .shared_index import (
+    INDEX_DIR, SharedIndex, new_version_name, write_version, activate_version,
+    current_version, read_manifest, attach_version, remove_old_versions
+)
+
 logger = logging.getLogger(__name__)
 
+COLLECTIONS = ('defects', 'documents')
+# Published index versions kept on disk (the current one plus the previous, for processes still reloading)
+KEEP_INDEX_VERSIONS = 2
+
+
+def _str_column(frame: pd.DataFrame, column: str, default: str = '') -> pd.Series:
+    """str() of every value in a column, or `default` when the column is missing (like str(row.get(column, default)))."""
+    if column not in frame.columns:
+        return pd.Series(default, index=frame.index, dtype=object)
+    return frame[column].map(str).astype(object)
+
+
+def _first_non_empty(frame: pd.DataFrame, columns: List[str]) -> pd.Series:
+    """
+    Per row, str() of the first of `columns` holding a truthy value, like `a or b or c or ''`
+    on the row's values: NaN counts as a value ('nan'), None, '' and 0 do not.
+    """
+    result = pd.Series('', index=frame.index, dtype=object)
+    filled = pd.Series(False, index=frame.index)
+    for column in columns:
+        if column not in frame.columns:
+            continue
+        raw = frame[column]
+        present = ~filled & raw.map(bool).astype(bool)
+        result = result.where(~present, raw.map(str).astype(object))
+        filled = filled | present
+    return result
+
+
+def document_source(metadata: Dict[str, Any]) -> str:
+    """Source file of a document chunk (relative path; file name for chunks indexed before it was stored)."""
+    return metadata.get('source') or metadata.get('filename', '')
+
+
+class _CollectionBuilder:
+    """
+    Builds a new index version of a collection batch by batch with bounded memory:
+    normalised vectors are appended to a raw staging file, records go straight into the
+    RecordStore under the new version's key, and the JSON file is assembled from staged
+    fragments. Nothing is visible to readers until finish() publishes the version.
+    """
+
+    def __init__(self, store: 'VectorStore', collection: str):
+        self.store = store
+        self.collection = collection
+        self.version = new_version_name()
+        self.records_key = f"{collection}@{self.version}"
+        self.staging_dir = os.path.join(store.persist_directory, f".staging_{collection}_{self.version}")
+        os.makedirs(self.staging_dir)
+        self._files = {
+            name: open(os.path.join(self.staging_dir, name), 'wb')
+            for name in ('vectors.raw', 'embeddings', 'metadata', 'documents')
+        }
+        self.ids: List[str] = []
+        self.dimension = 0
+
+    def append(self, ids: List[str], embeddings, metadata: List[Dict[str, Any]], documents: List[str]):
+        """Add rows (embeddings as given; stored normalised in the index)."""
+        if not ids:
+            return
+        matrix = np.asarray(embeddings, dtype=np.float32)[:len(ids)]
+        self.dimension = self.dimension or matrix.shape[1]
+        normalize_rows(matrix).tofile(self._files['vectors.raw'])
+        for name, values in (('embeddings', matrix.tolist()), ('metadata', metadata), ('documents', documents)):
+            handle = self._files[name]
+            for value in values:
+                handle.write(((',' if handle.tell() else '') + json.dumps(value)).encode('utf-8'))
+        self.store.records.append(self.records_key, len(self.ids), list(ids), metadata, documents)
+        self.ids.extend(ids)
+
+    def _write_json(self, path: str):
+        """Assemble <collection>.json from the staged fragments (same layout as _save_collection)."""
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as out:
+            out.write(b'{"ids": ' + json.dumps(self.ids).encode('utf-8'))
+            for name in ('embeddings', 'metadata', 'documents'):
+                out.write(f', "{name}": ['.encode('utf-8'))
+                with open(os.path.join(self.staging_dir, name), 'rb') as fragment:
+                    shutil.copyfileobj(fragment, out, 1 << 20)
+                out.write(b']')
+            out.write(b'}')
+        os.replace(tmp_path, path)
+
+    def finish(self):
+        """Write the JSON file and publish the built version."""
+        for handle in self._files.values():
+            handle.close()
+        store = self.store
+        path = store._collection_file(self.collection)
+        try:
+            self._write_json(path)
+            stamp = store._file_stamp(path)
+        except Exception as e:
+            logger.error(f"Could not save {self.collection}: {e}")
+            stamp = ''
+        if self.ids:
+            matrix = np.memmap(os.path.join(self.staging_dir, 'vectors.raw'), dtype=np.float32,
+                               mode='r', shape=(len(self.ids), self.dimension))
+        else:
+            matrix = np.zeros((0, 0), dtype=np.float32)
+        write_version(store.index_directory, self.collection, self.version, self.ids, matrix, store.precision, stamp)
+        del matrix
+        store.records.finish(self.records_key, len(self.ids), stamp)
+        activate_version(store.index_directory, self.collection, self.version)
+        store._attach(self.collection, self.version)
+        for old in remove_old_versions(store.index_directory, self.collection, keep=KEEP_INDEX_VERSIONS):
+            store.records.delete(f"{self.collection}@{old}")
+        shutil.rmtree(self.staging_dir, ignore_errors=True)
+
+    def abort(self):
+        """Drop everything staged for the version."""
+        for handle in self._files.values():
+            handle.close()
+        self.store.records.delete(self.records_key)
+        shutil.rmtree(self.staging_dir, ignore_errors=True)
+
+
+def prepare_defect_records(defects: pd.DataFrame) -> Tuple[List[str], List[str], List[Dict[str, str]]]:
+    """
+    Build the stored ids, document texts and metadata dicts for a DataFrame of defects,
+    using column operations instead of a per-row loop.
+    
+    Args:
+        defects: DataFrame of defects (one row per defect).
+        
+    Returns:
+        Tuple of (ids, documents, metadata) aligned with the rows.
+    """
+    frame = defects.reset_index(drop=True)
+    
+    if 'Issue key' in frame.columns:
+        ids = _str_column(frame, 'Issue key')
+    else:
+        ids = pd.Series([f'defect_{i}' for i in range(len(frame))], dtype=object)
+    
+    summary = _str_column(frame, 'Summary')
+    documents = (summary + ' ' + _str_column(frame, 'Description')).str[:5000]
+    
+    # Fix description: try standard column first, then alternate names (DB/Excel may differ)
+    fix_desc = _first_non_empty(frame, ['Custom field (OSF-Fix Description)', 'OSF-Fix Description', 'Fix Description']).str.strip()
+    fix_desc = fix_desc.where(~fix_desc.str.lower().isin(['nan', 'none', '']), '').str[:1000]
+    
+    metadata = pd.DataFrame({
+        'issue_key': ids,
+        'summary': summary.str[:500],
+        'status': _str_column(frame, 'Status'),
+        'priority': _str_column(frame, 'Priority'),
+        'osf_wave': _first_non_empty(frame, ['OSF-Wave', 'Fix Version/s']),
+        'osf_system': _str_column(frame, 'OSF-System'),
+        'resolution': _str_column(frame, 'Resolution'),
+        'fix_description': fix_desc,
+        'source': _str_column(frame, 'source', 'unknown')
+    })
+    
+    return ids.tolist(), documents.tolist(), metadata.to_dict('records')
+
 class VectorStore:
     """
     In-memory vector database for defects and documents.
     Uses numpy for similarity calculations.
     Saves/loads from JSON files for persistence.
+    Embeddings are held as QuantizedVectors (float32, float16 or int8) and searched in that form;
+    with reduced precision the top candidates can be rescored against the float32 rows.
+    The matrices are published as versioned memory-mapped files (see shared_index.py), so all
+    server processes share one copy and pick up a new version after a reindex.
+    Only ids and the mapped matrices are held; document text and metadata live in a SQLite
+    RecordStore and are read for result rows only.
     """
     
-    def __init__(self, persist_directory: str = None):
+    def __init__(
+        self,
+        persist_directory: str = None,
+        precision: str = 'float32',
+        rescore_candidates: int = 50,
+        reload_interval: float = 2.0
+    ):
         """
         Initialize the vector store.
         
         Args:
             persist_directory: Directory to persist the vector database.
+            precision: Embedding precision used for search: 'float32', 'float16' or 'int8'.
+            rescore_candidates: With float16/int8, rescore this many top candidates with exact
+                                float32 similarities (0 = rank on the compact form only).
+            reload_interval: Seconds between checks for an index version published by another process.
         """
         if persist_directory is None:
             base_path = Path(__file__).parent.parent.parent
             persist_directory = str(base_path / "knowledge_base" / "vector_store")
         
         self.persist_directory = persist_directory
-        os.makedirs(self.persist_directory, exist_ok=True)
-        
-        # In-memory storage
-        self.defect_embeddings = []  # List of numpy arrays
-        self.defect_metadata = []    # List of metadata dicts
-        self.defect_documents = []   # List of document texts
-        self.defect_ids = []         # List of IDs
-        
-        self.document_embeddings = []
-        self.document_metadata = []
-        self.document_texts = []
-        self.document_ids = []
+        self.index_directory = os.path.join(persist_directory, INDEX_DIR)
+        os.makedirs(self.index_directory, exist_ok=True)
+        self.precision = precision
+        self.rescore_candidates = rescore_candidates if precision != 'float32' else 0
+        self.reload_interval = reload_interval
+        
+        # Attached index version per collection (ids + memory-mapped matrices); swapped as a whole on reload
+        self._indexes = {name: SharedIndex.empty(name, precision) for name in COLLECTIONS}
+        self._reload_lock = threading.Lock()
+        self._last_reload_check = 0.0
+        # Serialises read-modify-publish updates of a collection (per-file document updates)
+        self._write_lock = threading.Lock()
+        
+        # Document text and metadata, read on demand for result rows
+        self.records = RecordStore(self.persist_directory)
+        
+        # Near-duplicate groups (see duplicate_detector.py): member key -> canonical key
+        self.duplicate_groups = {'groups': []}
+        self._duplicate_of = {}
+        self._duplicate_members = {}
+        self._duplicate_mask = (None, None)
+        # Stamp of the groups file the lookups were built from; shared by all processes
+        self._duplicate_stamp = ''
         
         # Load persisted data if exists
         self._load_from_disk()
@@ -52,110 +247,255 @@ class VectorStore:
         logger.info(f"Defects loaded: {len(self.defect_ids)}")
         logger.info(f"Documents loaded: {len(self.document_ids)}")
     
+    @property
+    def defect_ids(self) -> List[str]:
+        return self._indexes['defects'].ids
+    
+    @property
+    def document_ids(self) -> List[str]:
+        return self._indexes['documents'].ids
+    
+    @property
+    def defect_vectors(self) -> QuantizedVectors:
+        return self._indexes['defects'].vectors
+    
+    @property
+    def document_vectors(self) -> QuantizedVectors:
+        return self._indexes['documents'].vectors
+    
+    def _collection_file(self, collection: str) -> str:
+        return os.path.join(self.persist_directory, f"{collection}.json")
+    
+    def _file_stamp(self, path: str) -> str:
+        """Identify one version of a persisted file (modification time and size)."""
+        stat = os.stat(path)
+        return f"{stat.st_mtime_ns}:{stat.st_size}"
+    
     def _load_from_disk(self):
-        """Load persisted data from disk."""
-        defect_file = os.path.join(self.persist_directory, "defects.json")
-        doc_file = os.path.join(self.persist_directory, "documents.json")
-        
-        if os.path.exists(defect_file):
+        """Attach to the published index, publishing it from the JSON files first if they changed."""
+        for collection in COLLECTIONS:
+            json_file = self._collection_file(collection)
             try:
-                with open(defect_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.defect_ids = data.get('ids', [])
-                    self.defect_embeddings = [np.array(e) for e in data.get('embeddings', [])]
-                    self.defect_metadata = data.get('metadata', [])
-                    self.defect_documents = data.get('documents', [])
+                version = current_version(self.index_directory, collection)
+                manifest = read_manifest(self.index_directory, collection, version) if version else None
+                if os.path.exists(json_file):
+                    stamp = self._file_stamp(json_file)
+                    if manifest is None or manifest.get('source_stamp') != stamp:
+                        # First run, or the JSON was replaced outside the app: publish it
+                        with open(json_file, 'r', encoding='utf-8') as f:
+                            data = json.load(f)
+                        self._publish(collection, data.get('ids', []), data.get('embeddings', []),
+                                      data.get('metadata', []), data.get('documents', []), stamp)
+                        continue
+                if manifest is not None:
+                    self._attach(collection, version)
             except Exception as e:
-                logger.warning(f"Could not load defects: {e}")
+                logger.warning(f"Could not load {collection}: {e}")
         
-        if os.path.exists(doc_file):
-            try:
-                with open(doc_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.document_ids = data.get('ids', [])
-                    self.document_embeddings = [np.array(e) for e in data.get('embeddings', [])]
-                    self.document_metadata = data.get('metadata', [])
-                    self.document_texts = data.get('documents', [])
-            except Exception as e:
-                logger.warning(f"Could not load documents: {e}")
+        self._load_duplicate_groups()
     
-    def _save_to_disk(self):
-        """Save data to disk."""
-        defect_file = os.path.join(self.persist_directory, "defects.json")
-        doc_file = os.path.join(self.persist_directory, "documents.json")
-        
+    def _publish(
+        self,
+        collection: str,
+        ids: List[str],
+        embeddings,
+        metadata: List[Dict[str, Any]],
+        documents: List[str],
+        source_stamp: str = ''
+    ):
+        """
+        Publish a new index version of a collection for all processes and attach to it.
+        Vectors and records are written under the new version before it is made current.
+        """
+        matrix = normalize_rows(embeddings) if len(embeddings) else np.zeros((0, 0), dtype=np.float32)
+        version = new_version_name()
+        write_version(self.index_directory, collection, version, list(ids), matrix, self.precision, source_stamp)
+        self.records.replace(f"{collection}@{version}", list(ids), metadata, documents, source_stamp)
+        activate_version(self.index_directory, collection, version)
+        self._attach(collection, version)
+        
+        for old in remove_old_versions(self.index_directory, collection, keep=KEEP_INDEX_VERSIONS):
+            self.records.delete(f"{collection}@{old}")
+    
+    def _attach(self, collection: str, version: str):
+        """Attach to a published version of a collection (replaces the current one atomically)."""
+        index = attach_version(self.index_directory, collection, version, self.precision)
+        self._indexes[collection] = index
+        VECTOR_STORE_VECTORS.set(len(index.ids), collection=collection)
+        VECTOR_STORE_BYTES.set(index.vectors.nbytes, collection=collection)
+        logger.info(f"Attached {collection} index version {version} ({len(self._indexes[collection].ids)} rows)")
+    
+    def _check_for_new_version(self):
+        """
+        Reload any collection for which another process published a new version, and the
+        duplicate-group table if another process replaced it (rate-limited).
+        """
+        now = time.monotonic()
+        if now - self._last_reload_check < self.reload_interval:
+            return
+        if not self._reload_lock.acquire(blocking=False):
+            return
         try:
-            with open(defect_file, 'w', encoding='utf-8') as f:
-                json.dump({
-                    'ids': self.defect_ids,
-                    'embeddings': [e.tolist() for e in self.defect_embeddings],
-                    'metadata': self.defect_metadata,
-                    'documents': self.defect_documents
-                }, f)
+            self._last_reload_check = now
+            for collection in COLLECTIONS:
+                version = current_version(self.index_directory, collection)
+                if version and version != self._indexes[collection].version:
+                    self._attach(collection, version)
+            # Duplicate groups are published separately (DuplicateDetector.run in any process)
+            if self._duplicate_groups_stamp() != self._duplicate_stamp:
+                self._load_duplicate_groups()
         except Exception as e:
-            logger.error(f"Could not save defects: {e}")
+            logger.warning(f"Could not reload vector index: {e}")
+        finally:
+            self._reload_lock.release()
+    
+    def _duplicate_groups_stamp(self) -> str:
+        """Stamp of the persisted duplicate-group table ('' if there is none)."""
+        from .duplicate_detector import DUPLICATE_GROUPS_FILE
+        try:
+            return self._file_stamp(os.path.join(self.persist_directory, DUPLICATE_GROUPS_FILE))
+        except OSError:
+            return ''
+    
+    def _load_duplicate_groups(self):
+        """Activate the persisted duplicate-group table and remember its stamp."""
+        from .duplicate_detector import load_duplicate_groups
+        # Stamp first: a table replaced while loading is picked up by the next check
+        stamp = self._duplicate_groups_stamp()
+        self._apply_duplicate_groups(load_duplicate_groups(self.persist_directory))
+        self._duplicate_stamp = stamp
+    
+    def _apply_duplicate_groups(self, table: Dict[str, Any]):
+        """Build the member -> canonical lookups from a duplicate-group table."""
+        self.duplicate_groups = table
+        self._duplicate_of = {}
+        self._duplicate_members = {}
+        self._duplicate_mask = (None, None)
+        for group in table.get('groups', []):
+            canonical = group.get('canonical')
+            members = group.get('members', [])
+            self._duplicate_members[canonical] = [m for m in members if m != canonical]
+            for member in members:
+                if member != canonical:
+                    self._duplicate_of[member] = canonical
+    
+    def set_duplicate_groups(self, table: Dict[str, Any]):
+        """
+        Persist and activate a duplicate-group table (from DuplicateDetector.run()).
+        Other processes pick it up on their next version check.
         
+        Args:
+            table: Duplicate-group table with a 'groups' list.
+        """
+        from .duplicate_detector import save_duplicate_groups
+        save_duplicate_groups(self.persist_directory, table)
+        self._apply_duplicate_groups(table)
+        self._duplicate_stamp = self._duplicate_groups_stamp()
+        logger.info(f"Loaded {len(table.get('groups', []))} duplicate groups")
+    
+    def _get_duplicate_mask(self, index: SharedIndex) -> np.ndarray:
+        """Boolean mask of defects that are non-canonical members of a duplicate group."""
+        version, mask = self._duplicate_mask
+        if mask is None or version != index.version:
+            mask = np.fromiter(
+                (key in self._duplicate_of for key in index.ids),
+                dtype=bool,
+                count=len(index.ids)
+            )
+            self._duplicate_mask = (index.version, mask)
+        return mask
+    
+    def get_index_version(self) -> str:
+        """
+        Identify the data searches currently run against (defect and document index versions
+        plus the duplicate-group table); it changes whenever any of them is republished, and is
+        the same in every process attached to the same data.
+        """
+        self._check_for_new_version()
+        return (f"{self._indexes['defects'].version}:{self._indexes['documents'].version}"
+                f":{self._duplicate_stamp}")
+    
+    def get_defect_metadata(self) -> List[Dict[str, Any]]:
+        """Read the metadata of every defect (row order), e.g. for offline jobs."""
+        return list(self.records.iter_metadata(self._indexes['defects'].records_key))
+    
+    def get_defect_matrix(self) -> np.ndarray:
+        """Return the defect embeddings as an L2-normalised float32 matrix (n x d)."""
+        full = self._indexes['defects'].full
+        if not len(full):
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.array(full, dtype=np.float32)
+    
+    def _save_collection(self, collection: str, ids: List[str], embeddings, metadata: List[Dict[str, Any]], documents: List[str]):
+        """Write one collection to its JSON file and publish it as a new index version."""
+        path = self._collection_file(collection)
         try:
-            with open(doc_file, 'w', encoding='utf-8') as f:
+            with open(path, 'w', encoding='utf-8') as f:
                 json.dump({
-                    'ids': self.document_ids,
-                    'embeddings': [e.tolist() for e in self.document_embeddings],
-                    'metadata': self.document_metadata,
-                    'documents': self.document_texts
+                    'ids': ids,
+                    'embeddings': np.asarray(embeddings).tolist(),
+                    'metadata': metadata,
+                    'documents': documents
                 }, f)
+            stamp = self._file_stamp(path)
         except Exception as e:
-            logger.error(f"Could not save documents: {e}")
+            logger.error(f"Could not save {collection}: {e}")
+            stamp = ''
+        self._publish(collection, ids, embeddings, metadata, documents, stamp)
+    
+    def _save_to_disk(self):
+        """Save data to disk."""
+        for collection in COLLECTIONS:
+            index = self._indexes[collection]
+            self._save_collection(collection, index.ids, np.asarray(index.full),
+                                  list(self.records.iter_metadata(index.records_key)),
+                                  self.records.get_all_documents(index.records_key))
     
-    def add_defects(self, defects: List[Dict[str, Any]], embeddings: List[List[float]]):
+    def add_defects(self, defects: Union[pd.DataFrame, List[Dict[str, Any]]], embeddings: List[List[float]]):
         """
         Add defects to the vector store.
         
         Args:
-            defects: List of defect dictionaries.
+            defects: DataFrame of defects (or list of defect dictionaries).
             embeddings: Corresponding embedding vectors.
         """
-        if not defects or not embeddings:
+        if defects is None or len(defects) == 0 or len(embeddings) == 0:
             return
         
-        # Clear existing defects (upsert behavior)
-        self.defect_ids = []
-        self.defect_embeddings = []
-        self.defect_metadata = []
-        self.defect_documents = []
+        if not isinstance(defects, pd.DataFrame):
+            defects = pd.DataFrame.from_records(defects)
         
-        for i, defect in enumerate(defects):
-            issue_key = str(defect.get('Issue key', f'defect_{i}'))
-            
-            self.defect_ids.append(issue_key)
-            self.defect_embeddings.append(np.array(embeddings[i]))
+        # Replace existing defects (upsert behavior)
+        ids, documents, metadata = prepare_defect_records(defects)
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        
+        # Persist the exact embeddings and records, then publish the new index version
+        self._save_collection('defects', ids, embeddings, metadata, documents)
+        logger.info(f"Added {len(defects)} defects to vector store")
+    
+    def _document_records(self, documents: List[Dict[str, Any]]) -> Tuple[List[str], List[str], List[Dict[str, str]]]:
+        """Ids, stored texts and metadata of document chunks."""
+        ids = []
+        texts = []
+        metadata_list = []
+        
+        for i, doc in enumerate(documents):
+            doc_id = doc.get('id', f'doc_{i}')
             
-            # Create document text
-            doc_text = f"{defect.get('Summary', '')} {defect.get('Description', '')}"
-            self.defect_documents.append(doc_text[:5000])
+            ids.append(doc_id)
+            texts.append(doc.get('content', '')[:5000])
             
-            # Fix description: try standard column first, then alternate names (DB/Excel may differ)
-            fix_desc = defect.get('Custom field (OSF-Fix Description)') or defect.get('OSF-Fix Description') or defect.get('Fix Description') or ''
-            fix_desc = str(fix_desc).strip()
-            if fix_desc.lower() in ('nan', 'none', ''):
-                fix_desc = ''
-            fix_desc = fix_desc[:1000]
-
-            # Store metadata
             metadata = {
-                'issue_key': issue_key,
-                'summary': str(defect.get('Summary', ''))[:500],
-                'status': str(defect.get('Status', '')),
-                'priority': str(defect.get('Priority', '')),
-                'osf_wave': str(defect.get('OSF-Wave', '') or defect.get('Fix Version/s', '')),
-                'osf_system': str(defect.get('OSF-System', '')),
-                'resolution': str(defect.get('Resolution', '')),
-                'fix_description': fix_desc,
-                'source': str(defect.get('source', 'unknown'))
+                'filename': doc.get('filename', ''),
+                'filepath': doc.get('filepath', ''),
+                'source': doc.get('source', ''),
+                'file_fingerprint': doc.get('file_fingerprint', ''),
+                'section': doc.get('section', ''),
+                'page': str(doc.get('page', '')),
+                'chunk_index': str(doc.get('chunk_index', i))
             }
-            self.defect_metadata.append(metadata)
-        
-        self._save_to_disk()
-        logger.info(f"Added {len(defects)} defects to vector store")
+            metadata_list.append(metadata)
+        return ids, texts, metadata_list
     
     def add_documents(self, documents: List[Dict[str, Any]], embeddings: List[List[float]]):
         """
@@ -165,33 +505,135 @@ class VectorStore:
             documents: List of document chunk dictionaries.
             embeddings: Corresponding embedding vectors.
         """
-        if not documents or not embeddings:
+        if not documents or not len(embeddings):
             return
         
-        # Clear existing documents
-        self.document_ids = []
-        self.document_embeddings = []
-        self.document_metadata = []
-        self.document_texts = []
+        # Replace existing documents
+        ids, texts, metadata_list = self._document_records(documents)
+        embeddings = np.asarray(embeddings[:len(documents)], dtype=np.float32)
+        self._save_collection('documents', ids, embeddings, metadata_list, texts)
+        logger.info(f"Added {len(documents)} document chunks to vector store")
+    
+    def get_document_sources(self) -> Dict[str, str]:
+        """
+        Source files in the document collection.
         
-        for i, doc in enumerate(documents):
-            doc_id = doc.get('id', f'doc_{i}')
-            
-            self.document_ids.append(doc_id)
-            self.document_embeddings.append(np.array(embeddings[i]))
-            self.document_texts.append(doc.get('content', '')[:5000])
+        Returns:
+            Dict of source (path relative to the documents folder) -> file fingerprint
+            ('' for chunks indexed before fingerprints were recorded). Includes files that were
+            indexed without producing any chunks.
+        """
+        self._check_for_new_version()
+        records_key = self._indexes['documents'].records_key
+        sources = {}
+        for metadata in self.records.iter_metadata(records_key):
+            sources.setdefault(document_source(metadata), metadata.get('file_fingerprint', ''))
+        # Recorded per-file fingerprints are kept current (touched files, files without chunks)
+        sources.update(self.records.get_sources(records_key))
+        return sources
+    
+    def refresh_document_fingerprints(self, fingerprints: Dict[str, str]):
+        """
+        Update the recorded fingerprints of indexed files whose content did not change
+        (e.g. only their modification time did), without publishing a new version.
+        
+        Args:
+            fingerprints: Source -> new fingerprint.
+        """
+        if not fingerprints:
+            return
+        with self._write_lock:
+            self._check_for_new_version()
+            self.records.set_sources(self._indexes['documents'].records_key, fingerprints)
+    
+    def replace_document_files(
+        self,
+        sources: List[str],
+        documents: List[Dict[str, Any]],
+        embeddings: List[List[float]]
+    ) -> int:
+        """
+        Upsert/delete the chunks of individual source files, keeping every other file's chunks
+        and vectors as they are (nothing is re-embedded). Published as one new index version.
+        
+        Args:
+            sources: Source files whose existing chunks are dropped; those without chunks in
+                     `documents` are thereby deleted.
+            documents: New chunk dictionaries of (some of) these sources.
+            embeddings: Embeddings of `documents`.
             
-            metadata = {
-                'filename': doc.get('filename', ''),
-                'filepath': doc.get('filepath', ''),
-                'section': doc.get('section', ''),
-                'page': str(doc.get('page', '')),
-                'chunk_index': str(doc.get('chunk_index', i))
-            }
-            self.document_metadata.append(metadata)
+        Returns:
+            Chunks in the collection afterwards.
+        """
+        return self.stream_document_files(sources, [(documents, embeddings)] if documents else [])
+    
+    def stream_document_files(
+        self,
+        sources: List[str],
+        batches: Iterable[Tuple[List[Dict[str, Any]], List[List[float]]]],
+        copy_rows: int = 4096,
+        fingerprints: Optional[Dict[str, str]] = None
+    ) -> int:
+        """
+        Like replace_document_files, but the new chunks arrive as a stream of
+        (chunk dictionaries, embeddings) batches, e.g. from a generator that extracts, chunks and
+        embeds one batch at a time. Kept rows are copied and new rows appended batch by batch,
+        so memory stays bounded by the batch size rather than the size of the collection.
         
-        self._save_to_disk()
-        logger.info(f"Added {len(documents)} document chunks to vector store")
+        Args:
+            sources: Source files whose existing chunks are dropped.
+            batches: Iterable of (documents, embeddings) for (some of) these sources.
+            copy_rows: Kept rows copied per step.
+            fingerprints: Source -> file fingerprint recorded with the new version, also for
+                          files without chunks; read after `batches` is exhausted, so the
+                          producer can still change it (e.g. blank a file that failed midway).
+            
+        Returns:
+            Chunks in the collection afterwards.
+        """
+        with self._write_lock:
+            self._check_for_new_version()
+            index = self._indexes['documents']
+            replaced = set(sources)
+            builder = _CollectionBuilder(self, 'documents')
+            try:
+                keep = [
+                    row for row, metadata in enumerate(self.records.iter_metadata(index.records_key))
+                    if document_source(metadata) not in replaced
+                ]
+                for start in range(0, len(keep), copy_rows):
+                    rows = keep[start:start + copy_rows]
+                    kept_records = self.records.get(index.records_key, rows)
+                    builder.append(
+                        [index.ids[row] for row in rows],
+                        np.asarray(index.full[rows], dtype=np.float32),
+                        [meta for meta, _ in kept_records],
+                        [text for _, text in kept_records]
+                    )
+                
+                added = 0
+                for documents, embeddings in batches:
+                    if not documents or not len(embeddings):
+                        continue
+                    ids, texts, metadata = self._document_records(documents)
+                    builder.append(ids, embeddings, metadata, texts)
+                    added += len(ids)
+                
+                recorded = {
+                    source: fingerprint for source, fingerprint in self.records.get_sources(index.records_key).items()
+                    if source not in replaced
+                }
+                recorded.update(fingerprints or {})
+                self.records.set_sources(builder.records_key, recorded)
+                builder.finish()
+            except BaseException:
+                builder.abort()
+                raise
+        logger.info(
+            f"Replaced chunks of {len(replaced)} document file(s): {added} new chunks, "
+            f"{len(keep)} kept"
+        )
+        return len(builder.ids)
     
     def _cosine_similarity(self, vec1: np.ndarray, vec2: np.ndarray) -> float:
         """Calculate cosine similarity between two vectors."""
@@ -204,11 +646,49 @@ class VectorStore:
         
         return float(dot_product / (norm1 * norm2))
     
+    def _rank(
+        self,
+        collection: str,
+        query_embedding: List[float],
+        n_results: int,
+        min_similarity: float,
+        collapse_duplicates: bool = False
+    ) -> Tuple[SharedIndex, List[Tuple[int, float]]]:
+        """
+        Score every row of a collection against a query and return the best (index, similarity) pairs.
+        With reduced precision and rescoring enabled, the top candidates from the compact form are
+        re-ranked with exact float32 similarities before the threshold is applied.
+        
+        Returns:
+            The index version that was searched (use its ids/records for the rows) and the pairs.
+        """
+        index = self._indexes[collection]
+        query_vec = normalize_rows(query_embedding)[0]
+        scores = index.vectors.scores(query_vec)
+        if collapse_duplicates and self._duplicate_of:
+            scores[self._get_duplicate_mask(index)] = -np.inf
+        
+        full = index.full
+        if self.rescore_candidates and len(full):
+            k = min(max(self.rescore_candidates, n_results), len(scores))
+            candidates = np.sort(np.argpartition(-scores, k - 1)[:k])
+            candidates = candidates[np.isfinite(scores[candidates])]
+            exact = np.asarray(full[candidates], dtype=np.float32) @ query_vec
+            keep = exact >= min_similarity
+            candidates, exact = candidates[keep], exact[keep]
+            order = np.argsort(-exact, kind='stable')[:n_results]
+            return index, [(int(candidates[i]), float(exact[i])) for i in order]
+        
+        candidates = np.flatnonzero(scores >= min_similarity)
+        order = candidates[np.argsort(-scores[candidates], kind='stable')][:n_results]
+        return index, [(int(i), float(scores[i])) for i in order]
+    
     def search_similar_defects(
         self, 
         query_embedding: List[float], 
         n_results: int = 5,
-        min_similarity: float = 0.5
+        min_similarity: float = 0.5,
+        collapse_duplicates: bool = True
     ) -> List[Dict[str, Any]]:
         """
         Search for similar defects.
@@ -217,35 +697,32 @@ class VectorStore:
             query_embedding: Query vector.
             n_results: Maximum number of results.
             min_similarity: Minimum similarity threshold (0-1).
+            collapse_duplicates: Return one defect per duplicate group (the canonical one),
+                                 listing the other group members under 'duplicates'.
             
         Returns:
             List of similar defects with similarity scores.
         """
-        if not self.defect_embeddings:
+        self._check_for_new_version()
+        if not len(self.defect_vectors):
             logger.warning("No defects indexed")
             return []
         
-        query_vec = np.array(query_embedding)
-        
-        # Calculate similarities
-        similarities = []
-        for i, emb in enumerate(self.defect_embeddings):
-            sim = self._cosine_similarity(query_vec, emb)
-            if sim >= min_similarity:
-                similarities.append((i, sim))
-        
-        # Sort by similarity (descending)
-        similarities.sort(key=lambda x: x[1], reverse=True)
+        index, similarities = self._rank('defects', query_embedding, n_results, min_similarity, collapse_duplicates)
         
-        # Build results
+        # Build results (records are read for the returned rows only)
+        records = self.records.get(index.records_key, [idx for idx, _ in similarities])
         results = []
-        for idx, sim in similarities[:n_results]:
-            results.append({
-                'issue_key': self.defect_ids[idx],
+        for (idx, sim), (metadata, document) in zip(similarities, records):
+            result = {
+                'issue_key': index.ids[idx],
                 'similarity': round(sim * 100, 1),
-                'metadata': self.defect_metadata[idx],
-                'document': self.defect_documents[idx]
-            })
+                'metadata': metadata,
+                'document': document
+            }
+            if collapse_duplicates:
+                result['duplicates'] = self._duplicate_members.get(index.ids[idx], [])
+            results.append(result)
         
         return results
     
@@ -266,30 +743,22 @@ class VectorStore:
         Returns:
             List of relevant documents with similarity scores.
         """
-        if not self.document_embeddings:
+        self._check_for_new_version()
+        if not len(self.document_vectors):
             logger.warning("No documents indexed")
             return []
         
-        query_vec = np.array(query_embedding)
-        
-        # Calculate similarities
-        similarities = []
-        for i, emb in enumerate(self.document_embeddings):
-            sim = self._cosine_similarity(query_vec, emb)
-            if sim >= min_similarity:
-                similarities.append((i, sim))
-        
-        # Sort by similarity (descending)
-        similarities.sort(key=lambda x: x[1], reverse=True)
+        index, similarities = self._rank('documents', query_embedding, n_results, min_similarity)
         
         # Build results
+        records = self.records.get(index.records_key, [idx for idx, _ in similarities])
         results = []
-        for idx, sim in similarities[:n_results]:
+        for (idx, sim), (metadata, content) in zip(similarities, records):
             results.append({
-                'id': self.document_ids[idx],
+                'id': index.ids[idx],
                 'similarity': round(sim * 100, 1),
-                'content': self.document_texts[idx],
-                'metadata': self.document_metadata[idx]
+                'content': content,
+                'metadata': metadata
             })
         
         return results
@@ -303,7 +772,9 @@ class VectorStore:
         Fallback search: find document chunks that contain query terms (e.g. for
         error messages like "KIAS-SetMarketingPermissions" when semantic similarity is low).
         """
-        if not self.document_texts or not query or not query.strip():
+        self._check_for_new_version()
+        index = self._indexes['documents']
+        if not index.ids or not query or not query.strip():
             return []
         # Extract significant terms: alphanumeric + hyphen (e.g. KIAS-SetMarketingPermissions, SetMarketingPermissions)
         tokens = re.findall(r'[A-Za-z0-9]+(?:-[A-Za-z0-9]+)*', query)
@@ -311,44 +782,34 @@ class VectorStore:
         if not terms:
             return []
         terms_lower = [t.lower() for t in terms]
-        scored = []
-        for i, text in enumerate(self.document_texts):
-            text_lower = (text or '').lower()
-            count = sum(1 for t in terms_lower if t in text_lower)
-            if count > 0:
-                scored.append((i, count))
-        scored.sort(key=lambda x: x[1], reverse=True)
+        rows = self.records.keyword_rows(index.records_key, terms_lower, n_results)
         results = []
-        for idx, _ in scored[:n_results]:
+        for idx, (metadata, content) in zip(rows, self.records.get(index.records_key, rows)):
             results.append({
-                'id': self.document_ids[idx],
+                'id': index.ids[idx],
                 'similarity': 30.0,  # keyword match relevance label
-                'content': self.document_texts[idx],
-                'metadata': self.document_metadata[idx]
+                'content': content,
+                'metadata': metadata
             })
         return results
     
-    def get_collection_stats(self) -> Dict[str, int]:
+    def get_collection_stats(self) -> Dict[str, Any]:
         """Get statistics about the vector store."""
         return {
             'defect_count': len(self.defect_ids),
-            'document_count': len(self.document_ids)
+            'document_count': len(self.document_ids),
+            'duplicate_group_count': len(self.duplicate_groups.get('groups', [])),
+            'vector_precision': self.precision,
+            'vector_bytes': self.defect_vectors.nbytes + self.document_vectors.nbytes,
+            'index_version': self._indexes['defects'].version
         }
     
     def clear_defects(self):
         """Clear all defects from the collection."""
-        self.defect_ids = []
-        self.defect_embeddings = []
-        self.defect_metadata = []
-        self.defect_documents = []
-        self._save_to_disk()
+        self._save_collection('defects', [], [], [], [])
         logger.info("Cleared defect collection")
     
     def clear_documents(self):
         """Clear all documents from the collection."""
-        self.document_ids = []
-        self.document_embeddings = []
-        self.document_metadata = []
-        self.document_texts = []
-        self._save_to_disk()
+        self._save_collection('documents', [], [], [], [])
         logger.info("Cleared document collection")
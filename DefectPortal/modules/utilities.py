@@ -29,9 +29,13 @@ def get_base64(image_file):
 
 # Use engine directly with read_sql
 def fetch_defects(engine, table_name):
+    from modules.genai.metrics import DB_QUERY_SECONDS
+    from utilities.defect_tables import hash_col
     query = f"SELECT * FROM {table_name}"
-    df = pd.read_sql(query, con=engine)
-    return df
+    with DB_QUERY_SECONDS.time(table=table_name):
+        df = pd.read_sql(query, con=engine)
+    # Change-detection column of upsert loads, not defect data
+    return df.drop(columns=[hash_col], errors='ignore')
 
 def _clear_results():
         st.session_state.keyword_results = None
@@ -1,35 +1,28 @@
-import pandas as pd
 import os
-from openpyxl import load_workbook
-from openpyxl.styles import Alignment
+import sys
 
 # -----------------------------
 # Paths
 # -----------------------------
 base_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(base_dir, ".."))
+from utilities.wave_ingest import DEFECT_COLUMNS, combine_waves
 
 input_folder = os.path.join(base_dir, "../combine_sit")
 output_folder = os.path.join(base_dir, "../sheet")
 os.makedirs(output_folder, exist_ok=True)
 
-output_file = os.path.join(output_folder, "defect_sheet_sit.csv")
+# Written as defect_sheet_sit.parquet (defect_sheet_sit.csv if pyarrow is not installed)
+output_stem = os.path.join(output_folder, "defect_sheet_sit")
 
 # -----------------------------
 # Combine all CSV files
 # -----------------------------
-csv_files = [f for f in os.listdir(input_folder) if f.endswith(".csv")]
+# Wave files are read in parallel; only the columns the converters use are kept
+result = combine_waves(input_folder, output_stem, columns=DEFECT_COLUMNS)
 
-if not csv_files:
+if not result['files']:
     print(" No CSV files found in combine_sit folder.")
 else:
-    combined_data = []
-    for file in csv_files:
-        file_path = os.path.join(input_folder, file)
-        print(f"🔹 Reading: {file}")
-        df = pd.read_csv(file_path, low_memory=False)
-        df["Source_File"] = file
-        combined_data.append(df)
-
-    combined_df = pd.concat(combined_data, ignore_index=True)
-    combined_df.to_csv(output_file, index=False)
-    print(f" Combined SIT CSV saved as: {output_file}")
+    print(f"🔹 Read {result['files']} files: {result['rows']} rows, {result['columns']} columns in {result['seconds']}s")
+    print(f" Combined SIT sheet saved as: {result['output']}")
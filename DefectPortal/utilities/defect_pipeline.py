@@ -0,0 +1,233 @@
+"""
+Defect ETL pipeline.
+Streams the Jira wave exports straight into the defects tables, in row batches:
+
+    combine_<env>/*.csv -> repeated-column merge -> (ACC: + TTWOS extract) -> defects_table_<env>
+
+This replaces combine_*.py -> sheet/ -> excel_converter_*.py -> output/*.xlsx -> mysql_connection.py,
+which wrote every row to Excel and parsed it back before loading. Rows are stored exactly as
+that route stored them (INSERT IGNORE on 'Issue key'). The formatted
+output/filtered_output_<env>.xlsx is only written with --excel.
+
+With --upsert, defects that changed since the last load are updated instead of skipped, and
+the keys of new and changed defects are written to output/changed_defects_<env>.txt.
+Usage: python utilities/defect_pipeline.py [--env acc,sit] [--excel] [--no-db] [--upsert]
+                                          [--batch-rows 10000] [--insert-batch-size 500]
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utilities.jira_csv import merge_duplicate_columns
+from utilities.wave_ingest import DEFECT_COLUMNS, iter_wave_batches, wave_column_groups, wave_files
+
+ENVIRONMENTS = {
+    'acc': {
+        'input_folder': project_root / "combine_acc",
+        'ttwos_file': project_root / "sheet" / "ttwos_extract_acc.xlsx",
+        'table': "defects_table_acc",
+        'excel_file': project_root / "output" / "filtered_output_acc.xlsx",
+        'changed_keys_file': project_root / "output" / "changed_defects_acc.txt",
+    },
+    'sit': {
+        'input_folder': project_root / "combine_sit",
+        'ttwos_file': None,
+        'table': "defects_table_sit",
+        'excel_file': project_root / "output" / "filtered_output_sit.xlsx",
+        'changed_keys_file': project_root / "output" / "changed_defects_sit.txt",
+    },
+}
+
+# TTWOS extract columns -> Jira columns (as in excel_converter_acc.py)
+TTWOS_COLUMN_MAPPING = {
+    'Ticketnummer': 'Issue key',
+    'Prio': 'Priority',
+    'Buchungsdatum': 'Start Date',
+    'Kurzbeschreibung': 'Summary',
+    'Beschreibung': 'Description',
+    'Rückmeldebeschreibung': 'Comment',
+    'Kategorie1 +': 'Custom field (OSF-System)',
+    'Kategorie2 +': 'Custom field (OSF-Stack)',
+    'Kategorie3 +': 'Custom field (Vendor + Application)'
+}
+
+# Column width of the Excel export (as excel_converter_*.py)
+EXCEL_COLUMN_WIDTH = 30
+
+
+def iter_defect_batches(input_folder, ttwos_file=None, batch_rows: int = 10000):
+    """
+    Defect rows of one environment with DEFECT_COLUMNS, in batches of at most batch_rows rows:
+    the wave exports in file order, then the TTWOS extract (if the file exists).
+    """
+    paths = wave_files(str(input_folder))
+    # Groups over all files, so rows are merged as if the files had been combined into one sheet
+    groups = wave_column_groups(paths, DEFECT_COLUMNS)
+    for path in paths:
+        for df in iter_wave_batches(path, DEFECT_COLUMNS, batch_rows):
+            yield merge_duplicate_columns(df, groups).reindex(columns=DEFECT_COLUMNS, fill_value="")
+
+    if ttwos_file is not None and os.path.exists(ttwos_file):
+        print(" TTWOS extract found. Combining with Jira defects...")
+        ttwos = pd.read_excel(ttwos_file).rename(columns=TTWOS_COLUMN_MAPPING)
+        yield ttwos.reindex(columns=DEFECT_COLUMNS, fill_value="")
+
+
+class ExcelExport:
+    """
+    Writes defect batches to a formatted .xlsx as they stream by (openpyxl write-only mode),
+    with the layout of excel_converter_*.py: wrapped, top-aligned cells and fixed column widths.
+    """
+
+    def __init__(self, path):
+        from openpyxl import Workbook
+        from openpyxl.styles import Alignment, Border, Font, Side
+
+        self.path = path
+        self.workbook = Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet()
+        self.alignment = Alignment(wrap_text=True, vertical='top')
+        thin = Side(style='thin')
+        self.header_font = Font(bold=True)
+        self.header_border = Border(left=thin, right=thin, top=thin, bottom=thin)
+        self.header_written = False
+
+    def _cell(self, value, header=False):
+        from openpyxl.cell import WriteOnlyCell
+
+        cell = WriteOnlyCell(self.sheet, value=value)
+        cell.alignment = self.alignment
+        if header:
+            cell.font = self.header_font
+            cell.border = self.header_border
+        return cell
+
+    def write(self, df: pd.DataFrame):
+        if not self.header_written:
+            from openpyxl.utils import get_column_letter
+
+            for index in range(1, len(df.columns) + 1):
+                self.sheet.column_dimensions[get_column_letter(index)].width = EXCEL_COLUMN_WIDTH
+            self.sheet.append([self._cell(col, header=True) for col in df.columns])
+            self.header_written = True
+        values = df.astype(object).where(df.notna(), None)
+        for row in values.itertuples(index=False, name=None):
+            self.sheet.append([self._cell(value) for value in row])
+
+    def close(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.workbook.save(self.path)
+
+
+def run_environment(env: str, conn=None, excel: bool = False, batch_rows: int = 10000,
+                    insert_batch_size: int = None, upsert: bool = False) -> dict:
+    """
+    Stream one environment into its table (if conn is given) and/or the Excel export.
+    insert_batch_size is the number of rows per INSERT statement (default:
+    mysql_connection.insert_batch_size). With upsert, changed rows are updated and the
+    changed keys are written to the environment's changed_keys_file.
+
+    Returns:
+        Dict with 'rows', 'inserted', 'skipped' and 'seconds'; with upsert also 'updated',
+        'unchanged' and 'changed_keys'.
+    """
+    from utilities import mysql_connection
+
+    config = ENVIRONMENTS[env]
+    start = time.perf_counter()
+    print(f"\n Processing {config['input_folder'].name} → {config['table']}")
+    if conn is not None:
+        mysql_connection.ensure_table(conn, config['table'], DEFECT_COLUMNS)
+        if upsert:
+            mysql_connection.ensure_hash_column(conn, config['table'])
+    export = ExcelExport(config['excel_file']) if excel else None
+
+    result = {'rows': 0, 'inserted': 0, 'skipped': 0}
+    if upsert:
+        result.update({'updated': 0, 'unchanged': 0, 'changed_keys': []})
+    seen_keys = set()
+    for batch in iter_defect_batches(config['input_folder'], config['ttwos_file'], batch_rows):
+        result['rows'] += len(batch)
+        if export is not None:
+            export.write(batch)
+        if conn is None:
+            continue
+        if upsert:
+            loaded = mysql_connection.upsert_rows(conn, config['table'], batch, insert_batch_size, seen_keys)
+            for name in ('inserted', 'updated', 'unchanged', 'skipped', 'changed_keys'):
+                result[name] += loaded[name]
+        else:
+            inserted, skipped = mysql_connection.insert_rows(conn, config['table'], batch, insert_batch_size)
+            result['inserted'] += inserted
+            result['skipped'] += skipped
+
+    if conn is not None:
+        conn.commit()
+        if upsert:
+            mysql_connection.print_upsert_result(config['table'], result)
+            write_changed_keys(config['changed_keys_file'], result['changed_keys'])
+            print(f" {len(result['changed_keys'])} changed keys written to: {config['changed_keys_file']}")
+        else:
+            print(f" {result['inserted']} new rows inserted into {config['table']}.")
+            print(f" {result['skipped']} rows skipped due to duplicate 'Issue key' values.")
+    if export is not None:
+        export.close()
+        print(f" Excel file saved as: {config['excel_file']}")
+    result['seconds'] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def write_changed_keys(path, keys):
+    """One key per line, for reindexing only the new and changed defects."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.writelines(f"{key}\n" for key in keys)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load the Jira wave exports into the defects tables.")
+    parser.add_argument("--env", default="acc,sit", help="Comma-separated environments (acc, sit)")
+    parser.add_argument("--excel", action="store_true", help="Also write output/filtered_output_<env>.xlsx")
+    parser.add_argument("--no-db", action="store_true", help="Do not load the database (use with --excel)")
+    parser.add_argument("--upsert", action="store_true",
+                        help="Update changed defects instead of skipping them and write the changed keys")
+    parser.add_argument("--batch-rows", type=int, default=10000, help="Rows per streamed batch")
+    parser.add_argument("--insert-batch-size", type=int, default=None,
+                        help="Rows per INSERT statement (default: mysql_connection.insert_batch_size)")
+    args = parser.parse_args()
+
+    envs = [env.strip() for env in args.env.split(',') if env.strip()]
+    unknown = [env for env in envs if env not in ENVIRONMENTS]
+    if unknown:
+        parser.error(f"unknown environment(s): {', '.join(unknown)}")
+
+    print("=" * 60)
+    print("Defect ETL Pipeline")
+    print("=" * 60)
+
+    conn = None
+    if not args.no_db:
+        from utilities.mysql_connection import get_connection
+        conn = get_connection()
+    try:
+        for env in envs:
+            result = run_environment(env, conn=conn, excel=args.excel, batch_rows=args.batch_rows,
+                                     insert_batch_size=args.insert_batch_size, upsert=args.upsert)
+            print(f" {result['rows']} rows in {result['seconds']}s")
+    finally:
+        if conn is not None:
+            conn.close()
+    print("\n Pipeline complete.")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+"""
+Defects table columns shared by the loaders (utilities/mysql_connection.py,
+utilities/defect_pipeline.py) and the app (modules/utilities.fetch_defects).
+"""
+
+# Content hash of each row, written by upsert loads for change detection (not defect data)
+hash_col = "Content Hash"
@@ -0,0 +1,86 @@
+"""
+Near-Duplicate Defect Detection
+Finds re-raised copies of the same defect (e.g. across waves) in the indexed defect embeddings
+and writes the duplicate-group table used by the vector store and the AI search UI.
+Run after re-indexing defects. Defaults come from duplicate_detection in config/genai_config.yaml.
+Usage: python utilities/detect_duplicate_defects.py [--threshold 0.95] [--method auto|exact|lsh]
+                                                    [--block-size 2048] [--exact-max-vectors 200000]
+                                                    [--lsh-bits 16] [--lsh-tables 8]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+
+def main():
+    from modules.genai.config import get_config_section
+
+    config = get_config_section('duplicate_detection')
+    parser = argparse.ArgumentParser(description="Detect near-duplicate defects in the vector store.")
+    parser.add_argument("--threshold", type=float, default=config.get('threshold', 0.95),
+                        help="Cosine similarity threshold (0-1)")
+    parser.add_argument("--method", choices=["auto", "exact", "lsh"], default=config.get('method', "auto"))
+    parser.add_argument("--block-size", type=int, default=config.get('block_size', 2048),
+                        help="Rows per block in the exact search")
+    parser.add_argument("--exact-max-vectors", type=int, default=config.get('exact_max_vectors', 200000),
+                        help="auto: exact search up to this many defects, LSH above")
+    parser.add_argument("--lsh-bits", type=int, default=config.get('lsh_bits', 16), help="Hash bits per LSH table")
+    parser.add_argument("--lsh-tables", type=int, default=config.get('lsh_tables', 8), help="Number of LSH tables")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Near-Duplicate Defect Detection")
+    print("=" * 60)
+
+    try:
+        from modules.genai.vector_store import VectorStore
+        from modules.genai.duplicate_detector import DuplicateDetector
+
+        print("\n1. Loading vector store...")
+        vector_store = VectorStore()
+        stats = vector_store.get_collection_stats()
+        print(f"   Defects indexed: {stats.get('defect_count', 0)}")
+
+        if stats.get('defect_count', 0) < 2:
+            print("\n   Not enough defects indexed. Re-index defects first.")
+            return
+
+        print(f"\n2. Detecting duplicates (threshold={args.threshold}, method={args.method})...")
+        detector = DuplicateDetector(
+            vector_store,
+            threshold=args.threshold,
+            method=args.method,
+            block_size=args.block_size,
+            exact_max_vectors=args.exact_max_vectors,
+            lsh_bits=args.lsh_bits,
+            lsh_tables=args.lsh_tables,
+        )
+        start = time.perf_counter()
+        table = detector.run(save=True)
+        elapsed = time.perf_counter() - start
+
+        groups = table.get('groups', [])
+        redundant = sum(len(g['members']) - 1 for g in groups)
+        print(f"\n3. Done in {elapsed:.1f}s")
+        print(f"   - Duplicate pairs: {table.get('pair_count', 0)}")
+        print(f"   - Duplicate groups: {len(groups)}")
+        print(f"   - Redundant defects collapsed: {redundant}")
+        for g in sorted(groups, key=lambda g: len(g['members']), reverse=True)[:5]:
+            print(f"   - {g['canonical']}: {len(g['members'])} members (min {g['min_similarity']}%)")
+        print("=" * 60)
+    except ImportError as e:
+        print(f"\nError: {e}")
+        print("Ensure dependencies are installed.")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\nError: {e}")
+        raise
+
+
+if __name__ == "__main__":
+    main()
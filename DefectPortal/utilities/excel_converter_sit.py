@@ -1,5 +1,4 @@
-import pandas as pd
-import re
+import sys
 from openpyxl import load_workbook
 from openpyxl.styles import Alignment
 import os
@@ -8,13 +7,16 @@ import os
 # Paths
 # -----------------------------
 base_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(base_dir, ".."))
+from utilities.jira_csv import merge_duplicate_columns
+from utilities.wave_ingest import read_sheet, sheet_file
 
 input_folder = os.path.join(base_dir, "../sheet")
 output_folder = os.path.join(base_dir, "../output")
 os.makedirs(output_folder, exist_ok=True)
 
 # Input file
-third_csv_file = os.path.join(input_folder, 'defect_sheet_sit.csv')
+third_csv_file = sheet_file(input_folder, 'defect_sheet_sit')
 
 # Output file
 output_excel_file_sit = os.path.join(output_folder, 'filtered_output_sit.xlsx')
@@ -32,25 +34,10 @@ columns_to_extract = [
 # Helper: process Jira-like CSV
 # -----------------------------
 def process_csv(file, columns_to_extract):
-    df = pd.read_csv(file)
+    df = read_sheet(file)
 
     # Merge duplicate columns (.1, .2 suffixes)
-    grouped_cols = {}
-    for col in df.columns:
-        base = re.sub(r'\.\d+$', '', col)
-        grouped_cols.setdefault(base, []).append(col)
-
-    merged_columns = {}
-    for base_col, cols in grouped_cols.items():
-        if len(cols) == 1:
-            merged_columns[base_col] = df[cols[0]]
-        else:
-            merged_columns[base_col] = df[cols].apply(
-                lambda row: '\n '.join([str(val).strip() for val in row if pd.notna(val) and str(val).strip()]),
-                axis=1
-            )
-
-    merged_df = pd.DataFrame(merged_columns)
+    merged_df = merge_duplicate_columns(df)
     return merged_df.reindex(columns=columns_to_extract, fill_value="")
 
 # -----------------------------
@@ -0,0 +1,49 @@
+"""
+ONNX Export Script
+Exports the embedding model to ONNX (plus an int8 dynamic-quantized copy) for the
+onnxruntime backend (embedding.backend: "onnx" in config/genai_config.yaml).
+Needs torch and sentence-transformers once; the portal then runs without importing torch.
+Usage: python utilities/export_onnx_model.py [--model all-MiniLM-L6-v2] [--output DIR] [--no-quantize]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the embedding model to ONNX.")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--output", default=None, help="Output folder (default: knowledge_base/onnx_models/<model>)")
+    parser.add_argument("--no-quantize", action="store_true", help="Skip the int8 quantized copy")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("ONNX Embedding Model Export")
+    print("=" * 60)
+
+    try:
+        from modules.genai.onnx_encoder import export_onnx_model
+
+        print(f"\n1. Exporting {args.model}...")
+        output_dir = export_onnx_model(args.model, args.output, quantize=not args.no_quantize)
+
+        print(f"\n2. Done. Files written to: {output_dir}")
+        for f in sorted(Path(output_dir).iterdir()):
+            print(f"   - {f.name} ({f.stat().st_size / 1e6:.1f} MB)")
+        print("\nSet embedding.backend: \"onnx\" in config/genai_config.yaml to use it.")
+        print("=" * 60)
+    except ImportError as e:
+        print(f"\nError: {e}")
+        print("Run: pip install torch sentence-transformers onnx onnxruntime")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\nError: {e}")
+        raise
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,12 @@
 """
 Knowledge Base Indexing Script
 Run this script to index all knowledge documents into the vector database.
+Only files added, changed or removed since the last run are processed; --full re-embeds everything.
+--watch keeps running and indexes changes as they happen (like the app's background watcher).
+Usage: python utilities/index_knowledge_base.py [--full] [--watch]
 """
 
+import argparse
 import os
 import sys
 from pathlib import Path
@@ -13,6 +17,11 @@ sys.path.insert(0, str(project_root))
 
 def main():
     """Main function to index the knowledge base."""
+    parser = argparse.ArgumentParser(description="Index the knowledge base documents.")
+    parser.add_argument("--full", action="store_true", help="Re-extract and re-embed every document")
+    parser.add_argument("--watch", action="store_true", help="Keep watching the documents folder after indexing")
+    args = parser.parse_args()
+    
     print("=" * 60)
     print("Knowledge Base Indexing Tool")
     print("=" * 60)
@@ -26,7 +35,7 @@ def main():
         print("\n1. Initializing services...")
         embedding_service = EmbeddingService()
         vector_store = VectorStore()
-        document_search = DocumentSearch(embedding_service, vector_store)
+        document_search = DocumentSearch.from_config(embedding_service, vector_store)
         
         # Check documents path
         docs_path = document_search.documents_path
@@ -53,7 +62,11 @@ def main():
         
         # Index documents (force reindex so new .docx and other files are always included)
         print("\n4. Indexing documents...")
-        document_search.load_and_index_documents(force_reindex=True)
+        changes = document_search.load_and_index_documents(force_reindex=True, full_rebuild=args.full)
+        for label in ('added', 'changed', 'removed'):
+            for source in changes.get(label, []):
+                print(f"   {label:<8} {source}")
+        print(f"   {changes.get('unchanged', 0)} unchanged, {changes.get('seconds', 0)}s")
         
         # Show stats
         stats = vector_store.get_collection_stats()
@@ -65,6 +78,25 @@ def main():
         print("Knowledge base ready for AI search!")
         print("=" * 60)
         
+        if args.watch:
+            import time
+            from modules.genai.kb_watcher import KnowledgeBaseWatcher
+            watcher = KnowledgeBaseWatcher.from_config(document_search)
+            watcher.start()
+            print(f"\nWatching {docs_path} ({watcher.backend}). Press Ctrl+C to stop.")
+            syncs = watcher.status()['syncs']
+            try:
+                while True:
+                    time.sleep(1)
+                    status = watcher.status()
+                    if status['syncs'] != syncs:
+                        syncs = status['syncs']
+                        changes = status['last_sync']
+                        print(f"   synced: {len(changes.get('added', []))} added, {len(changes.get('changed', []))} changed, "
+                              f"{len(changes.get('removed', []))} removed ({changes.get('chunks', 0)} chunks)")
+            except KeyboardInterrupt:
+                watcher.stop()
+        
     except ImportError as e:
         print(f"\nError: Missing required packages. {e}")
         print("Run: pip install sentence-transformers chromadb")
@@ -0,0 +1,67 @@
+"""
+Helpers for Jira CSV exports shared by the converter scripts.
+Jira writes multi-valued fields as repeated columns (Fix Version/s, Watchers, Labels,
+Comment, issue links, ...), which pandas reads as "Comment", "Comment.1", "Comment.2", ...
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+# Separator between the merged values of a repeated column group
+MERGE_SEPARATOR = '\n '
+
+
+def column_groups(columns) -> dict:
+    """Map each base column name to its repeated columns (".1", ".2" suffixes), in file order."""
+    grouped_cols = {}
+    for col in columns:
+        base = re.sub(r'\.\d+$', '', col)
+        grouped_cols.setdefault(base, []).append(col)
+    return grouped_cols
+
+
+def join_non_empty(df: pd.DataFrame, cols: list) -> pd.Series:
+    """
+    Per row, join the stripped non-empty values of several columns with MERGE_SEPARATOR.
+    Same result as
+        df[cols].apply(lambda row: '\\n '.join([str(val).strip() for val in row
+                                               if pd.notna(val) and str(val).strip()]), axis=1)
+    but built column by column with vectorised string operations instead of a Python call per row.
+    """
+    merged = np.full(len(df), '', dtype=object)
+    filled = np.zeros(len(df), dtype=bool)
+    for col in cols:
+        values = df[col]
+        text = values.astype(str).str.strip().to_numpy(dtype=object, na_value='')
+        valid = values.notna().to_numpy() & (text != '')
+        first = valid & ~filled
+        both = valid & filled
+        merged[first] = text[first]
+        merged[both] = merged[both] + MERGE_SEPARATOR + text[both]
+        filled |= valid
+    return pd.Series(merged, index=df.index)
+
+
+def merge_duplicate_columns(df: pd.DataFrame, groups: dict = None) -> pd.DataFrame:
+    """
+    Merge each group of repeated columns into one column named after the group.
+
+    Args:
+        df: Jira export rows.
+        groups: Column groups to merge (default: column_groups(df.columns)). Pass the groups of
+                all files when df holds rows of only one of them, so that a group is merged
+                (stripped and joined) the same way whether or not this file repeats it.
+    """
+    groups = column_groups(df.columns) if groups is None else groups
+    merged_columns = {}
+    for base_col, cols in groups.items():
+        present = [col for col in cols if col in df.columns]
+        if not present:
+            continue
+        if len(cols) == 1:
+            merged_columns[base_col] = df[present[0]]
+        else:
+            merged_columns[base_col] = join_non_empty(df, present)
+    return pd.DataFrame(merged_columns, index=df.index)
@@ -1,5 +1,13 @@
+import hashlib
+import sys
+from pathlib import Path
+
 import pandas as pd
-import mysql.connector
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utilities.defect_tables import hash_col
 
 # =========================
 # Configurations
@@ -10,27 +18,36 @@ files_and_tables = {
 }
 primary_key_col = "Issue key"
 
+# Upsert mode: rows whose content changed are updated (INSERT ... ON DUPLICATE KEY UPDATE)
+# instead of skipped; the change is detected with a hash of the row stored in hash_col
+upsert_mode = False
+
+# Rows per multi-row INSERT statement (one round trip each). batch size x row size must stay
+# below the server's max_allowed_packet (64 MB by default since MySQL 8.0).
+insert_batch_size = 500
+
+db_config = {
+    "host": 'localhost',
+    "user": 'root',
+    "password": 'admin',
+    "database": 'defect_db'
+}
+
+
 # =========================
 # Connect to MySQL
 # =========================
-conn = mysql.connector.connect(
-    host='localhost',
-    user='root',
-    password='admin',
-    database='defect_db'
-)
-cursor = conn.cursor()
+def get_connection():
+    import mysql.connector
+    return mysql.connector.connect(**db_config)
+
 
 # =========================
-# Function to load data into MySQL
+# Table creation
 # =========================
-def load_excel_to_mysql(file_path, table_name):
-    print(f"\n Processing {file_path} → {table_name}")
-
-    # Step 1: Load Excel file
-    df = pd.read_excel(file_path)
-
-    # Step 2: Check if table exists
+def ensure_table(conn, table_name, columns):
+    """Create the defects table (PRIMARY KEY on 'Issue key') unless it exists."""
+    cursor = conn.cursor()
     cursor.execute(f"""
         SELECT COUNT(*)
         FROM information_schema.tables
@@ -39,50 +56,237 @@ def load_excel_to_mysql(file_path, table_name):
     """)
     table_exists = cursor.fetchone()[0]
 
-    # Step 3: Create table if not exists
     if not table_exists:
-        columns = []
-        for col in df.columns:
+        column_defs = []
+        for col in columns:
             if col == primary_key_col:
-                columns.append(f"`{col}` VARCHAR(255) PRIMARY KEY")
+                column_defs.append(f"`{col}` VARCHAR(255) PRIMARY KEY")
             elif col == "Comment": # Assuming 'Comment' can be long text
-                columns.append(f"`{col}` LONGTEXT")
+                column_defs.append(f"`{col}` LONGTEXT")
             else:
-                columns.append(f"`{col}` VARCHAR(1000)")
-        columns_sql = ", ".join(columns)
+                column_defs.append(f"`{col}` VARCHAR(1000)")
+        columns_sql = ", ".join(column_defs)
         create_query = f"CREATE TABLE {table_name} ({columns_sql})"
         cursor.execute(create_query)
         print(f" Table '{table_name}' created with PRIMARY KEY on '{primary_key_col}'.")
     else:
         print(f"ℹ Table '{table_name}' already exists. Proceeding with safe appending...")
+    cursor.close()
 
-    # Step 4: Insert with IGNORE to skip duplicates
-    inserted, skipped = 0, 0
-    for _, row in df.iterrows():
-        placeholders = ", ".join(["%s"] * len(row))
-        column_names = ", ".join([f"`{col}`" for col in df.columns])
-        insert_query = f"INSERT IGNORE INTO {table_name} ({column_names}) VALUES ({placeholders})"
-        cursor.execute(insert_query, tuple(row.astype(str)))
 
-        if cursor.rowcount == 1:
-            inserted += 1
-        else:
-            skipped += 1
+def ensure_hash_column(conn, table_name):
+    """Add the content hash column used by upsert_rows unless the table has it."""
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        SELECT COUNT(*)
+        FROM information_schema.columns
+        WHERE table_schema = DATABASE()
+        AND table_name = '{table_name}'
+        AND column_name = '{hash_col}'
+    """)
+    if not cursor.fetchone()[0]:
+        cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN `{hash_col}` CHAR(64) NULL")
+        print(f" Column '{hash_col}' added to '{table_name}'.")
+    cursor.close()
+
+
+# =========================
+# Row values
+# =========================
+def as_text(df):
+    """
+    Values as they are stored in the defects tables: str() of each value, with empty cells as
+    'nan' (what str() gives for the empty cells pandas reads back from the Excel files).
+    """
+    text = df.astype(object).where(df.notna(), None)
+    return text.map(lambda val: 'nan' if val is None or val == '' else str(val))
 
-    conn.commit()
-    print(f" {inserted} new rows inserted into {table_name}.")
-    print(f" {skipped} rows skipped due to duplicate '{primary_key_col}' values.")
+
+def row_hash(values):
+    """SHA-256 (hex) of one row's stored values, in column order."""
+    return hashlib.sha256("\x1f".join(values).encode('utf-8')).hexdigest()
 
 
 # =========================
-# Process Both Files
+# Insert rows
 # =========================
-for file_path, table_name in files_and_tables.items():
-    load_excel_to_mysql(file_path, table_name)
+def insert_rows(conn, table_name, df, batch_size=None):
+    """
+    INSERT IGNORE the rows of a DataFrame (values as text), batch_size rows per statement, so
+    rows whose 'Issue key' is already in the table (or earlier in df) are skipped. Does not commit.
+
+    Returns:
+        (inserted, skipped) row counts.
+    """
+    batch_size = max(1, int(batch_size or insert_batch_size))
+    cursor = conn.cursor()
+    row_placeholders = "(" + ", ".join(["%s"] * len(df.columns)) + ")"
+    column_names = ", ".join([f"`{col}`" for col in df.columns])
+
+    rows = as_text(df).to_numpy(dtype=object).tolist()
+    inserted = 0
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        insert_query = (f"INSERT IGNORE INTO {table_name} ({column_names}) "
+                        f"VALUES {', '.join([row_placeholders] * len(batch))}")
+        cursor.execute(insert_query, [value for row in batch for value in row])
+        # Ignored duplicates are not counted as affected rows
+        inserted += cursor.rowcount
+    cursor.close()
+    return inserted, len(rows) - inserted
+
 
 # =========================
-# Cleanup
+# Upsert rows
 # =========================
-cursor.close()
-conn.close()
-print("\n Data loading complete for all files.")
+def _stored_hashes(cursor, table_name, columns, keys):
+    """
+    Content hash per key already in the table. Rows stored before the hash column existed
+    (NULL hash) are hashed from their stored values.
+    """
+    key_placeholders = ", ".join(["%s"] * len(keys))
+    cursor.execute(
+        f"SELECT `{primary_key_col}`, `{hash_col}` FROM {table_name} "
+        f"WHERE `{primary_key_col}` IN ({key_placeholders})", list(keys)
+    )
+    stored = dict(cursor.fetchall())
+
+    unhashed = [key for key, digest in stored.items() if digest is None]
+    if unhashed:
+        column_names = ", ".join([f"`{col}`" for col in columns])
+        key_placeholders = ", ".join(["%s"] * len(unhashed))
+        cursor.execute(
+            f"SELECT {column_names} FROM {table_name} WHERE `{primary_key_col}` IN ({key_placeholders})", unhashed
+        )
+        key_index = list(columns).index(primary_key_col)
+        for values in cursor.fetchall():
+            text = ['nan' if val is None or val == '' else str(val) for val in values]
+            stored[values[key_index]] = row_hash(text)
+    return stored, set(unhashed)
+
+
+def upsert_rows(conn, table_name, df, batch_size=None, seen_keys=None):
+    """
+    Insert new rows and update rows whose content changed, batch_size rows per statement.
+    Unchanged rows are not written. A key that occurs more than once is taken from its first
+    row (as with INSERT IGNORE). The table needs the hash column (ensure_hash_column).
+    Does not commit.
+
+    Args:
+        conn: Database connection.
+        table_name: Defects table.
+        df: Rows with the table's columns.
+        batch_size: Rows per statement (default: insert_batch_size).
+        seen_keys: Keys already loaded in this run, shared between calls when rows arrive in
+                   batches; rows with these keys are skipped. Updated in place.
+
+    Returns:
+        Dict with 'inserted', 'updated', 'unchanged' and 'skipped' row counts and
+        'changed_keys' (keys of the inserted and updated rows).
+    """
+    batch_size = max(1, int(batch_size or insert_batch_size))
+    seen_keys = set() if seen_keys is None else seen_keys
+    columns = list(df.columns)
+    key_index = columns.index(primary_key_col)
+    rows = as_text(df).to_numpy(dtype=object).tolist()
+
+    write_columns = columns + [hash_col]
+    column_names = ", ".join([f"`{col}`" for col in write_columns])
+    row_placeholders = "(" + ", ".join(["%s"] * len(write_columns)) + ")"
+    # VALUES(col) is the value the row would have been inserted with (MySQL and MariaDB)
+    updates = ", ".join([f"`{col}` = VALUES(`{col}`)" for col in write_columns if col != primary_key_col])
+
+    result = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'skipped': 0, 'changed_keys': []}
+    cursor = conn.cursor()
+    for start in range(0, len(rows), batch_size):
+        batch = []
+        for row in rows[start:start + batch_size]:
+            key = row[key_index]
+            if key in seen_keys:
+                result['skipped'] += 1
+                continue
+            seen_keys.add(key)
+            batch.append(row + [row_hash(row)])
+        if not batch:
+            continue
+
+        stored, unhashed = _stored_hashes(cursor, table_name, columns, [row[key_index] for row in batch])
+        writes = []
+        for row in batch:
+            key, digest = row[key_index], row[-1]
+            if key not in stored:
+                result['inserted'] += 1
+            elif stored[key] != digest:
+                result['updated'] += 1
+            else:
+                result['unchanged'] += 1
+                if key in unhashed:
+                    # Same content; only the hash has to be stored
+                    writes.append(row)
+                continue
+            result['changed_keys'].append(key)
+            writes.append(row)
+
+        if writes:
+            upsert_query = (f"INSERT INTO {table_name} ({column_names}) "
+                            f"VALUES {', '.join([row_placeholders] * len(writes))} "
+                            f"ON DUPLICATE KEY UPDATE {updates}")
+            cursor.execute(upsert_query, [value for row in writes for value in row])
+    cursor.close()
+    return result
+
+
+# =========================
+# Function to load data into MySQL
+# =========================
+def load_excel_to_mysql(conn, file_path, table_name, upsert=None):
+    print(f"\n Processing {file_path} → {table_name}")
+    upsert = upsert_mode if upsert is None else upsert
+
+    # Step 1: Load Excel file
+    df = pd.read_excel(file_path)
+
+    # Step 2: Create table if not exists
+    ensure_table(conn, table_name, df.columns)
+
+    if upsert:
+        # Step 3: Insert new rows, update changed ones
+        ensure_hash_column(conn, table_name)
+        result = upsert_rows(conn, table_name, df)
+        conn.commit()
+        print_upsert_result(table_name, result)
+        return result
+
+    # Step 3: Insert with IGNORE to skip duplicates
+    inserted, skipped = insert_rows(conn, table_name, df)
+
+    conn.commit()
+    print(f" {inserted} new rows inserted into {table_name}.")
+    print(f" {skipped} rows skipped due to duplicate '{primary_key_col}' values.")
+    return {'inserted': inserted, 'skipped': skipped}
+
+
+def print_upsert_result(table_name, result):
+    print(f" {result['inserted']} new rows inserted into {table_name}.")
+    print(f" {result['updated']} changed rows updated, {result['unchanged']} rows unchanged.")
+    print(f" {result['skipped']} rows skipped due to duplicate '{primary_key_col}' values.")
+
+
+def main():
+    conn = get_connection()
+
+    # =========================
+    # Process Both Files
+    # =========================
+    for file_path, table_name in files_and_tables.items():
+        load_excel_to_mysql(conn, file_path, table_name)
+
+    # =========================
+    # Cleanup
+    # =========================
+    conn.close()
+    print("\n Data loading complete for all files.")
+
+
+if __name__ == "__main__":
+    main()
@@ -18,12 +18,12 @@ def main():
     print("=" * 60)
 
     try:
-        from modules.database_connection import get_db_engine
+        from modules.database_connection import create_db_engine
         from modules.utilities import fetch_defects
         from modules.genai.enhanced_search import EnhancedSearch
 
         print("\n1. Connecting to database...")
-        engine = get_db_engine()
+        engine = create_db_engine()
 
         print("2. Loading defects from defects_table_acc and defects_table_sit...")
         defects_acc = fetch_defects(engine, "defects_table_acc")
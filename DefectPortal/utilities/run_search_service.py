@@ -0,0 +1,57 @@
+"""
+Search Service Runner
+Starts the standalone AI search service (HTTP/JSON API, see modules/genai/search_service.py).
+Set search_service.enabled: true in config/genai_config.yaml so the Streamlit app uses it.
+Usage: python utilities/run_search_service.py [--host 127.0.0.1] [--port 8765] [--threads 4]
+"""
+
+import argparse
+import logging
+import os
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+
+def main():
+    from modules.genai.config import get_config_section
+
+    service_config = get_config_section('search_service')
+    parser = argparse.ArgumentParser(description="Run the standalone AI search service.")
+    parser.add_argument("--host", default=service_config.get('host', '127.0.0.1'))
+    parser.add_argument("--port", type=int, default=service_config.get('port', 8765))
+    parser.add_argument("--threads", type=int, default=service_config.get('worker_threads', 4),
+                        help="Worker threads for search/LLM calls")
+    parser.add_argument("--max-pending", type=int, default=service_config.get('max_pending', 64),
+                        help="Queued requests beyond the workers before answering 429")
+    parser.add_argument("--metrics-port", type=int, default=service_config.get('metrics_port', 9109),
+                        help="Port of the service's Prometheus-style /metrics endpoint")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("AI Search Service")
+    print("=" * 60)
+
+    try:
+        from modules.genai.search_service import run_service
+        from modules.genai.metrics import start_metrics_server_from_config
+
+        # Run from the project root like the Streamlit app (logs/ is relative)
+        os.chdir(project_root)
+        logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+        print(f"\nServing on http://{args.host}:{args.port} with {args.threads} worker threads")
+        if start_metrics_server_from_config(port=args.metrics_port):
+            print(f"Metrics on port {args.metrics_port} (/metrics)")
+        print("Models load in the background; GET /status shows progress.")
+        print("=" * 60)
+        run_service(args.host, args.port, worker_threads=args.threads, max_pending=args.max_pending)
+    except ImportError as e:
+        print(f"\nError: {e}")
+        print("Run: pip install starlette uvicorn")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
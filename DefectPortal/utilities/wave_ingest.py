@@ -0,0 +1,208 @@
+"""
+Wave CSV ingestion shared by combine_acc.py and combine_sit.py.
+Reads the Jira wave exports in parallel with the pyarrow CSV reader, keeping only the columns
+the converters use (with all their repeated ".1", ".2" columns), and writes one columnar
+Parquet file. Without pyarrow the files are read with pandas and a CSV is written instead.
+
+    combine_waves("combine_acc", "sheet/defect_sheet_acc", DEFECT_COLUMNS)
+    df = read_sheet(sheet_file("sheet", "defect_sheet_acc"))
+
+iter_wave_batches streams a single export in row batches for utilities/defect_pipeline.py.
+"""
+
+import csv
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator
+
+import pandas as pd
+
+from utilities.jira_csv import column_groups
+
+# Columns read by utilities/excel_converter_*.py (the base names of repeated column groups)
+DEFECT_COLUMNS = [
+    'Summary', 'Issue key', 'Priority', 'Resolution', 'Fix Version/s',
+    'Description', 'Custom field (OSF-Fix Description)', 'Custom field (OSF-Stack)',
+    'Custom field (OSF-System)', 'Custom field (Vendor + Application)', 'Comment'
+]
+SOURCE_COLUMN = "Source_File"
+
+
+def read_header(path: str) -> list:
+    """Column names of a CSV file, with repeated names numbered like pandas ("Comment", "Comment.1", ...)."""
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        names = next(csv.reader(f), [])
+    seen = {}
+    header = []
+    for name in names:
+        count = seen.get(name, 0)
+        seen[name] = count + 1
+        header.append(f"{name}.{count}" if count else name)
+    return header
+
+
+def _wanted(header: list, columns) -> list:
+    if columns is None:
+        return header
+    groups = column_groups(header)
+    return [col for base in groups if base in columns for col in groups[base]]
+
+
+def read_wave_csv(path: str, columns=None):
+    """
+    Read one wave export with pyarrow, all values as strings (empty and NA-like values as nulls).
+
+    Args:
+        path: CSV file.
+        columns: Base column names to keep (None = all).
+
+    Returns:
+        pyarrow.Table with the kept columns and a Source_File column.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    header = read_header(path)
+    wanted = _wanted(header, columns)
+    table = pa_csv.read_csv(
+        path,
+        read_options=pa_csv.ReadOptions(column_names=header, skip_rows=1, block_size=1 << 24),
+        parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=wanted,
+            column_types={col: pa.string() for col in wanted},
+            strings_can_be_null=True
+        )
+    )
+    source = os.path.basename(path)
+    return table.append_column(SOURCE_COLUMN, pa.array([source] * table.num_rows, pa.string()))
+
+
+def iter_wave_batches(path: str, columns=None, batch_rows: int = 10000) -> Iterator[pd.DataFrame]:
+    """
+    Stream one wave export as DataFrames of at most batch_rows rows (values as strings,
+    empty values as NaN), so a file never has to be held in memory as a whole.
+
+    Args:
+        path: CSV file.
+        columns: Base column names to keep (None = all).
+        batch_rows: Rows per DataFrame.
+
+    Yields:
+        DataFrames with the kept columns and a Source_File column.
+    """
+    source = os.path.basename(path)
+    header = read_header(path)
+    wanted = _wanted(header, columns)
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+    except ImportError:
+        keep = set(wanted)
+        for df in pd.read_csv(path, usecols=lambda col: col in keep, dtype=str, chunksize=batch_rows):
+            df[SOURCE_COLUMN] = source
+            yield df
+        return
+
+    reader = pa_csv.open_csv(
+        path,
+        read_options=pa_csv.ReadOptions(column_names=header, skip_rows=1, block_size=1 << 22),
+        parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=wanted,
+            column_types={col: pa.string() for col in wanted},
+            strings_can_be_null=True
+        )
+    )
+    for batch in reader:
+        for start in range(0, batch.num_rows, batch_rows):
+            df = batch.slice(start, batch_rows).to_pandas()
+            df[SOURCE_COLUMN] = source
+            yield df
+
+
+def wave_files(input_folder: str) -> list:
+    """Wave exports (*.csv) of a folder, in the order they are combined."""
+    return [os.path.join(input_folder, f) for f in sorted(os.listdir(input_folder)) if f.endswith(".csv")]
+
+
+def wave_column_groups(paths, columns=None) -> dict:
+    """column_groups of the kept columns of several wave exports, as in their combined sheet."""
+    kept = dict.fromkeys(col for path in paths for col in _wanted(read_header(path), columns))
+    return column_groups(kept)
+
+
+def _read_wave_pandas(path: str, columns=None) -> pd.DataFrame:
+    """pandas fallback of read_wave_csv."""
+    header = read_header(path)
+    wanted = set(_wanted(header, columns))
+    df = pd.read_csv(path, usecols=lambda col: col in wanted, dtype=str, low_memory=False)
+    df[SOURCE_COLUMN] = os.path.basename(path)
+    return df
+
+
+def combine_waves(input_folder: str, output_stem: str, columns=None, workers: int = None) -> dict:
+    """
+    Combine all wave CSVs of a folder into one file.
+
+    Args:
+        input_folder: Folder with the wave exports (*.csv).
+        output_stem: Output path without extension; ".parquet" is added (".csv" without pyarrow).
+        columns: Base column names to keep (None = all).
+        workers: Files read at the same time (default: CPU count, at most 8).
+
+    Returns:
+        Dict with 'files', 'rows', 'columns', 'output' and 'seconds' ('output' is None if no CSV was found).
+    """
+    start = time.perf_counter()
+    paths = wave_files(input_folder)
+    if not paths:
+        return {'files': 0, 'rows': 0, 'columns': 0, 'output': None, 'seconds': 0.0}
+    workers = workers or min(8, os.cpu_count() or 1)
+
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        pa = None
+
+    if pa is not None:
+        # pyarrow parses outside the GIL, so threads read files in parallel
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            tables = list(pool.map(lambda p: read_wave_csv(p, columns), paths))
+        # Waves differ in how many repeated columns they have; missing ones become nulls
+        table = pa.concat_tables(tables, promote_options="default")
+        output = f"{output_stem}.parquet"
+        pq.write_table(table, output, compression='zstd')
+        rows, width = table.num_rows, table.num_columns
+    else:
+        frames = [_read_wave_pandas(p, columns) for p in paths]
+        df = pd.concat(frames, ignore_index=True)
+        output = f"{output_stem}.csv"
+        df.to_csv(output, index=False)
+        rows, width = df.shape
+
+    return {
+        'files': len(paths),
+        'rows': rows,
+        'columns': width,
+        'output': output,
+        'seconds': round(time.perf_counter() - start, 3)
+    }
+
+
+def sheet_file(folder: str, stem: str) -> str:
+    """The most recently written combined sheet (<stem>.parquet or <stem>.csv) in a folder."""
+    candidates = [os.path.join(folder, f"{stem}{ext}") for ext in ('.parquet', '.csv')]
+    existing = [path for path in candidates if os.path.exists(path)]
+    if not existing:
+        return candidates[-1]
+    return max(existing, key=os.path.getmtime)
+
+
+def read_sheet(path: str) -> pd.DataFrame:
+    """Read a combined sheet written by combine_waves (Parquet or CSV)."""
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)